@@ -6,11 +6,18 @@ import streamlit as st
 import pandas as pd
 import sys
 import os
+import hashlib
+from urllib.parse import quote
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(__file__))
 
-from src.processor import load_fighters, clean_fighters, predict_matchup
+from src.processor import (load_fighters, clean_fighters, predict_matchup, explain_matchup, predict_matchup_interval,
+                           RATING_WEIGHT)
+from src.fighter_store import FighterStore
+from src.similarity import build_index, load_index, similar_fighters, best_matchups
+from src.roster_table import paged_table
+from src import instrumentation, shared_cache
 
 # --- Page Config ---
 st.set_page_config(
@@ -89,21 +96,52 @@ def get_data():
     df = clean_fighters(df)
     return df
 
-fighters_df = get_data()
+# Multi-worker mode (UFC_SHARED_DIR): roster comes from the shared memory-mapped snapshot
+@st.cache_resource
+def get_shared_roster():
+    store, meta = shared_cache.load_roster()
+    return store, shared_cache.roster_frame(store, meta)
+
+# Shared, read-only store for per-fighter lookups by id (no pandas indexing per access)
+@st.cache_resource
+def get_store():
+    if shared_cache.enabled():
+        return get_shared_roster()[0]
+    return FighterStore.from_frame(get_data())
+
+fighters_df = get_shared_roster()[1] if shared_cache.enabled() else get_data()
 
 if fighters_df is None or fighters_df.empty:
     st.warning("⏳ Scraping data... Please wait a moment and refresh the page.")
     if st.button("Refresh Data"):
         st.cache_data.clear()
+        st.cache_resource.clear()
         st.rerun()
     st.stop()
 
+store = get_store()
+
+# k-NN style-comps index; reuses the persisted trees when the roster is unchanged
+@st.cache_resource
+def get_similarity_index():
+    if shared_cache.enabled():
+        return shared_cache.load_similarity_index(fighters_df)
+    return build_index(get_data(), previous=load_index())
+
 # --- Sidebar ---
 with st.sidebar:
     st.header("Settings")
     if st.button("🔄 Refresh / Reload Data"):
         st.cache_data.clear()
+        st.cache_resource.clear()
         st.rerun()
+    
+    # Collection is process-wide (shared by every session and the API), so it is only
+    # switched by the UFC_TIMINGS env var at startup, never from one viewer's sidebar
+    if instrumentation.is_enabled():
+        st.caption("⏱️ Timings are being collected for this server process.")
+    else:
+        st.caption("⏱️ Timings are off (start with UFC_TIMINGS=1 to collect them).")
 
 # --- Header ---
 st.markdown("<h1 style='text-align:center;'>🥊 UFC Fight Predictor</h1>", unsafe_allow_html=True)
@@ -144,17 +182,18 @@ with col2:
     st.markdown("---")
 
     # Define fighters
-    fighter_a = available_fighters[available_fighters['Name'] == fighter_a_name].iloc[0]
-    fighter_b = available_fighters[available_fighters['Name'] == fighter_b_name].iloc[0]
-
-    # Helper for image fetching
-    try:
-        from src.image_fetcher import get_fighter_image_url
-    except ImportError:
-        def get_fighter_image_url(name): return None
+    fighter_a = store.record(store.id_of(fighter_a_name))
+    fighter_b = store.record(store.id_of(fighter_b_name))
 
+    # Helper for image fetching (requests/bs4 are only imported on a cache miss)
     @st.cache_data(show_spinner="Running photo reconnaissance...", ttl=3600*24)
     def fetch_photo(name):
+        try:
+            from src.image_fetcher import get_fighter_image_url
+        except ImportError:
+            return None
+        if shared_cache.enabled():
+            return shared_cache.cached_photo(name, get_fighter_image_url)
         return get_fighter_image_url(name)
 
     # Placeholder Image SVG
@@ -239,12 +278,29 @@ with col2:
     with col2:
         fighter_card(fighter_b, "blue")
 
-    # Metrics comparison (optional expandable detail)
+    profile_col1, profile_col2 = st.columns(2)
+    for profile_col, name in ((profile_col1, fighter_a_name), (profile_col2, fighter_b_name)):
+        profile_col.markdown(f"[🥋 Full profile: {name}](fighter_profile?fighter={quote(name)})")
+
+    # Metrics comparison (optional expandable detail), paged from SQLite so only one page is rendered
     with st.expander("📊 View Detailed Comparison Table"):
-         st.dataframe(available_fighters.set_index('Name'), use_container_width=True)
+        paged_table('comparison_table', {'weight_class': None if selected_class == 'All Classes' else selected_class})
+
+    # Style comps: nearest neighbours in standardized stat space, same weight class
+    with st.expander("🔎 Style Comps & Best Matchups"):
+        sim_index = get_similarity_index()
+        comp_col1, comp_col2 = st.columns(2)
+        for comp_col, name in ((comp_col1, fighter_a_name), (comp_col2, fighter_b_name)):
+            with comp_col:
+                st.markdown(f"**Fighters most similar to {name}**")
+                st.dataframe(pd.DataFrame(similar_fighters(sim_index, name, k=5)),
+                             hide_index=True, use_container_width=True)
+                st.markdown(f"**Best stylistic matchups for {name}**")
+                st.dataframe(pd.DataFrame(best_matchups(sim_index, fighters_df, name, k=5)),
+                             hide_index=True, use_container_width=True)
 
     st.header("ℹ️ How it Works")
-    st.markdown("""
+    st.markdown(f"""
     **Prediction Logic:**
     The model calculates a weighted score based on 4 key factors:
     
@@ -252,6 +308,9 @@ with col2:
     *   **🤼 Grappling (30%)**: Compares takedown average, accuracy, and submission threat.
     *   **📐 Physical (15%)**: Reach and height advantage.
     *   **🏅 Experience (15%)**: Win rate weighted by total number of fights.
+
+    When both fighters have a Glicko-2 rating, its expected score makes up {RATING_WEIGHT:.0%} of the final
+    probability; unrated matchups use the four factors alone.
     
     *Data sourced from [ufcstats.com](http://www.ufcstats.com) & [ufc.com](http://www.ufc.com) (photos).*
     """)
@@ -259,6 +318,9 @@ with col2:
 # --- Prediction ---
 st.markdown("---")
 
+show_interval = st.checkbox("Show uncertainty interval", value=True,
+                            help="Redraws both fighters' stats thousands of times, with more noise for shorter records")
+
 if st.button("🥊 PREDICT FIGHT OUTCOME", use_container_width=True, type="primary"):
     result = predict_matchup(fighter_a, fighter_b)
     
@@ -285,10 +347,21 @@ if st.button("🥊 PREDICT FIGHT OUTCOME", use_container_width=True, type="prima
         st.metric(f"🔵 {fighter_b_name}", f"{result['prob_b']:.1%}")
         st.progress(result['prob_b'])
     
+    if show_interval:
+        # Seeded from the pair so the interval doesn't jitter between reruns of the same matchup
+        pair_key = f"{fighter_a['URL']}|{fighter_b['URL']}".encode()
+        interval = predict_matchup_interval(fighter_a, fighter_b,
+                                            seed=int.from_bytes(hashlib.sha256(pair_key).digest()[:8], 'big'))
+        st.caption(f"{interval['level']:.0%} interval for {fighter_a_name}: {interval['prob_low']:.1%} – "
+                   f"{interval['prob_high']:.1%} (mean {interval['prob_mean']:.1%}); {fighter_a_name} is favoured "
+                   f"in {interval['a_favoured']:.0%} of draws. Wider for fighters with fewer fights.")
+    
     # Breakdown
     st.markdown("### 📈 Advantage Breakdown")
     
     bd = result['breakdown']
+    explained = explain_matchup(fighter_a, fighter_b)
+    contributions = explained['contributions']
     
     adv_col1, adv_col2, adv_col3, adv_col4 = st.columns(4)
     
@@ -314,13 +387,47 @@ if st.button("🥊 PREDICT FIGHT OUTCOME", use_container_width=True, type="prima
             
             st.markdown(f"**{label}**")
             st.markdown(f"<span style='color:{adv_color};font-weight:bold;'>{adv_icon}</span>", unsafe_allow_html=True)
+            st.caption(f"{contributions[key] * 100:+.1f} pts to {fighter_a_name}")
+    
+    if 'Rating' in bd:
+        rating = bd['Rating']
+        st.caption(f"Glicko-2 rating: {fighter_a_name} {rating['Fighter_A']:.0f} (±{2 * rating['Fighter_A_RD']:.0f}) "
+                   f"vs {fighter_b_name} {rating['Fighter_B']:.0f} (±{2 * rating['Fighter_B_RD']:.0f}), "
+                   f"expected score {rating['Expected_A']:.1%} — blended into the probability at 25% "
+                   f"({contributions['Rating'] * 100:+.1f} pts to {fighter_a_name}).")
+    
+    # Counterfactuals: the smallest single-stat change for the underdog that evens the fight
+    underdog, flips = (fighter_a_name, explained['flip_a']) if not is_a_winner else (fighter_b_name, explained['flip_b'])
+    flip_units = {'Reach_cm': ('reach', 'cm'), 'Height_cm': ('height', 'cm'), 'SLpM': ('strikes landed', '/min'),
+                  'SApM': ('strikes absorbed', '/min'), 'TD_Avg': ('takedowns', '/15 min'),
+                  'Sub_Avg': ('submission attempts', '/15 min')}
+    flip_lines = [f"- {flip_units[stat][0]} {delta:+.1f} {flip_units[stat][1]}"
+                  for stat, delta in flips.items() if pd.notna(delta)]
+    st.markdown(f"**What would flip the pick?** Any one of these changes to {underdog} makes it a 50/50 fight:")
+    st.markdown("\n".join(flip_lines) if flip_lines else "- No single stat change is enough.")
 
 # --- Footer ---
 st.markdown("---")
 st.markdown(
     "<p style='text-align:center; color: #666;'>"
     "Data sourced from ufcstats.com | Model uses weighted statistical analysis across "
-    "Striking (40%), Grappling (30%), Physical (15%), Experience (15%)"
+    "Striking (40%), Grappling (30%), Physical (15%), Experience (15%), "
+    f"blended {RATING_WEIGHT:.0%} with Glicko-2 ratings when both fighters are rated"
     "</p>",
     unsafe_allow_html=True
 )
+
+# --- Live Timings (rendered last so this run's calls are included) ---
+if instrumentation.is_enabled():
+    with st.sidebar.expander("⏱️ Live Timings", expanded=True):
+        stats = instrumentation.summary()
+        if stats['timings']:
+            timings_df = pd.DataFrame.from_dict(stats['timings'], orient='index')
+            st.dataframe(timings_df.sort_values('total_ms', ascending=False), use_container_width=True)
+        else:
+            st.caption("No timed calls yet (cached data skips load/clean).")
+        for name, value in stats['counters'].items():
+            st.caption(f"{name}: {value}")
+        if st.button("Reset timings (all sessions)"):
+            instrumentation.reset()
+            st.rerun()
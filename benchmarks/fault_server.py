@@ -0,0 +1,181 @@
+"""
+Local fault-injecting HTTP stub for exercising src/http_client.py offline.
+
+Every path serves the fixture fighter page, misbehaving as the query string asks:
+    ?fail=N&status=503     first N requests to this path return `status`
+    ?retry_after=S         ... with a Retry-After: S header
+    ?drop=N                first N requests close the connection without a response
+    ?sleep=S               delay the response by S seconds
+    /stats                 request counts per path and peak concurrency (JSON)
+With --error-rate, any request also fails with 503 at that probability.
+
+Usage:
+    python -m benchmarks.fault_server --port 8099 --error-rate 0.2
+    python -m benchmarks.fault_server --check      # run the client scenarios and exit
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+FIXTURE_HTML = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'fighter_detail.html')
+
+class FaultState:
+    """Per-server request bookkeeping."""
+
+    def __init__(self, error_rate=0.0, seed=0):
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.hits = {}
+        self.times = {}
+        self.active = 0
+        self.peak = 0
+        with open(FIXTURE_HTML, encoding='utf-8') as f:
+            self.body = f.read().encode('utf-8')
+
+class FaultHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        state = self.server.state
+        parsed = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+
+        if parsed.path == '/stats':
+            with state.lock:
+                body = json.dumps({'hits': state.hits, 'peak_concurrency': state.peak,
+                                   'times': state.times}).encode('utf-8')
+            self._send(200, body, {'Content-Type': 'application/json'})
+            return
+
+        with state.lock:
+            hit = state.hits.get(self.path, 0) + 1
+            state.hits[self.path] = hit
+            state.times.setdefault(self.path, []).append(time.monotonic())
+            state.active += 1
+            state.peak = max(state.peak, state.active)
+            random_fail = state.rng.random() < state.error_rate
+        try:
+            if 'sleep' in params:
+                time.sleep(float(params['sleep']))
+            if hit <= int(params.get('drop', 0)):
+                self.close_connection = True
+                self.connection.shutdown(2)
+                return
+            if hit <= int(params.get('fail', 0)) or random_fail:
+                headers = {'Retry-After': params['retry_after']} if 'retry_after' in params else None
+                self._send(int(params.get('status', 503)), b'injected failure', headers)
+                return
+            self._send(200, state.body)
+        finally:
+            with state.lock:
+                state.active -= 1
+
+def start_server(port=0, error_rate=0.0):
+    """Start the stub in a daemon thread; returns (server, base_url)."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), FaultHandler)
+    server.daemon_threads = True
+    server.state = FaultState(error_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def check():
+    """Run the retry / backoff / rate-limit / dead-letter scenarios against a fresh stub."""
+    from concurrent.futures import ThreadPoolExecutor
+    from src.http_client import HttpClient
+    from src.scraper import scrape_fighter_details
+
+    server, base = start_server()
+    results = []
+
+    def scenario(name, ok, detail=''):
+        results.append(ok)
+        print(f"  [{'PASS' if ok else 'FAIL'}] {name} {detail}")
+
+    client = HttpClient(rate=0, retries=3, backoff_base=0.01)
+    try:
+        resp = client.get(f"{base}/fighter-details/a?fail=2&status=503")
+        scenario("503 x2 then 200", resp.status_code == 200 and server.state.hits[resp.request.path_url] == 3)
+
+        start = time.monotonic()
+        client.get(f"{base}/fighter-details/b?fail=1&status=429&retry_after=1")
+        waited = time.monotonic() - start
+        scenario("429 honours Retry-After", waited >= 0.95, f"({waited:.2f}s)")
+
+        resp = client.get(f"{base}/fighter-details/c?drop=2")
+        scenario("dropped connections retried", resp.status_code == 200)
+
+        try:
+            client.get(f"{base}/fighter-details/d?fail=10&status=503")
+            dead = False
+        except Exception:
+            dead = any(letter['url'].endswith('fail=10&status=503') for letter in client.dead_letters)
+        scenario("persistent failure dead-lettered", dead)
+
+        try:
+            client.get(f"{base}/fighter-details/e?fail=10&status=404")
+            not_retried = False
+        except Exception:
+            not_retried = server.state.hits['/fighter-details/e?fail=10&status=404'] == 1
+        scenario("404 not retried", not_retried)
+
+        limited = HttpClient(rate=20, burst=1, retries=0)
+        start = time.monotonic()
+        for i in range(21):
+            limited.get(f"{base}/fighter-details/rate{i}")
+        elapsed = time.monotonic() - start
+        scenario("token bucket 20 req/s", elapsed >= 0.95, f"(21 requests in {elapsed:.2f}s)")
+
+        capped = HttpClient(rate=0, max_per_host=2, retries=0)
+        server.state.peak = 0
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda i: capped.get(f"{base}/fighter-details/cap{i}?sleep=0.1"), range(8)))
+        scenario("per-host concurrency cap 2", server.state.peak <= 2, f"(peak {server.state.peak})")
+
+        import src.http_client as http_client
+        http_client._client = HttpClient(rate=0, retries=3, backoff_base=0.01)
+        fighter = scrape_fighter_details(f"{base}/fighter-details/f?fail=2&status=502")
+        scenario("scraper survives transient 502s", bool(fighter) and fighter.get('Name') != 'Unknown')
+    finally:
+        server.shutdown()
+
+    print(f"{sum(results)}/{len(results)} scenarios passed.")
+    return 0 if all(results) else 1
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fault-injecting HTTP stub server")
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Random 503 probability per request")
+    parser.add_argument('--check', action='store_true', help="Run the client scenarios against a stub and exit")
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(check())
+    server, base = start_server(args.port, args.error_rate)
+    print(f"Fault-injecting stub listening on {base} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,80 @@
+"""
+Cold-start import report for the project's entry points, based on `python -X importtime`.
+
+Each module is imported in a fresh interpreter; the report shows its cumulative
+import time and the heaviest modules it pulled in. Entry points whose
+dependencies are not installed (e.g. streamlit for app.py) are reported as skipped.
+
+Usage:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time src.etl src.api --top 20
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(__file__), '..'))
+
+ENTRY_POINTS = [
+    'app', 'src.etl', 'src.api', 'src.batch_predict', 'src.scraper', 'src.consolidate_data',
+    'src.sqlite_sink', 'src.html_archive', 'src.query_executor', 'src.saved_queries',
+    'src.image_fetcher', 'src.shared_cache',
+]
+REPEAT = 3     # Fresh interpreters per module; the fastest run is reported
+
+def parse_importtime(stderr):
+    """Parse -X importtime output into [(module, self_us, cumulative_us)] in import order."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+def measure(module, repeat=REPEAT):
+    """
+    Import `module` in fresh interpreters.
+    Returns: dict with 'seconds' (best cumulative) and 'modules' (rows of the best run),
+    or 'error' if the import failed.
+    """
+    best = None
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                              cwd=ROOT, capture_output=True, text=True)
+        if proc.returncode != 0:
+            last = proc.stderr.strip().splitlines()[-1:] or ['import failed']
+            return {'error': last[0]}
+        rows = parse_importtime(proc.stderr)
+        total = next((cum for name, _, cum in rows if name == module), sum(s for _, s, _ in rows))
+        if best is None or total < best['seconds'] * 1e6:
+            best = {'seconds': total / 1e6, 'modules': rows}
+    return best
+
+def run_imports(results, modules=ENTRY_POINTS):
+    """Add an import_<module> timing to `results` for every entry point that imports cleanly."""
+    for module in modules:
+        measured = measure(module)
+        if 'error' not in measured:
+            results[f"import_{module}"] = measured['seconds']
+
+def report(modules=ENTRY_POINTS, top=10):
+    lines = []
+    for module in modules:
+        measured = measure(module)
+        if 'error' in measured:
+            lines.append(f"{module}: skipped ({measured['error']})")
+            continue
+        lines.append(f"{module}: {measured['seconds'] * 1000:.1f} ms cumulative")
+        heaviest = sorted(measured['modules'], key=lambda row: -row[1])[:top]
+        for name, self_us, cumulative_us in heaviest:
+            lines.append(f"    {name:<44}{self_us / 1000:>9.1f} ms self{cumulative_us / 1000:>10.1f} ms cum")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold-start import times (-X importtime)")
+    parser.add_argument('modules', nargs='*', default=ENTRY_POINTS)
+    parser.add_argument('--top', type=int, default=10, help="Heaviest modules listed per entry point")
+    args = parser.parse_args()
+    print(report(args.modules, args.top))
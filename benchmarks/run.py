@@ -0,0 +1,250 @@
+"""
+Offline benchmark suite for the data pipeline and prediction engine.
+
+Everything runs against local inputs: the saved fighter-detail page in
+benchmarks/fixtures/ and synthetic rosters built by tiling data/fighters_master.csv
+1x / 10x / 100x. Nothing touches the network or the real ufc_data.db.
+Cold-start import time of each entry point is measured in fresh interpreters
+(see benchmarks/import_time.py for the per-module breakdown).
+
+Each run is appended to benchmarks/history.jsonl and compared with
+benchmarks/baseline.json; anything slower than the baseline by more than
+--threshold is flagged and the exit code is 1.
+
+Usage:
+    python -m benchmarks.run
+    python -m benchmarks.run --scales 1,10 --save-baseline
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from src.scraper import parse_fighter_html, normalize_raw_fighters
+from src.consolidate_data import consolidate
+from src.etl import run_etl
+from src.sqlite_sink import SQLiteSink, merge_staging
+from src.processor import (load_fighters, clean_fighters, predict_matchup,
+                           predict_matchups_batch, predict_matrix)
+from src.fighter_store import FighterStore
+from src.matchmaking import build_card
+from src.validation import validate
+from src import roster_snapshot
+from benchmarks.import_time import run_imports
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_HTML = os.path.join(BENCH_DIR, 'fixtures', 'fighter_detail.html')
+MASTER_CSV = os.path.join(ROOT, 'data', 'fighters_master.csv')
+HISTORY_PATH = os.path.join(BENCH_DIR, 'history.jsonl')
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+
+PARSE_ITERATIONS = 200
+RAW_ROWS = 100000         # Rows of raw page strings for the batch normalizer
+SINGLE_PREDICTIONS = 1000
+MATRIX_SIZE = 2000        # Fighters sampled for the all-pairs matrix
+SHARDS = 3                # Shard files written for the consolidate benchmark
+SHARD_OVERLAP = 0.1       # Fraction of rows repeated across shards (dedupe work)
+
+def bench(fn, repeat=3):
+    """Best-of-`repeat` wall time in seconds for fn(), with its stdout silenced."""
+    best = float('inf')
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+    return best
+
+def synthetic_roster(base, scale):
+    """Tile the master roster `scale` times with unique names and URLs."""
+    if scale == 1:
+        return base.copy()
+    parts = []
+    for k in range(scale):
+        part = base.copy()
+        if k:
+            part['Name'] = part['Name'] + f" {k}"
+            part['URL'] = part['URL'] + f"-{k}"
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True)
+
+def write_shards(roster, data_dir):
+    """Split a roster into overlapping shard CSVs, like the per-letter scraper outputs."""
+    os.makedirs(data_dir, exist_ok=True)
+    bounds = np.linspace(0, len(roster), SHARDS + 1).astype(int)
+    overlap = int(len(roster) * SHARD_OVERLAP / SHARDS)
+    for i in range(SHARDS):
+        lo = max(0, bounds[i] - overlap)
+        roster.iloc[lo:bounds[i + 1]].to_csv(os.path.join(data_dir, f"fighters_shard{i}.csv"), index=False)
+
+def run_scale(base, scale, results):
+    """Benchmarks whose cost grows with roster size, in a scratch working directory."""
+    roster = synthetic_roster(base, scale)
+    tag = f"@{scale}x"
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            write_shards(roster, 'data')
+
+            def consolidate_fresh():
+                master = os.path.join('data', 'fighters_master.csv')
+                if os.path.exists(master):
+                    os.remove(master)
+                consolidate('data')
+
+            results[f"consolidate{tag}"] = bench(consolidate_fresh, repeat=1)
+            results[f"consolidate_streaming{tag}"] = bench(lambda: consolidate('data', streaming=True), repeat=1)
+            results[f"run_etl{tag}"] = bench(lambda: run_etl(os.path.join('data', 'fighters_master.csv')), repeat=1)
+            if roster_snapshot.pa is not None:  # Optional pyarrow
+                snapshot_path = os.path.join('data', 'roster.snapshot')
+                results[f"snapshot_export{tag}"] = bench(
+                    lambda: roster_snapshot.export_snapshot(snapshot_path), repeat=1)
+                results[f"snapshot_import{tag}"] = bench(
+                    lambda: roster_snapshot.import_snapshot(snapshot_path, force=True), repeat=1)
+
+            records = roster.astype(object).where(roster.notna(), None).to_dict('records')
+
+            def sink_load():
+                with SQLiteSink() as sink:
+                    for record in records:
+                        sink.add(record)
+                merge_staging()
+
+            results[f"sink_load{tag}"] = bench(sink_load, repeat=1)
+            results[f"load_fighters{tag}"] = bench(load_fighters)
+
+            raw = load_fighters()
+            results[f"clean_fighters{tag}"] = bench(lambda: clean_fighters(raw))
+
+            df = clean_fighters(raw).reset_index(drop=True)
+            rng = np.random.default_rng(0)
+            other = df.iloc[rng.permutation(len(df))].reset_index(drop=True)
+            results[f"predict_batch{tag}"] = bench(lambda: predict_matchups_batch(df, other))
+
+            sample = df.iloc[rng.choice(len(df), size=min(MATRIX_SIZE, len(df)), replace=False)]
+            results[f"predict_matrix{tag}"] = bench(lambda: predict_matrix(sample))
+        finally:
+            os.chdir(cwd)
+    print(f"  {scale}x roster ({len(roster)} rows) done.")
+
+def run_fixed(base, results):
+    """Benchmarks independent of roster size."""
+    with open(FIXTURE_HTML, encoding='utf-8') as f:
+        html = f.read()
+    url = 'http://www.ufcstats.com/fighter-details/1338e2c7480bdf9e'
+    results['parse_fighter_html'] = bench(
+        lambda: [parse_fighter_html(html, url) for _ in range(PARSE_ITERATIONS)])
+
+    # Raw strings as they appear on fighter pages, tiled to RAW_ROWS
+    rng = np.random.default_rng(0)
+    heights = base['Height_cm'].dropna() / 2.54
+    raw = pd.DataFrame({
+        'Height_cm': [f"{int(h // 12)}' {int(round(h % 12))}\"" for h in rng.choice(heights, RAW_ROWS)],
+        'Reach_cm': [f'{int(r)}"' for r in rng.choice(base['Reach_cm'].dropna() / 2.54, RAW_ROWS)],
+        'Weight_lbs': [f"{int(w)} lbs." for w in rng.choice(base['Weight_lbs'].dropna(), RAW_ROWS)],
+        'Str_Acc': [f"{int(p * 100)}%" for p in rng.choice(base['Str_Acc'].dropna(), RAW_ROWS)],
+        'SLpM': [f"{v:.2f}" for v in rng.choice(base['SLpM'].dropna(), RAW_ROWS)],
+        'Record': [f"Record: {w}-{l}-0" for w, l in rng.integers(0, 30, size=(RAW_ROWS, 2))],
+    })
+    results['normalize_raw_fighters'] = bench(lambda: normalize_raw_fighters(raw))
+    results['validate_roster'] = bench(lambda: validate(base))
+
+    df = clean_fighters(base).reset_index(drop=True)
+    rows = [df.iloc[i] for i in range(min(len(df), SINGLE_PREDICTIONS + 1))]
+    results['predict_single'] = bench(
+        lambda: [predict_matchup(rows[i], rows[i + 1]) for i in range(len(rows) - 1)])
+
+    store = FighterStore.from_frame(df)
+    records = [store.record(i) for i in range(len(rows))]
+    results['predict_single_store'] = bench(
+        lambda: [predict_matchup(records[i], records[i + 1]) for i in range(len(records) - 1)])
+    names = df['Name'].iloc[:len(rows)].tolist()
+    results['lookup_dataframe'] = bench(lambda: [df[df['Name'] == name].iloc[0] for name in names[:200]])
+    results['lookup_store'] = bench(lambda: [store.record(store.id_of(name)) for name in names[:200]])
+
+    largest_class = df['WeightClass'].value_counts().idxmax()
+    results['matchmaking_largest_class'] = bench(lambda: build_card(df, largest_class), repeat=1)
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def compare(results, baseline, threshold):
+    """Return (name, baseline_s, current_s, ratio) for benchmarks slower than threshold x baseline."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous and current > previous * threshold:
+            regressions.append((name, previous, current, current / previous))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmarks")
+    parser.add_argument('--scales', default='1,10,100', help="Comma-separated roster multipliers")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="Flag benchmarks slower than baseline by this factor")
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    base = pd.read_csv(MASTER_CSV)
+    results = {}
+
+    print("Running import-time benchmarks...")
+    run_imports(results)
+    print("Running fixed-size benchmarks...")
+    run_fixed(base, results)
+    for scale in [int(s) for s in args.scales.split(',') if s.strip()]:
+        print(f"Running {scale}x roster benchmarks...")
+        run_scale(base, scale, results)
+
+    print(f"\n{'benchmark':<32}{'seconds':>12}")
+    for name, seconds in results.items():
+        print(f"{name:<32}{seconds:>12.4f}")
+
+    record = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+    with open(HISTORY_PATH, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+
+    exit_code = 0
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            exit_code = 1
+            print(f"\nRegressions (> {args.threshold:.2f}x baseline):")
+            for name, previous, current, ratio in regressions:
+                print(f"  {name}: {previous:.4f}s -> {current:.4f}s ({ratio:.2f}x)")
+        else:
+            print("\nNo regressions against baseline.")
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(record, f, indent=2)
+        print(f"Saved baseline to {BASELINE_PATH}")
+
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Per-worker memory and readiness: each worker loading its own roster versus
+workers sharing the UFC_SHARED_DIR snapshot (see src/shared_cache.py).
+
+N worker processes run the app's start-up path (roster, fighter store, style-comps
+index, one probability matrix per weight class; timed after imports) and stay
+alive while their proportional set size (PSS: shared pages split between the
+processes mapping them) is read from /proc/<pid>/smaps_rollup. Runs against a copy of ufc_data.db
+in a temp directory; the shared directory is warmed up once beforehand.
+
+Usage:
+    python -m benchmarks.workers --workers 4
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Heavy imports happen before the clock starts; they cost the same in both modes
+WORKER = """
+import sys, time
+import pandas, sklearn.neighbors
+from src import shared_cache, processor, fighter_store, similarity
+start = time.perf_counter()
+if shared_cache.enabled():
+    store, meta = shared_cache.load_roster()
+    df = shared_cache.roster_frame(store, meta)
+    index = shared_cache.load_similarity_index(df)
+    matrices = [shared_cache.cached_matrix(df[df['WeightClass'] == wc].reset_index(drop=True))
+                for wc in sorted(df['WeightClass'].unique())]
+else:
+    from src.processor import load_fighters, clean_fighters, predict_matrix
+    from src.fighter_store import FighterStore
+    from src.similarity import build_index
+    df = clean_fighters(load_fighters()).reset_index(drop=True)
+    store = FighterStore.from_frame(df)
+    index = build_index(df)
+    matrices = [predict_matrix(df[df['WeightClass'] == wc].reset_index(drop=True))
+                for wc in sorted(df['WeightClass'].unique())]
+print(f"{time.perf_counter() - start:.3f}", flush=True)
+sys.stdin.read()
+"""
+
+def pss_kib(pid):
+    """Proportional set size of a process in KiB (falls back to RSS without smaps_rollup)."""
+    for name, field in (('smaps_rollup', 'Pss:'), ('status', 'VmRSS:')):
+        try:
+            with open(f"/proc/{pid}/{name}") as f:
+                for line in f:
+                    if line.startswith(field):
+                        return int(line.split()[1])
+        except OSError:
+            continue
+    return None
+
+def run_workers(n, workdir, env):
+    """Start n workers together; returns [(ready_seconds, pss_kib)] measured while all are alive."""
+    procs = [subprocess.Popen([sys.executable, '-c', WORKER], cwd=workdir, env=env,
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+             for _ in range(n)]
+    ready = [float(p.stdout.readline()) for p in procs]
+    memory = [pss_kib(p.pid) for p in procs]
+    for p in procs:
+        p.communicate('')
+    return list(zip(ready, memory))
+
+def main(n):
+    workdir = tempfile.mkdtemp(prefix='ufc_workers_')
+    try:
+        shutil.copy(os.path.join(ROOT, 'ufc_data.db'), workdir)
+        shared_dir = os.path.join(workdir, 'shared')
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        env.pop('UFC_SHARED_DIR', None)
+        shared_env = dict(env, UFC_SHARED_DIR=shared_dir)
+        subprocess.run([sys.executable, '-m', 'src.shared_cache', 'warm-up'], cwd=workdir,
+                       env=shared_env, check=True, capture_output=True)
+
+        for label, mode_env in (('per-worker', env), ('shared', shared_env)):
+            rows = run_workers(n, workdir, mode_env)
+            ready = [r for r, _ in rows]
+            memory = [m for _, m in rows if m is not None]
+            print(f"{label:<12} ready {min(ready):6.2f}-{max(ready):5.2f}s   "
+                  f"PSS/worker {sum(memory) / max(len(memory), 1) / 1024:7.1f} MiB   "
+                  f"total {sum(memory) / 1024:7.1f} MiB")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-worker memory: private roster vs shared snapshot")
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+    main(args.workers)
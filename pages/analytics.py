@@ -1,12 +1,12 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import sys
 import os
 
 # Add src to path so we can import processor
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from src.processor import load_fighters, clean_fighters
+from src.roster_table import paged_table
 
 st.set_page_config(page_title="UFC Analytics", page_icon="📈", layout="wide")
 
@@ -43,10 +43,14 @@ st.sidebar.markdown(f"**Showing {len(filtered_df)} fighters**")
 
 st.sidebar.markdown(f"**Showing {len(filtered_df)} fighters**")
 
-# --- Tabs ---
-tab_charts, tab_data = st.tabs(["📊 Charts", "📋 Raw Data"])
+# --- Views ---
+# st.tabs runs every tab's body on each rerun; a selector only runs the visible view,
+# so plotly (and statsmodels for the trendline) load only when charts are shown.
+view = st.radio("View", ["📊 Charts", "📋 Raw Data"], horizontal=True, label_visibility="collapsed")
+
+if view == "📊 Charts":
+    import plotly.express as px
 
-with tab_charts:
     # --- Row 1 ---
     col1, col2 = st.columns(2)
 
@@ -105,8 +109,8 @@ with tab_charts:
         )
         st.plotly_chart(fig_grapple, use_container_width=True)
 
-with tab_data:
+else:
     st.subheader("📋 Raw Data Explorer")
-    st.markdown("Filter and sort the dataset below.")
-    st.dataframe(filtered_df, use_container_width=True)
+    st.markdown("Stored values (before median filling), with the sidebar filters applied. Sorted and paged by the database.")
+    paged_table('raw_data', {'stances': selected_stance, 'min_fights': min_fights})
 
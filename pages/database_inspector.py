@@ -1,28 +1,20 @@
+import sqlite3
 import streamlit as st
-import pandas as pd
-from src.db_manager import get_connection
+from src.query_executor import cached_execute_query, clear_result_cache, MAX_ROWS, PAGE_SIZE, TIMEOUT_S
+from src.saved_queries import save_query, delete_query, list_queries, table_name
 
 st.set_page_config(page_title="SQL Inspector", page_icon="🗄️", layout="wide")
 
 st.title("🗄️ Database Inspector")
 st.markdown("Run live SQL queries against the **UFC Data Warehouse** (`ufc_data.db`).")
 
-# Helper to run query
-def run_query(query):
-    conn = get_connection()
-    try:
-        return pd.read_sql_query(query, conn)
-    except Exception as e:
-        return str(e)
-    finally:
-        conn.close()
-
 # --- Schema Reference ---
 with st.expander("📖 View Database Schema"):
     st.markdown("""
     **Tables:**
     *   `fighters` (`id`, `name`, `nickname`, `weight_class`, `height_cm`...)
     *   `fighter_stats` (`fighter_id`, `wins`, `slpm`, `td_avg`...)
+    *   `mv_<name>` — materialized saved queries (rebuilt after every ETL run)
     
     **Example Join:**
     ```sql
@@ -41,16 +33,67 @@ with col1:
     default_query = "SELECT * FROM fighters ORDER BY RANDOM() LIMIT 10;"
     query = st.text_area("✍️ SQL Query", value=default_query, height=150)
     
-    if st.button("▶️ Run Query", type="primary"):
-        if "DROP" in query.upper() or "DELETE" in query.upper() or "UPDATE" in query.upper():
-            st.error("⚠️ Read-only commands only, please!")
+    st.caption(f"Read-only connection · {TIMEOUT_S:g}s time budget · max {MAX_ROWS:,} rows")
+
+    run_col, cache_col = st.columns([1, 2])
+    with run_col:
+        run_clicked = st.button("▶️ Run Query", type="primary")
+    with cache_col:
+        if st.button("🧹 Clear result cache"):
+            clear_result_cache()
+
+    if run_clicked:
+        st.session_state['inspector_result'] = cached_execute_query(query)
+        st.session_state['inspector_page'] = 1
+
+    result = st.session_state.get('inspector_result')
+    if result is not None:
+        if result['error']:
+            st.error(f"Error: {result['error']}")
         else:
-            result = run_query(query)
-            if isinstance(result, pd.DataFrame):
-                st.success(f"Returned {len(result)} rows.")
-                st.dataframe(result, use_container_width=True)
+            df = result['data']
+            if result['cached']:
+                msg = f"Returned {len(df)} rows from cache (originally {result['elapsed_ms']:.1f} ms)."
+            else:
+                msg = f"Returned {len(df)} rows in {result['elapsed_ms']:.1f} ms."
+            if result['truncated']:
+                st.warning(f"{msg} Output capped at {MAX_ROWS:,} rows — add a LIMIT or narrow the query.")
             else:
-                st.error(f"Error: {result}")
+                st.success(msg)
+
+            # Show results one page at a time
+            n_pages = max(1, -(-len(df) // PAGE_SIZE))
+            page = st.number_input("Page", min_value=1, max_value=n_pages, key='inspector_page')
+            start = (page - 1) * PAGE_SIZE
+            st.dataframe(df.iloc[start:start + PAGE_SIZE], use_container_width=True)
+            st.caption(f"Page {page} of {n_pages}")
+
+        if result['plan']:
+            with st.expander("🧭 Query Plan"):
+                st.code("\n".join(result['plan']), language="text")
+
+    # --- Saved / Materialized Queries ---
+    with st.expander("💾 Save query as materialized table"):
+        save_name = st.text_input("Name", placeholder="top_strikers")
+        if st.button("Save & materialize"):
+            try:
+                rows = save_query(save_name, query)
+                st.success(f"Saved as `{table_name(save_name)}` ({rows} rows). It refreshes after every ETL run.")
+            except (ValueError, sqlite3.Error) as e:
+                st.error(f"Error: {e}")
+
+        saved = list_queries()
+        if saved:
+            st.markdown("**Saved queries:**")
+        for item in saved:
+            q_col, del_col = st.columns([4, 1])
+            with q_col:
+                st.markdown(f"`{table_name(item['name'])}` · {item['row_count']} rows · refreshed {item['refreshed_at']}")
+                st.code(item['sql'], language="sql")
+            with del_col:
+                if st.button("🗑️", key=f"del_{item['name']}"):
+                    delete_query(item['name'])
+                    st.rerun()
 
 with col2:
     st.info("💡 **Try these queries:**")
@@ -0,0 +1,83 @@
+import streamlit as st
+import pandas as pd
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.roster_table import fetch_page, fetch_fighter
+
+st.set_page_config(page_title="Fighter Profile", page_icon="🥋", layout="wide")
+
+st.title("🥋 Fighter Profile")
+
+# Only the searched-for names and the selected fighter are loaded, never the whole roster.
+# Link straight to a fighter with ?fighter=<name or ufcstats URL>.
+requested = st.query_params.get('fighter', '')
+search = st.text_input("Search fighters", value=requested, placeholder="e.g. Jones")
+if not search:
+    st.info("Type part of a fighter's name to find them.")
+    st.stop()
+
+matches = fetch_page({'search': search}, columns=['Name', 'WeightClass'], page_size=20)['rows']
+if matches.empty:
+    st.warning(f"No fighters match '{search}'.")
+    st.stop()
+
+labels = [f"{name} ({weight_class or 'Unknown'})" for name, weight_class in zip(matches['Name'], matches['WeightClass'])]
+exact = matches.index[matches['Name'].str.lower() == search.strip().lower()]
+choice = st.selectbox("Fighter", range(len(matches)), format_func=lambda i: labels[i],
+                      index=int(exact[0]) if len(exact) else 0)
+if len(matches) == 20:
+    st.caption("Showing the first 20 matches — refine the search to narrow it down.")
+
+fighter = fetch_fighter(int(matches.at[choice, 'id']))
+st.query_params['fighter'] = fighter['Name']
+
+# --- Header ---
+st.markdown("---")
+st.header(fighter['Name'])
+if fighter['Nickname']:
+    st.markdown(f"*'{fighter['Nickname']}'*")
+st.caption(" · ".join(str(part) for part in (fighter['WeightClass'], fighter['Stance'], fighter['DOB']) if part))
+
+def _fmt(value, spec):
+    return "—" if value is None or pd.isna(value) else format(value, spec)
+
+wins, losses, draws = (int(fighter[col] or 0) for col in ('Wins', 'Losses', 'Draws'))
+total = wins + losses + draws
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Record", f"{wins}-{losses}-{draws}")
+col2.metric("Win Rate", f"{wins / total:.0%}" if total else "—")
+col3.metric("Height", f"{_fmt(fighter['Height_cm'], '.0f')} cm")
+col4.metric("Reach", f"{_fmt(fighter['Reach_cm'], '.0f')} cm")
+
+# --- Stats ---
+st.subheader("📊 Stats")
+strike_col, grapple_col = st.columns(2)
+with strike_col:
+    st.markdown("**Striking**")
+    st.markdown(f"""
+    *   Landed per minute: **{_fmt(fighter['SLpM'], '.2f')}** at **{_fmt(fighter['Str_Acc'], '.0%')}** accuracy
+    *   Absorbed per minute: **{_fmt(fighter['SApM'], '.2f')}**, defense **{_fmt(fighter['Str_Def'], '.0%')}**
+    """)
+with grapple_col:
+    st.markdown("**Grappling**")
+    st.markdown(f"""
+    *   Takedowns per 15 min: **{_fmt(fighter['TD_Avg'], '.2f')}** at **{_fmt(fighter['TD_Acc'], '.0%')}** accuracy
+    *   Takedown defense **{_fmt(fighter['TD_Def'], '.0%')}**, submissions per 15 min **{_fmt(fighter['Sub_Avg'], '.2f')}**
+    """)
+
+rating = fighter['rating']
+if rating:
+    st.caption(f"Glicko-2 {rating['glicko']:.0f} (±{2 * rating['rd']:.0f}) · Elo {rating['elo']:.0f} · "
+               f"{rating['bouts']} rated bouts, last on {rating['last_event_date']}")
+
+# --- Fight history ---
+if fighter['bouts']:
+    st.subheader("🗓️ Recent Fights")
+    history = pd.DataFrame(fighter['bouts'])
+    history['result'] = history['score'].map({1.0: 'Win', 0.0: 'Loss', 0.5: 'Draw'})
+    st.dataframe(history[['event_date', 'event', 'opponent', 'result']], hide_index=True, use_container_width=True)
+
+if fighter['URL']:
+    st.markdown(f"[View on ufcstats.com]({fighter['URL']})")
@@ -0,0 +1,264 @@
+"""
+Headless HTTP prediction API (stdlib only).
+Loads the roster once at startup and serves predictions without Streamlit.
+
+Endpoints:
+    GET  /health                         -> roster size
+    GET  /predict?a=<name|url>&b=<name|url>
+    POST /predict         {"a": ..., "b": ...}
+    POST /predict/batch   {"matchups": [{"a": ..., "b": ...}, ...]}  or NDJSON body
+                          (NDJSON response with ?format=ndjson or Accept: application/x-ndjson)
+    GET  /metrics                        -> request counts and latency percentiles
+    GET  /changes?since=<version>&limit=<n>  -> fighter change feed after an ETL version
+
+Usage:
+    python -m src.api --host 127.0.0.1 --port 8000
+"""
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+import pandas as pd
+from src.processor import (load_fighters, clean_fighters, predict_matchup,
+                           predict_pairs, build_fighter_index)
+from src.fighter_store import FighterStore
+from src.change_feed import changes_since
+
+BATCH_CHUNK = 2000      # Matchups scored per vectorized call when streaming
+MAX_BODY_BYTES = 64 * 1024 * 1024
+LATENCY_WINDOW = 5000   # Recent samples kept per endpoint for percentiles
+
+ROSTER = None           # Cleaned fighters DataFrame, loaded once by load_roster()
+ROSTER_INDEX = {}
+ROSTER_STORE = None     # FighterStore over ROSTER, for single-matchup lookups by id
+
+def load_roster():
+    """Load and clean the roster into memory (called once at startup)."""
+    global ROSTER, ROSTER_INDEX, ROSTER_STORE
+    df = clean_fighters(load_fighters())
+    ROSTER = df.reset_index(drop=True)
+    ROSTER_INDEX = build_fighter_index(ROSTER)
+    ROSTER_STORE = FighterStore.from_frame(ROSTER)
+    print(f"Loaded {len(ROSTER)} fighters into memory.")
+    return ROSTER
+
+class Metrics:
+    """Thread-safe per-endpoint request counters and latency samples."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._errors = {}
+        self._items = {}
+        self._latencies = {}
+
+    def record(self, endpoint, elapsed_ms, ok=True, items=1):
+        with self._lock:
+            self._counts[endpoint] = self._counts.get(endpoint, 0) + 1
+            self._items[endpoint] = self._items.get(endpoint, 0) + items
+            if not ok:
+                self._errors[endpoint] = self._errors.get(endpoint, 0) + 1
+            samples = self._latencies.setdefault(endpoint, deque(maxlen=LATENCY_WINDOW))
+            samples.append(elapsed_ms)
+
+    def snapshot(self):
+        with self._lock:
+            report = {}
+            for endpoint, samples in self._latencies.items():
+                values = np.array(samples)
+                report[endpoint] = {
+                    'requests': self._counts.get(endpoint, 0),
+                    'errors': self._errors.get(endpoint, 0),
+                    'predictions': self._items.get(endpoint, 0),
+                    'p50_ms': round(float(np.percentile(values, 50)), 3),
+                    'p95_ms': round(float(np.percentile(values, 95)), 3),
+                    'p99_ms': round(float(np.percentile(values, 99)), 3),
+                    'max_ms': round(float(values.max()), 3),
+                }
+            return report
+
+METRICS = Metrics()
+
+def _matchup_keys(item):
+    """Extract the two fighter identifiers from a matchup object."""
+    a = item.get('a', item.get('fighter_a'))
+    b = item.get('b', item.get('fighter_b'))
+    return a, b
+
+def predict_single(a_key, b_key):
+    """Full prediction (with breakdown) for one matchup; raises KeyError for unknown fighters."""
+    ia = ROSTER_STORE.id_of(a_key)
+    ib = ROSTER_STORE.id_of(b_key)
+    if ia is None:
+        raise KeyError(f"Unknown fighter: {a_key}")
+    if ib is None:
+        raise KeyError(f"Unknown fighter: {b_key}")
+    a, b = ROSTER_STORE.record(ia), ROSTER_STORE.record(ib)
+    result = predict_matchup(a, b)
+    result['fighter_a'] = a.Name
+    result['fighter_b'] = b.Name
+    return result
+
+def predict_many(items):
+    """
+    Score a list of matchup objects with the vectorized batch path.
+    Returns a list of result dicts in input order; unresolved matchups get an 'error'.
+    """
+    keys = [_matchup_keys(item) if isinstance(item, dict) else (None, None) for item in items]
+    frame = predict_pairs(ROSTER, ROSTER_INDEX, [k[0] for k in keys], [k[1] for k in keys])
+    results = []
+    for (a_key, b_key), record in zip(keys, frame.to_dict('records')):
+        if pd.isna(record['error']):
+            del record['error']
+            results.append(record)
+        else:
+            results.append({'a': a_key, 'b': b_key, 'error': record['error']})
+    return results
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    server_version = "UFCPredictor/1.0"
+    _streaming = False  # Set once an NDJSON response has sent its headers
+
+    def log_message(self, format, *args):
+        pass  # Per-request logging is replaced by /metrics
+
+    # --- helpers ---
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, default=_json_default).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            raise ValueError(f"Request body larger than {MAX_BODY_BYTES} bytes")
+        return self.rfile.read(length) if length else b''
+
+    def _send_error(self, status, message):
+        if self._streaming:
+            # The 200 and NDJSON headers are already out; end the stream with an error line instead
+            self.wfile.write((json.dumps({'error': message}) + '\n').encode('utf-8'))
+            self.close_connection = True
+        else:
+            self._send_json(status, {'error': message})
+
+    def _timed(self, endpoint, fn):
+        start = time.perf_counter()
+        ok = True
+        items = 1
+        self._streaming = False
+        try:
+            items = fn() or 1
+        except (ValueError, json.JSONDecodeError) as e:
+            ok = False
+            self._send_error(400, str(e))
+        except KeyError as e:
+            ok = False
+            self._send_error(404, e.args[0])
+        except Exception as e:
+            ok = False
+            self._send_error(500, str(e))
+        METRICS.record(endpoint, (time.perf_counter() - start) * 1000, ok, items)
+
+    # --- routes ---
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path == '/health':
+            self._send_json(200, {'status': 'ok', 'fighters': len(ROSTER)})
+        elif parsed.path == '/metrics':
+            self._send_json(200, METRICS.snapshot())
+        elif parsed.path == '/changes':
+            self._timed('/changes', lambda: self._handle_changes(parsed))
+        elif parsed.path == '/predict':
+            params = parse_qs(parsed.query)
+            a_key = params.get('a', [None])[0]
+            b_key = params.get('b', [None])[0]
+            self._timed('/predict', lambda: self._send_json(200, predict_single(a_key, b_key)))
+        else:
+            self._send_json(404, {'error': f"No route {parsed.path}"})
+
+    def do_POST(self):
+        parsed = urlparse(self.path)
+        if parsed.path == '/predict':
+            self._timed('/predict', self._handle_single)
+        elif parsed.path == '/predict/batch':
+            self._timed('/predict/batch', lambda: self._handle_batch(parsed))
+        else:
+            self._send_json(404, {'error': f"No route {parsed.path}"})
+
+    def _handle_single(self):
+        item = json.loads(self._read_body() or b'{}')
+        a_key, b_key = _matchup_keys(item)
+        self._send_json(200, predict_single(a_key, b_key))
+
+    def _handle_changes(self, parsed):
+        # Parsed inside _timed so a non-integer since/limit is a 400, not a dropped connection
+        params = parse_qs(parsed.query)
+        since = int(params.get('since', ['0'])[0])
+        limit = int(params['limit'][0]) if 'limit' in params else None
+        self._send_json(200, changes_since(since, limit))
+
+    def _handle_batch(self, parsed):
+        body = self._read_body()
+        content_type = self.headers.get('Content-Type', '')
+        if 'ndjson' in content_type:
+            items = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            payload = json.loads(body or b'{}')
+            items = payload.get('matchups', []) if isinstance(payload, dict) else payload
+        if not isinstance(items, list):
+            raise ValueError("Expected a list of matchups")
+
+        fmt = parse_qs(parsed.query).get('format', [''])[0]
+        if fmt == 'ndjson' or 'ndjson' in self.headers.get('Accept', ''):
+            self._stream_ndjson(items)
+        else:
+            self._send_json(200, {'results': predict_many(items)})
+        return len(items)
+
+    def _stream_ndjson(self, items):
+        """Score and write results chunk by chunk so large batches start flowing immediately."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self._streaming = True
+        for start in range(0, len(items), BATCH_CHUNK):
+            lines = [json.dumps(r, default=_json_default)
+                     for r in predict_many(items[start:start + BATCH_CHUNK])]
+            self.wfile.write(('\n'.join(lines) + '\n').encode('utf-8'))
+            self.wfile.flush()
+        self.close_connection = True
+
+def _json_default(value):
+    """Serialize NumPy scalars produced by the predictor."""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def serve(host='127.0.0.1', port=8000):
+    """Load the roster and serve requests on a thread per connection."""
+    load_roster()
+    server = ThreadingHTTPServer((host, port), PredictionHandler)
+    server.daemon_threads = True
+    print(f"Serving predictions on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UFC prediction HTTP API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+    serve(args.host, args.port)
@@ -0,0 +1,242 @@
+"""
+Asyncio counterpart of src/http_client.py for resolving many pages or photos
+from a single thread: one event loop, hundreds of requests in flight.
+
+Same policies as the threaded client: per-host token-bucket rate limiting and
+concurrency caps, retries with full-jitter backoff on connection errors,
+timeouts and 429/5xx (honouring Retry-After), and a dead-letter list.
+Uses httpx.AsyncClient if installed, else aiohttp (one of the two is required).
+
+Usage:
+    async with AsyncHttpClient() as client:
+        pages = await gather_bounded([lambda u=u: client.get(u) for u in urls], limit=256)
+    results = run_sync(main())      # from synchronous code
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+import requests
+
+try:
+    from src.instrumentation import count
+    from src.http_client import (DEFAULT_HEADERS, RETRY_STATUSES, MAX_RETRIES, BACKOFF_BASE, BACKOFF_MAX,
+                                 DEFAULT_RATE, DEFAULT_BURST, parse_retry_after, backoff_delay)
+except ImportError:  # Imported by scripts run from inside src/
+    from instrumentation import count
+    from http_client import (DEFAULT_HEADERS, RETRY_STATUSES, MAX_RETRIES, BACKOFF_BASE, BACKOFF_MAX,
+                             DEFAULT_RATE, DEFAULT_BURST, parse_retry_after, backoff_delay)
+
+MAX_PER_HOST = 256      # In-flight requests per host (the rate limit usually binds first)
+GATHER_LIMIT = 256      # Default bound for gather_bounded
+
+def available_backend():
+    """'httpx' or 'aiohttp' (whichever is installed, httpx first), or None."""
+    for name in ('httpx', 'aiohttp'):
+        try:
+            __import__(name)
+            return name
+        except ImportError:
+            continue
+    return None
+
+class AsyncTokenBucket:
+    """Token bucket for one event loop; acquire() reserves a token and sleeps until it is due."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        if not self.rate:
+            return 0.0
+        # No await between reading and updating, so no lock is needed within one loop
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate) - 1
+        self.updated = now
+        if self.tokens >= 0:
+            return 0.0
+        wait = -self.tokens / self.rate
+        await asyncio.sleep(wait)
+        return wait
+
+class AsyncResponse:
+    """Backend-neutral response: status_code, headers, text, url."""
+
+    def __init__(self, url, status_code, headers, text):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} for url: {self.url}", response=self)
+
+class AsyncHttpClient:
+    """
+    Rate-limited, retrying asyncio HTTP client. Create and use it inside one
+    event loop (async with, or aclose() when done).
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, max_per_host=MAX_PER_HOST,
+                 retries=MAX_RETRIES, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX,
+                 headers=None, backend=None):
+        self.backend = backend or available_backend()
+        if self.backend is None:
+            raise RuntimeError("The async client needs the 'httpx' or 'aiohttp' package")
+        self.rate = rate
+        self.burst = burst
+        self.max_per_host = max_per_host
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.headers = dict(headers or DEFAULT_HEADERS)
+        self.dead_letters = []
+        self._session = None
+        self._buckets = {}
+        self._slots = {}
+        self._limits = {}
+
+    def set_host_limits(self, host, rate=None, burst=None, max_per_host=None):
+        """Override rate (req/s, 0 = unlimited), burst or concurrency for one host."""
+        limits = self._limits.setdefault(host, {})
+        for key, value in (('rate', rate), ('burst', burst), ('max_per_host', max_per_host)):
+            if value is not None:
+                limits[key] = value
+        self._buckets.pop(host, None)
+        self._slots.pop(host, None)
+
+    def _host_state(self, host):
+        if host not in self._buckets:
+            limits = self._limits.get(host, {})
+            self._buckets[host] = AsyncTokenBucket(limits.get('rate', self.rate), limits.get('burst', self.burst))
+            self._slots[host] = asyncio.Semaphore(limits.get('max_per_host', self.max_per_host))
+        return self._buckets[host], self._slots[host]
+
+    def _open(self):
+        if self._session is None:
+            if self.backend == 'httpx':
+                import httpx
+                limits = httpx.Limits(max_connections=None, max_keepalive_connections=self.max_per_host)
+                self._session = httpx.AsyncClient(headers=self.headers, limits=limits, follow_redirects=True)
+            else:
+                import aiohttp
+                connector = aiohttp.TCPConnector(limit=0, limit_per_host=self.max_per_host)
+                self._session = aiohttp.ClientSession(headers=self.headers, connector=connector)
+        return self._session
+
+    def _transport_errors(self):
+        if self.backend == 'httpx':
+            import httpx
+            return (httpx.TransportError, asyncio.TimeoutError)
+        import aiohttp
+        return (aiohttp.ClientError, asyncio.TimeoutError)
+
+    async def _fetch(self, url, timeout, headers):
+        session = self._open()
+        if self.backend == 'httpx':
+            resp = await session.get(url, timeout=timeout, headers=headers)
+            return AsyncResponse(url, resp.status_code, resp.headers, resp.text)
+        import aiohttp
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout), headers=headers) as resp:
+            return AsyncResponse(url, resp.status, resp.headers, await resp.text(errors='replace'))
+
+    async def get(self, url, timeout=15, retries=None, raise_for_status=True, dead_letter=True, headers=None):
+        """
+        GET with rate limiting and retries; same contract as HttpClient.get.
+        Returns the final AsyncResponse, raising after the last retry (or on other 4xx
+        unless raise_for_status=False).
+        """
+        retries = self.retries if retries is None else retries
+        bucket, slots = self._host_state(urlparse(url).netloc)
+        transport_errors = self._transport_errors()
+
+        attempt = 0
+        while True:
+            await bucket.acquire()
+            try:
+                async with slots:
+                    resp = await self._fetch(url, timeout, headers)
+                error = None
+            except transport_errors as e:
+                resp, error = None, e
+
+            if error is None and resp.status_code not in RETRY_STATUSES:
+                if raise_for_status:
+                    resp.raise_for_status()
+                return resp
+
+            if attempt >= retries:
+                if error is None:
+                    error = requests.HTTPError(f"{resp.status_code} after {attempt + 1} attempts: {url}",
+                                               response=resp)
+                if dead_letter:
+                    self._dead_letter(url, error, attempt + 1)
+                if raise_for_status or resp is None:
+                    raise error
+                return resp
+
+            count('http.retries')
+            await asyncio.sleep(self._retry_wait(attempt, resp))
+            attempt += 1
+
+    def _retry_wait(self, attempt, resp=None):
+        if resp is not None:
+            retry_after = parse_retry_after(resp.headers.get('Retry-After'))
+            if retry_after is not None:
+                return min(retry_after, self.backoff_max)
+        return backoff_delay(attempt, self.backoff_base, self.backoff_max)
+
+    def _dead_letter(self, url, error, attempts):
+        count('http.dead_letters')
+        self.dead_letters.append({
+            'url': url,
+            'error': str(error) or type(error).__name__,
+            'attempts': attempts,
+            'failed_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        })
+
+    def drain_dead_letters(self):
+        """Return and clear the dead-letter list."""
+        letters, self.dead_letters = self.dead_letters, []
+        return letters
+
+    async def aclose(self):
+        if self._session is not None:
+            if self.backend == 'httpx':
+                await self._session.aclose()
+            else:
+                await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+async def gather_bounded(calls, limit=GATHER_LIMIT, return_exceptions=False):
+    """
+    Await `calls` (zero-argument coroutine functions, or coroutines) with at most
+    `limit` running at once. Results come back in input order, like asyncio.gather.
+    """
+    semaphore = asyncio.BoundedSemaphore(limit)
+
+    async def run(call):
+        async with semaphore:
+            return await (call() if callable(call) else call)
+
+    return await asyncio.gather(*(run(call) for call in calls), return_exceptions=return_exceptions)
+
+def run_sync(coro):
+    """Run a coroutine to completion from synchronous code (in a helper thread if a loop is already running here)."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
@@ -0,0 +1,246 @@
+"""
+Change-data feed for the fighters tables.
+Each load (run_etl or merge_staging) snapshots the current fighters before it
+replaces them, diffs that against what it loaded, and appends one row per
+inserted / updated / removed fighter to `fighter_changes` under the new ETL
+data version. Updates carry the list of changed columns and the old and new
+weight class, so consumers can refresh only the affected fighters and divisions.
+
+Consumers either read by version (changes_since) or keep a named cursor:
+    subscribe('image_prefetch')                  # start at the current version
+    batch = poll('image_prefetch', wait=30)      # changes since the cursor, then advance it
+    affected(batch['changes'])                   # -> urls and divisions to refresh
+
+Usage:
+    python -m src.change_feed log --since 3
+    python -m src.change_feed poll image_prefetch
+"""
+import argparse
+import json
+import time
+import numpy as np
+from src.db_manager import get_connection
+from src.instrumentation import timed
+
+FIGHTER_COLUMNS = ['name', 'nickname', 'height_cm', 'reach_cm', 'stance', 'dob', 'weight_lbs', 'weight_class']
+STATS_COLUMNS = ['wins', 'losses', 'draws', 'sapm', 'slpm', 'str_acc', 'str_def',
+                 'td_avg', 'td_acc', 'td_def', 'sub_avg']
+TRACKED_COLUMNS = FIGHTER_COLUMNS + STATS_COLUMNS
+TEXT_COLUMNS = {'name', 'nickname', 'stance', 'dob', 'weight_class'}
+POLL_INTERVAL_S = 1.0
+
+@timed('change_feed.snapshot')
+def snapshot(conn):
+    """Current fighters keyed by URL (tracked columns only), taken before a load replaces them."""
+    import pandas as pd
+    columns = ", ".join([f"f.{c}" for c in FIGHTER_COLUMNS] + [f"s.{c}" for c in STATS_COLUMNS])
+    df = pd.read_sql_query(f"""
+        SELECT f.url, {columns} FROM fighters f
+        LEFT JOIN fighter_stats s ON s.fighter_id = f.id
+        WHERE f.url IS NOT NULL
+    """, conn)
+    return df.drop_duplicates('url', keep='last').set_index('url')
+
+def _text(value):
+    return value if isinstance(value, str) else None
+
+def _changed(old, new, col):
+    """Per-row inequality where two missing values count as equal."""
+    if col in TEXT_COLUMNS:
+        a = old[col].to_numpy(dtype=object)
+        b = new[col].to_numpy(dtype=object)
+        a_missing = old[col].isna().to_numpy()
+        b_missing = new[col].isna().to_numpy()
+        return (a_missing != b_missing) | (~a_missing & ~b_missing & (a != b))
+    import pandas as pd
+    a = pd.to_numeric(old[col], errors='coerce').to_numpy(dtype=float)
+    b = pd.to_numeric(new[col], errors='coerce').to_numpy(dtype=float)
+    return ~((a == b) | (np.isnan(a) & np.isnan(b)))
+
+def compute_diff(before, after):
+    """
+    Diff two snapshot() frames.
+    Returns: list of (url, name, change, changed_columns, weight_class, old_weight_class)
+    with change in 'insert' / 'update' / 'delete'.
+    """
+    rows = []
+    inserted = after.loc[after.index.difference(before.index)]
+    for url, name, weight_class in zip(inserted.index, inserted['name'], inserted['weight_class']):
+        rows.append((url, _text(name), 'insert', None, _text(weight_class), None))
+    removed = before.loc[before.index.difference(after.index)]
+    for url, name, weight_class in zip(removed.index, removed['name'], removed['weight_class']):
+        rows.append((url, _text(name), 'delete', None, None, _text(weight_class)))
+
+    common = after.index.intersection(before.index)
+    if len(common):
+        old = before.loc[common]
+        new = after.loc[common]
+        changed = np.column_stack([_changed(old, new, col) for col in TRACKED_COLUMNS])
+        columns = np.array(TRACKED_COLUMNS)
+        names = new['name'].to_numpy(dtype=object)
+        new_classes = new['weight_class'].to_numpy(dtype=object)
+        old_classes = old['weight_class'].to_numpy(dtype=object)
+        for i in np.flatnonzero(changed.any(axis=1)):
+            rows.append((common[i], _text(names[i]), 'update', columns[changed[i]].tolist(),
+                         _text(new_classes[i]), _text(old_classes[i])))
+    return rows
+
+def _current_etl_version(conn):
+    row = conn.execute("SELECT value FROM meta WHERE key = 'etl_version'").fetchone()
+    return int(row[0]) if row else 0
+
+@timed('change_feed.record_changes')
+def record_changes(conn, before):
+    """
+    Diff the freshly loaded fighters against `before` and append the changes under
+    the current ETL version (call after bump_data_version; the caller commits).
+    Returns: summary dict with version, inserted, updated, removed and divisions.
+    """
+    version = _current_etl_version(conn)
+    rows = compute_diff(before, snapshot(conn))
+    conn.executemany("""
+        INSERT OR REPLACE INTO fighter_changes
+            (version, url, name, change, changed_columns, weight_class, old_weight_class)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, [(version, url, name, change, json.dumps(cols) if cols else None, wc, old_wc)
+          for url, name, change, cols, wc, old_wc in rows])
+    kinds = [row[2] for row in rows]
+    summary = {
+        'version': version,
+        'inserted': kinds.count('insert'),
+        'updated': kinds.count('update'),
+        'removed': kinds.count('delete'),
+        'divisions': sorted({wc for row in rows for wc in row[4:6] if wc}),
+    }
+    print(f"Change feed v{version}: {summary['inserted']} inserted, {summary['updated']} updated, "
+          f"{summary['removed']} removed ({len(summary['divisions'])} divisions affected).")
+    return summary
+
+# --- Consumer API --------------------------------------------------------------
+
+def _with_conn(fn, conn=None):
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
+    try:
+        return fn(conn)
+    finally:
+        if own_conn:
+            conn.close()
+
+def latest_version(conn=None):
+    """Highest ETL version (0 before the first load)."""
+    return _with_conn(_current_etl_version, conn)
+
+def _read_changes(conn, where, params, limit=None):
+    query = f"""
+        SELECT version, url, name, change, changed_columns, weight_class, old_weight_class
+        FROM fighter_changes WHERE {where} ORDER BY version, url
+    """
+    if limit is not None:
+        query += " LIMIT ?"
+        params += (limit,)
+    return [{'version': v, 'url': url, 'name': name, 'change': change,
+             'changed_columns': json.loads(cols) if cols else [],
+             'weight_class': wc, 'old_weight_class': old_wc}
+            for v, url, name, change, cols, wc, old_wc in conn.execute(query, params)]
+
+def changes_since(version, limit=None, conn=None):
+    """
+    Changes with version > `version`, oldest first (at most about `limit` rows).
+    Returns: dict with 'version' (the latest version covered by 'changes') and 'changes'.
+    """
+    def read(conn):
+        latest = _current_etl_version(conn)
+        changes = _read_changes(conn, "version > ?", (version,), limit)
+        covered = latest
+        if limit is not None and len(changes) == limit:
+            # Pages end on a version boundary so a cursor never skips half a version
+            last = changes[-1]['version']
+            complete = [c for c in changes if c['version'] < last]
+            if complete:
+                changes, covered = complete, last - 1
+            else:
+                changes, covered = _read_changes(conn, "version = ?", (last,)), last
+        return {'version': max(covered, version), 'changes': changes}
+    return _with_conn(read, conn)
+
+def subscribe(name, from_version=None, conn=None):
+    """Register a named consumer; its cursor starts at `from_version` (default: now). Returns the cursor."""
+    def register(conn):
+        start = _current_etl_version(conn) if from_version is None else from_version
+        conn.execute("""
+            INSERT OR IGNORE INTO change_subscribers (name, version, updated_at)
+            VALUES (?, ?, datetime('now'))
+        """, (name, start))
+        conn.commit()
+        return conn.execute("SELECT version FROM change_subscribers WHERE name = ?", (name,)).fetchone()[0]
+    return _with_conn(register, conn)
+
+def ack(name, version, conn=None):
+    """Advance a consumer's cursor to `version` (never backwards)."""
+    def advance(conn):
+        conn.execute("""
+            UPDATE change_subscribers SET version = MAX(version, ?), updated_at = datetime('now')
+            WHERE name = ?
+        """, (version, name))
+        conn.commit()
+    _with_conn(advance, conn)
+
+def poll(name, wait=0.0, auto_ack=True, limit=None):
+    """
+    Changes since consumer `name`'s cursor (subscribing it at the current version if new).
+    wait: seconds to keep polling while nothing has changed. With auto_ack the cursor
+    moves past the returned changes; otherwise call ack() once they are processed.
+    """
+    cursor = subscribe(name)
+    deadline = time.monotonic() + wait
+    while True:
+        batch = changes_since(cursor, limit)
+        if batch['changes'] or time.monotonic() >= deadline:
+            break
+        time.sleep(POLL_INTERVAL_S)
+    if auto_ack and batch['version'] > cursor:
+        ack(name, batch['version'])
+    return batch
+
+def affected(changes):
+    """URLs to refresh, URLs to drop, and divisions touched by a list of changes."""
+    refresh = sorted({c['url'] for c in changes if c['change'] != 'delete'})
+    removed = sorted({c['url'] for c in changes if c['change'] == 'delete'})
+    divisions = sorted({wc for c in changes for wc in (c['weight_class'], c['old_weight_class']) if wc})
+    return {'refresh': refresh, 'removed': removed, 'divisions': divisions}
+
+def prune(before_version, conn=None):
+    """Delete change rows older than `before_version`; returns how many were removed."""
+    def delete(conn):
+        removed = conn.execute("DELETE FROM fighter_changes WHERE version < ?", (before_version,)).rowcount
+        conn.commit()
+        return removed
+    return _with_conn(delete, conn)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fighter change-data feed")
+    sub = parser.add_subparsers(dest='command', required=True)
+    log_cmd = sub.add_parser('log', help="Print changes after a version")
+    log_cmd.add_argument('--since', type=int, default=None, help="Default: the previous version")
+    log_cmd.add_argument('--limit', type=int, default=None)
+    poll_cmd = sub.add_parser('poll', help="Changes since a named consumer's cursor (advances it)")
+    poll_cmd.add_argument('name')
+    poll_cmd.add_argument('--wait', type=float, default=0.0)
+    prune_cmd = sub.add_parser('prune', help="Drop change rows older than a version")
+    prune_cmd.add_argument('before', type=int)
+    args = parser.parse_args()
+
+    if args.command == 'prune':
+        print(f"Removed {prune(args.before)} change rows.")
+    else:
+        if args.command == 'log':
+            since = args.since if args.since is not None else max(latest_version() - 1, 0)
+            batch = changes_since(since, args.limit)
+        else:
+            batch = poll(args.name, wait=args.wait)
+        for c in batch['changes']:
+            detail = ", ".join(c['changed_columns']) if c['change'] == 'update' else ''
+            print(f"  v{c['version']:<5}{c['change']:<8}{c['name'] or c['url']:<32}{c['weight_class'] or '':<20}{detail}")
+        print(f"{len(batch['changes'])} changes, up to version {batch['version']}.")
@@ -1,12 +1,41 @@
 """
 Consolidates multiple scraper output CSVs into a single master file.
+
+Two modes:
+- default: read every CSV fully, concat, dedupe by URL, sort by Name.
+- streaming (--streaming): bounded memory. Inputs are read in chunks, duplicates
+  are resolved through 64-bit URL hashes (last-seen wins, ordered by scrape
+  timestamp if present, else file mtime), and the output is written by an
+  external merge of sorted runs. The master file is never one of its own inputs.
 """
 import pandas as pd
+import numpy as np
 import os
 import glob
+import csv
+import heapq
+import shutil
+import tempfile
+
+try:
+    from src.instrumentation import timed, timer
+except ImportError:  # Run as a script from inside src/
+    from instrumentation import timed, timer
+
+MASTER_NAME = 'fighters_master.csv'
+CHUNK_SIZE = 50000      # Rows per chunk / sorted run in streaming mode
+MERGE_FAN_IN = 64       # Max runs merged at once (bounds open file handles)
+TIMESTAMP_COLUMN = 'ScrapedAt'
+
+def _default_data_dir():
+    return os.path.join(os.path.dirname(__file__), '..', 'data')
 
-def consolidate():
-    data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
+@timed('consolidate')
+def consolidate(data_dir=None, streaming=False, chunksize=CHUNK_SIZE):
+    if streaming:
+        return consolidate_streaming(data_dir, chunksize)
+    if data_dir is None:
+        data_dir = _default_data_dir()
     data_dir = os.path.normpath(data_dir)
     
     # Find all fighter CSVs
@@ -32,8 +61,11 @@ def consolidate():
     # Combine
     master_df = pd.concat(dfs, ignore_index=True)
     
-    # Drop duplicates (based on URL)
+    # Drop duplicates (based on URL), keeping the most recently scraped copy
     before = len(master_df)
+    if TIMESTAMP_COLUMN in master_df.columns:
+        master_df.sort_values(TIMESTAMP_COLUMN, key=lambda ts: pd.to_datetime(ts, errors='coerce', utc=True),
+                              kind='stable', na_position='first', inplace=True)
     master_df.drop_duplicates(subset=['URL'], keep='last', inplace=True)
     after = len(master_df)
     print(f"Combined {before} records into {after} unique fighters.")
@@ -43,7 +75,8 @@ def consolidate():
     
     # Save master
     master_path = os.path.join(data_dir, 'fighters_master.csv')
-    master_df.to_csv(master_path, index=False)
+    with timer('consolidate.csv_write'):
+        master_df.to_csv(master_path, index=False)
     print(f"Saved master file to {master_path}")
     
     # Cleanup (Optional - maybe keep them for backup? Let's keep for now)
@@ -51,5 +84,140 @@ def consolidate():
     #     if f != master_path:
     #         os.remove(f)
 
+def _ordered_inputs(data_dir):
+    """Shard CSVs (master excluded), oldest first so later files win duplicates."""
+    master_path = os.path.join(data_dir, MASTER_NAME)
+    files = [f for f in glob.glob(os.path.join(data_dir, 'fighters*.csv'))
+             if os.path.normpath(f) != os.path.normpath(master_path)]
+    return sorted(files, key=lambda f: (os.path.getmtime(f), os.path.basename(f)))
+
+def _read_chunks(path, chunksize):
+    """Chunks as raw strings so values round-trip byte-for-byte."""
+    return pd.read_csv(path, chunksize=chunksize, dtype=str, keep_default_na=False)
+
+def _sort_key(row, name_pos):
+    # Blank names sort last, matching pandas' NaN placement
+    name = row[name_pos]
+    return (name == '', name)
+
+def _merge_runs(run_paths, out_path, columns):
+    """k-way merge of Name-sorted run files into out_path."""
+    name_pos = columns.index('Name')
+    handles = [open(p, newline='', encoding='utf-8') for p in run_paths]
+    try:
+        readers = []
+        for h in handles:
+            reader = csv.reader(h)
+            next(reader, None)  # header
+            readers.append(reader)
+        with open(out_path, 'w', newline='', encoding='utf-8') as out:
+            writer = csv.writer(out)
+            writer.writerow(columns)
+            writer.writerows(heapq.merge(*readers, key=lambda r: _sort_key(r, name_pos)))
+    finally:
+        for h in handles:
+            h.close()
+
+@timed('consolidate.streaming')
+def consolidate_streaming(data_dir=None, chunksize=CHUNK_SIZE):
+    """
+    Memory-bounded consolidation. Memory holds ~24 bytes per input row
+    (URL hash, position, timestamp) plus one chunk; output equals the
+    default mode's dedupe-by-URL and sort-by-Name.
+    """
+    if data_dir is None:
+        data_dir = _default_data_dir()
+    data_dir = os.path.normpath(data_dir)
+    master_path = os.path.join(data_dir, MASTER_NAME)
+
+    csv_files = _ordered_inputs(data_dir)
+    if not csv_files:
+        print("No fighter CSVs found to consolidate.")
+        return
+    print(f"Found {len(csv_files)} files: {[os.path.basename(f) for f in csv_files]}")
+
+    # Union of columns, in first-seen order
+    columns = []
+    for f in csv_files:
+        for col in pd.read_csv(f, nrows=0).columns:
+            if col not in columns:
+                columns.append(col)
+    if 'URL' not in columns or 'Name' not in columns:
+        print("Error: inputs need 'URL' and 'Name' columns.")
+        return
+
+    # Pass 1: hash every URL and remember which global row position wins
+    hashes, positions, stamps = [], [], []
+    offset = 0
+    for f in csv_files:
+        mtime = os.path.getmtime(f)
+        for chunk in _read_chunks(f, chunksize):
+            n = len(chunk)
+            hashes.append(pd.util.hash_pandas_object(chunk['URL'], index=False).to_numpy())
+            positions.append(np.arange(offset, offset + n, dtype=np.int64))
+            if TIMESTAMP_COLUMN in chunk.columns:
+                ts = pd.to_datetime(chunk[TIMESTAMP_COLUMN], errors='coerce', utc=True)
+                # Unit-independent epoch seconds (pandas may parse to ns or us resolution)
+                ts = ((ts - pd.Timestamp(0, tz='UTC')) / pd.Timedelta(seconds=1)).fillna(mtime).to_numpy(dtype=float)
+            else:
+                ts = np.full(n, mtime)
+            stamps.append(ts)
+            offset += n
+    before = offset
+    if before == 0:
+        return
+
+    hashes = np.concatenate(hashes)
+    positions = np.concatenate(positions)
+    stamps = np.concatenate(stamps)
+
+    # Last-seen wins: order by (timestamp, position), then take each hash's final occurrence
+    order = np.lexsort((positions, stamps))[::-1]
+    _, first = np.unique(hashes[order], return_index=True)
+    keep = np.sort(positions[order[first]])
+    del hashes, positions, stamps, order
+
+    tmp_dir = tempfile.mkdtemp(prefix='consolidate_')
+    try:
+        # Pass 2: write each chunk's surviving rows as a Name-sorted run
+        runs = []
+        offset = 0
+        for f in csv_files:
+            for chunk in _read_chunks(f, chunksize):
+                n = len(chunk)
+                lo, hi = np.searchsorted(keep, [offset, offset + n])
+                offset += n
+                if lo == hi:
+                    continue
+                rows = chunk.iloc[keep[lo:hi] - (offset - n)].reindex(columns=columns, fill_value='')
+                rows = rows.assign(_blank=rows['Name'].eq('')) \
+                           .sort_values(['_blank', 'Name'], kind='stable') \
+                           .drop(columns='_blank')
+                run_path = os.path.join(tmp_dir, f"run{len(runs):05d}.csv")
+                rows.to_csv(run_path, index=False)
+                runs.append(run_path)
+
+        # Multi-level merge keeps open files <= MERGE_FAN_IN
+        level = 0
+        while len(runs) > MERGE_FAN_IN:
+            merged = []
+            for i in range(0, len(runs), MERGE_FAN_IN):
+                out = os.path.join(tmp_dir, f"merge{level}_{i:05d}.csv")
+                _merge_runs(runs[i:i + MERGE_FAN_IN], out, columns)
+                merged.append(out)
+            runs = merged
+            level += 1
+
+        tmp_master = os.path.join(tmp_dir, MASTER_NAME)
+        with timer('consolidate.csv_write'):
+            _merge_runs(runs, tmp_master, columns)
+            shutil.move(tmp_master, master_path)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print(f"Combined {before} records into {len(keep)} unique fighters.")
+    print(f"Saved master file to {master_path}")
+
 if __name__ == "__main__":
-    consolidate()
+    import sys
+    consolidate(streaming='--streaming' in sys.argv[1:])
@@ -1,5 +1,6 @@
 import sqlite3
 import os
+from pathlib import Path
 
 DB_NAME = "ufc_data.db"
 
@@ -7,6 +8,13 @@ def get_connection():
     """Returns a connection to the SQLite database."""
     return sqlite3.connect(DB_NAME)
 
+def get_readonly_connection():
+    """Returns a connection that cannot modify the SQLite database."""
+    uri = Path(DB_NAME).resolve().as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True)
+    conn.execute("PRAGMA query_only = ON;")
+    return conn
+
 def init_db():
     """Initializes the database with the schema."""
     conn = get_connection()
@@ -51,9 +59,146 @@ def init_db():
     );
     """)
     
+    # 3. Metadata (ETL data version and load timestamp)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+    """)
+    
+    # 4. Saved Inspector queries, materialized as mv_<name> tables
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS saved_queries (
+        name TEXT PRIMARY KEY,
+        sql TEXT NOT NULL,
+        created_at TEXT,
+        refreshed_at TEXT,
+        row_count INTEGER
+    );
+    """)
+    
+    # 5. Staging table for raw scraped records (scraper -> SQLite sink)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS staging_fighters (
+        name TEXT,
+        nickname TEXT,
+        wins INTEGER,
+        losses INTEGER,
+        draws INTEGER,
+        height_cm REAL,
+        weight_lbs INTEGER,
+        reach_cm REAL,
+        stance TEXT,
+        dob TEXT,
+        slpm REAL,
+        str_acc REAL,
+        sapm REAL,
+        str_def REAL,
+        td_avg REAL,
+        td_acc REAL,
+        td_def REAL,
+        sub_avg REAL,
+        url TEXT,
+        scraped_at TEXT
+    );
+    """)
+    
+    # 6. Bout history (one row per fight, from fighter pages' fight-history tables)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS bouts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        fight_key TEXT NOT NULL UNIQUE,
+        event TEXT,
+        event_date TEXT NOT NULL,
+        fighter_a_url TEXT NOT NULL,
+        fighter_b_url TEXT NOT NULL,
+        score_a REAL
+    );
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_bouts_date ON bouts (event_date)")
+    
+    # 7. Elo / Glicko-2 ratings, keyed by ufcstats URL so they survive ETL reloads
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS fighter_ratings (
+        url TEXT PRIMARY KEY,
+        elo REAL,
+        glicko REAL,
+        rd REAL,
+        volatility REAL,
+        bouts INTEGER,
+        last_event_date TEXT
+    );
+    """)
+    
+    # 8. Change-data feed: one row per inserted/updated/removed fighter per ETL version
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS fighter_changes (
+        version INTEGER NOT NULL,
+        url TEXT NOT NULL,
+        name TEXT,
+        change TEXT NOT NULL,
+        changed_columns TEXT,
+        weight_class TEXT,
+        old_weight_class TEXT,
+        PRIMARY KEY (version, url)
+    );
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS change_subscribers (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL,
+        updated_at TEXT
+    );
+    """)
+    
+    # 9. Indexes behind the paginated roster table and fighter pages (src/roster_table.py):
+    #    filters, keyset sort keys, the stats join and per-fighter lookups
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_fighters_url ON fighters (url)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_fighters_class_name ON fighters (weight_class, name)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_fighters_stance ON fighters (stance)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_fighters_height ON fighters (height_cm)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_fighters_reach ON fighters (reach_cm)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_stats_fighter ON fighter_stats (fighter_id)")
+    for column in ('wins', 'losses', 'slpm', 'str_acc', 'sapm', 'str_def', 'td_avg', 'td_acc', 'td_def', 'sub_avg'):
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_stats_{column} ON fighter_stats ({column})")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_bouts_fighter_a ON bouts (fighter_a_url, event_date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_bouts_fighter_b ON bouts (fighter_b_url, event_date)")
+    
     conn.commit()
     conn.close()
     print(f"Database {DB_NAME} initialized successfully.")
 
+def bump_data_version(conn):
+    """Increments the ETL data version and records the load time (caller commits)."""
+    conn.execute("""
+        INSERT INTO meta (key, value) VALUES ('etl_version', '1')
+        ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+    """)
+    conn.execute("""
+        INSERT INTO meta (key, value) VALUES ('etl_loaded_at', datetime('now'))
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value
+    """)
+
+def get_data_version():
+    """
+    Returns a token that changes whenever the database contents change:
+    the ETL version combined with the file's mtime and size.
+    """
+    if not os.path.exists(DB_NAME):
+        return None
+    stat = os.stat(DB_NAME)
+    etl_version = 0
+    conn = get_readonly_connection()
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'etl_version'").fetchone()
+        if row:
+            etl_version = int(row[0])
+    except sqlite3.Error:
+        pass  # Database predates the meta table
+    finally:
+        conn.close()
+    return f"{etl_version}:{stat.st_mtime_ns}:{stat.st_size}"
+
 if __name__ == "__main__":
     init_db()
@@ -1,35 +1,56 @@
 import pandas as pd
 import sqlite3
 import os
-from src.db_manager import init_db, get_connection, DB_NAME
+from src.db_manager import init_db, get_connection, bump_data_version, DB_NAME
 from src.processor import clean_fighters
+from src.saved_queries import refresh_all as refresh_saved_queries
+from src.similarity import update_index as update_similarity_index
+from src.change_feed import snapshot, record_changes
+from src.validation import validate, write_report, format_report, MAX_FAILURE_RATE
+from src.instrumentation import timed, timer
 
-def run_etl():
+@timed('etl.run_etl')
+def run_etl(csv_path='data/fighters_master.csv', max_failure_rate=MAX_FAILURE_RATE):
     """
     Extracts data from CSV, Transforms it, and Loads it into SQLite.
+    The extracted frame is validated first: rows failing a rule are dropped, and
+    the load is blocked (database untouched) when more than max_failure_rate of
+    rows fail validation or insertion. Returns the number of fighters loaded, or None.
     """
     # 1. Init DB
     init_db()
     
     # 2. Extract
-    csv_path = 'data/fighters_master.csv'
     if not os.path.exists(csv_path):
         print(f"Error: {csv_path} not found.")
         return
 
     print("Extracting data from CSV...")
-    df = pd.read_csv(csv_path)
+    with timer('etl.extract'):
+        df = pd.read_csv(csv_path)
     
-    # 3. Transform
+    # 3. Validate (before cleaning, so gaps that get median-filled are still visible)
+    report, rejected = validate(df, max_failure_rate)
+    write_report(report)
+    print(format_report(report))
+    if not report['passed']:
+        print("Load blocked by validation; database left unchanged.")
+        return None
+    df = df[~rejected]
+    
+    # 4. Transform
     print("Cleaning and Transforming data...")
     # Use the processor's cleaning logic (imputation, normalization)
     df = clean_fighters(df)
     
-    # 4. Load
+    # 5. Load
     print("Loading data into SQLite...")
     conn = get_connection()
     cursor = conn.cursor()
     
+    # Current contents, diffed against the new load for the change feed
+    before = snapshot(conn)
+    
     # Clear existing data to avoid duplicates on re-run
     cursor.execute("DELETE FROM fighter_stats")
     cursor.execute("DELETE FROM fighters")
@@ -49,42 +70,63 @@ def run_etl():
     """
 
     count = 0
-    for _, row in df.iterrows():
-        try:
-            # Insert into fighters table
-            cursor.execute(insert_fighter_sql, (
-                row['Name'], 
-                row.get('Nickname', None), 
-                row['Height_cm'], 
-                row['Reach_cm'], 
-                row['Stance'], 
-                row.get('DOB', None),
-                row.get('Weight_lbs', None),
-                row.get('WeightClass', None),
-                row['URL']
-            ))
+    failed = 0
+    with timer('etl.insert', rows=len(df)):
+        for _, row in df.iterrows():
+            try:
+                # Insert into fighters table
+                cursor.execute(insert_fighter_sql, (
+                    row['Name'], 
+                    row.get('Nickname', None), 
+                    row['Height_cm'], 
+                    row['Reach_cm'], 
+                    row['Stance'], 
+                    row.get('DOB', None),
+                    row.get('Weight_lbs', None),
+                    row.get('WeightClass', None),
+                    row['URL']
+                ))
             
-            fighter_id = cursor.lastrowid
+                fighter_id = cursor.lastrowid
             
-            # Insert into stats table
-            cursor.execute(insert_stats_sql, (
-                fighter_id,
-                row['Wins'], row['Losses'], row['Draws'],
-                row['SApM'], row['SLpM'], row['Str_Acc'], row['Str_Def'],
-                row['TD_Avg'], row['TD_Acc'], row['TD_Def'], row['Sub_Avg']
-            ))
-            count += 1
+                # Insert into stats table
+                cursor.execute(insert_stats_sql, (
+                    fighter_id,
+                    row['Wins'], row['Losses'], row['Draws'],
+                    row['SApM'], row['SLpM'], row['Str_Acc'], row['Str_Def'],
+                    row['TD_Avg'], row['TD_Acc'], row['TD_Def'], row['Sub_Avg']
+                ))
+                count += 1
             
-        except sqlite3.IntegrityError:
-            print(f"Skipping duplicate: {row['Name']}")
-        except KeyError as e:
-            print(f"Missing column {e} for {row['Name']}")
-        except Exception as e:
-            print(f"Error inserting {row['Name']}: {e}")
+            except sqlite3.IntegrityError:
+                print(f"Skipping duplicate: {row['Name']}")
+            except KeyError as e:
+                failed += 1
+                print(f"Missing column {e} for {row['Name']}")
+            except Exception as e:
+                failed += 1
+                print(f"Error inserting {row['Name']}: {e}")
+
+    # Same threshold for inserts: a run where most rows error out must not replace the data
+    if count == 0 or failed > max_failure_rate * len(df):
+        conn.rollback()
+        conn.close()
+        print(f"ETL FAILED: {failed} of {len(df)} inserts failed; rolled back, database left unchanged.")
+        return None
 
+    bump_data_version(conn)
+    record_changes(conn, before)
     conn.commit()
+    
+    # 6. Rebuild materialized Inspector queries against the fresh data
+    refresh_saved_queries(conn)
+    
     conn.close()
     print(f"ETL Complete! Loaded {count} fighters into {DB_NAME}")
+    
+    # 7. Refresh the style-comps k-NN index (only changed weight classes are rebuilt)
+    update_similarity_index()
+    return count
 
 if __name__ == "__main__":
     run_etl()
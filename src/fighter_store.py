@@ -0,0 +1,168 @@
+"""
+Compact, read-only fighter store.
+Numeric stats live in one contiguous NumPy structured array indexed by integer id;
+names, URLs and other text sit in plain lists, and categorical fields (stance,
+weight class) are small integer codes into a vocabulary. Fighters come back as
+__slots__ records that predict_matchup accepts in place of pandas rows.
+
+Usage:
+    store = FighterStore.from_frame(clean_fighters(load_fighters()))
+    a = store.record(store.id_of("Israel Adesanya"))
+    print(store.memory_report(df))
+"""
+import sys
+import numpy as np
+
+NUMERIC_FIELDS = ['Height_cm', 'Reach_cm', 'Weight_lbs', 'Wins', 'Losses', 'Draws',
+                  'SApM', 'SLpM', 'Str_Acc', 'Str_Def', 'TD_Avg', 'TD_Acc', 'TD_Def', 'Sub_Avg',
+                  'TotalFights', 'WinRate', 'FinishPotential', 'Rating', 'RatingRD']
+CATEGORICAL_FIELDS = ['Stance', 'WeightClass']
+TEXT_FIELDS = ['Name', 'Nickname', 'URL', 'DOB']
+
+STATS_DTYPE = np.dtype([(field, np.float64) for field in NUMERIC_FIELDS])
+
+def _text(value):
+    return value if isinstance(value, str) else None
+
+class FighterRecord:
+    """One fighter's fields as attributes; supports row['Name'] and row.get('SLpM', 0) like a Series."""
+    __slots__ = ['id'] + TEXT_FIELDS + CATEGORICAL_FIELDS + NUMERIC_FIELDS
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self):
+        return f"FighterRecord(id={self.id}, Name={self.Name!r})"
+
+class FighterStore:
+    """Fighters by integer id (0..n-1, in the order of the source frame)."""
+    __slots__ = ('stats', 'text', 'codes', 'vocab', '_ids', '_records')
+
+    def __init__(self, stats, text, codes, vocab):
+        self.stats = stats          # structured array, one row per fighter
+        self.text = text            # field -> list of str/None
+        self.codes = codes          # field -> int8 array of vocabulary codes (-1 = missing)
+        self.vocab = vocab          # field -> list of category values
+        self._ids = {}
+        for i, (name, url) in enumerate(zip(text['Name'], text['URL'])):
+            for key in (name, url):
+                if key:
+                    self._ids[key.strip().lower()] = i  # last wins, like build_fighter_index
+        self._records = [None] * len(stats)
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build a store from a cleaned fighters DataFrame (missing columns become NaN/None)."""
+        import pandas as pd
+        n = len(df)
+        stats = np.empty(n, dtype=STATS_DTYPE)
+        for field in NUMERIC_FIELDS:
+            if field in df.columns:
+                stats[field] = pd.to_numeric(df[field], errors='coerce').to_numpy(dtype=np.float64)
+            else:
+                stats[field] = np.nan
+        text = {field: [_text(v) for v in df[field]] if field in df.columns else [None] * n
+                for field in TEXT_FIELDS}
+        codes, vocab = {}, {}
+        for field in CATEGORICAL_FIELDS:
+            if field in df.columns:
+                field_codes, uniques = pd.factorize(df[field], sort=True)
+                codes[field] = field_codes.astype(np.int8 if len(uniques) < 128 else np.int32)
+                vocab[field] = list(uniques)
+            else:
+                codes[field] = np.full(n, -1, dtype=np.int8)
+                vocab[field] = []
+        return cls(stats, text, codes, vocab)
+
+    def __len__(self):
+        return len(self.stats)
+
+    def id_of(self, key):
+        """Id for a fighter name or ufcstats URL (case-insensitive), or None."""
+        if not isinstance(key, str):
+            return None
+        return self._ids.get(key.strip().lower())
+
+    def record(self, fighter_id):
+        """FighterRecord for an id; built once and reused."""
+        rec = self._records[fighter_id]
+        if rec is None:
+            rec = FighterRecord()
+            rec.id = fighter_id
+            for field in TEXT_FIELDS:
+                setattr(rec, field, self.text[field][fighter_id])
+            for field in CATEGORICAL_FIELDS:
+                code = self.codes[field][fighter_id]
+                setattr(rec, field, self.vocab[field][code] if code >= 0 else None)
+            row = self.stats[fighter_id]
+            for field in NUMERIC_FIELDS:
+                # np.float64 scalars, like a pandas row, so results round identically
+                setattr(rec, field, row[field])
+            self._records[fighter_id] = rec
+        return rec
+
+    def column(self, field):
+        """NumPy view of a numeric field, or the decoded values of a text/categorical field."""
+        if field in NUMERIC_FIELDS:
+            return self.stats[field]
+        if field in CATEGORICAL_FIELDS:
+            vocab = np.array(self.vocab[field] + [None], dtype=object)
+            return vocab[self.codes[field]]
+        return self.text[field]
+
+    def to_frame(self, columns=None):
+        """Rebuild a fighters DataFrame (RangeIndex) from the store, optionally in a given column order."""
+        import pandas as pd
+        fields = columns or (TEXT_FIELDS + CATEGORICAL_FIELDS + NUMERIC_FIELDS)
+        data = {}
+        for field in fields:
+            if field in NUMERIC_FIELDS:
+                data[field] = np.array(self.stats[field])
+            elif field in CATEGORICAL_FIELDS or field in TEXT_FIELDS:
+                data[field] = self.column(field)
+        return pd.DataFrame(data)
+
+    def ids_where(self, field, value):
+        """Ids whose categorical field equals value."""
+        if value not in self.vocab[field]:
+            return np.array([], dtype=np.int64)
+        return np.flatnonzero(self.codes[field] == self.vocab[field].index(value))
+
+    def nbytes(self):
+        """Approximate memory held by the store (arrays, strings and lists; records excluded)."""
+        total = self.stats.nbytes
+        total += sum(arr.nbytes for arr in self.codes.values())
+        total += sum(sys.getsizeof(v) for values in self.vocab.values() for v in values)
+        for values in self.text.values():
+            total += sys.getsizeof(values) + sum(sys.getsizeof(v) for v in values if v is not None)
+        total += sys.getsizeof(self._ids)
+        return total
+
+    def memory_report(self, df=None):
+        """Store footprint, optionally compared with the DataFrame it was built from."""
+        report = {'fighters': len(self), 'store_bytes': self.nbytes(),
+                  'numeric_bytes': int(self.stats.nbytes)}
+        if df is not None:
+            frame_bytes = int(df.memory_usage(deep=True).sum())
+            report['dataframe_bytes'] = frame_bytes
+            report['ratio'] = round(frame_bytes / report['store_bytes'], 2)
+        return report
+
+if __name__ == "__main__":
+    from src.processor import load_fighters, clean_fighters
+    df = clean_fighters(load_fighters())
+    store = FighterStore.from_frame(df)
+    report = store.memory_report(df)
+    print(f"{report['fighters']} fighters")
+    print(f"  DataFrame:    {report['dataframe_bytes'] / 1024:,.0f} KiB")
+    print(f"  FighterStore: {report['store_bytes'] / 1024:,.0f} KiB "
+          f"(numeric block {report['numeric_bytes'] / 1024:,.0f} KiB, {report['ratio']}x smaller)")
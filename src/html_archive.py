@@ -0,0 +1,213 @@
+"""
+Raw HTML archive for scraped pages.
+Every fetched page body is stored compressed (zstd if the `zstandard` package
+is installed, else gzip) in a single SQLite file, indexed by URL and fetch time.
+When parsing logic changes, `reparse` rebuilds all fighter records offline from
+the archive in parallel instead of re-scraping the site.
+
+Usage:
+    python src/scraper.py --archive a b c              # archive while scraping
+    python -m src.html_archive stats
+    python -m src.html_archive reparse -o data/fighters_reparsed.csv --workers 8
+    python -m src.html_archive reparse --sqlite        # straight into ufc_data.db
+"""
+import argparse
+import gzip
+import os
+import sqlite3
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARCHIVE_PATH = os.path.join('data', 'html_archive.db')
+COMMIT_EVERY = 100      # Pages per transaction while archiving
+REPARSE_CHUNK = 200     # Pages handed to a worker at a time
+
+def compress(text):
+    """Compress a page body; returns (codec, blob)."""
+    raw = text.encode('utf-8')
+    if zstandard is not None:
+        return 'zstd', zstandard.ZstdCompressor(level=10).compress(raw)
+    return 'gzip', gzip.compress(raw, compresslevel=6)
+
+def decompress(codec, blob):
+    """Inverse of compress()."""
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("Archive contains zstd pages; install the 'zstandard' package")
+        return zstandard.ZstdDecompressor().decompress(blob).decode('utf-8')
+    return gzip.decompress(blob).decode('utf-8')
+
+class HtmlArchive:
+    """Append-only store of compressed pages keyed by (url, fetched_at)."""
+
+    def __init__(self, path=ARCHIVE_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                fetched_at TEXT NOT NULL,
+                status INTEGER,
+                codec TEXT NOT NULL,
+                raw_size INTEGER,
+                body BLOB NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_url_time ON pages (url, fetched_at)")
+        self.conn.commit()
+        self._pending = 0
+
+    def put(self, url, html, status=200):
+        """Store one fetched page."""
+        codec, blob = compress(html)
+        stamp = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        self.conn.execute(
+            "INSERT INTO pages (url, fetched_at, status, codec, raw_size, body) VALUES (?, ?, ?, ?, ?, ?)",
+            (url, stamp, status, codec, len(html), blob))
+        self._pending += 1
+        if self._pending >= COMMIT_EVERY:
+            self.commit()
+
+    def commit(self):
+        self.conn.commit()
+        self._pending = 0
+
+    def absorb(self, path):
+        """Append every page from another archive file (e.g. a scrape shard's), then delete that file."""
+        self.commit()
+        self.conn.execute("ATTACH DATABASE ? AS other", (path,))
+        try:
+            moved = self.conn.execute("""
+                INSERT INTO pages (url, fetched_at, status, codec, raw_size, body)
+                SELECT url, fetched_at, status, codec, raw_size, body FROM other.pages ORDER BY id
+            """).rowcount
+            self.conn.commit()
+        finally:
+            self.conn.execute("DETACH DATABASE other")
+        os.remove(path)
+        return moved
+
+    def latest(self, url):
+        """Most recent archived HTML for a URL, or None."""
+        row = self.conn.execute(
+            "SELECT codec, body FROM pages WHERE url = ? ORDER BY fetched_at DESC, id DESC LIMIT 1",
+            (url,)).fetchone()
+        return decompress(*row) if row else None
+
+    def iter_latest_blobs(self, url_filter='%/fighter-details/%', with_fetched_at=False):
+        """
+        Yield (url, codec, blob) for the newest copy of every matching URL, still compressed;
+        with_fetched_at appends the copy's fetch time.
+        """
+        cursor = self.conn.execute(f"""
+            SELECT url, codec, body{', fetched_at' if with_fetched_at else ''} FROM pages
+            WHERE id IN (SELECT MAX(id) FROM pages WHERE url LIKE ? GROUP BY url)
+            ORDER BY url
+        """, (url_filter,))
+        yield from cursor
+
+    def stats(self):
+        """Page count, distinct URLs, raw vs stored bytes."""
+        pages, urls, raw, stored = self.conn.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT url), COALESCE(SUM(raw_size), 0), "
+            "COALESCE(SUM(LENGTH(body)), 0) FROM pages").fetchone()
+        return {'pages': pages, 'urls': urls, 'raw_bytes': raw, 'stored_bytes': stored,
+                'ratio': round(raw / stored, 2) if stored else None}
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+def _parse_batch(batch):
+    """Worker: decompress and parse a list of (url, codec, blob, fetched_at)."""
+    from src.scraper import parse_fighter_html
+    fighters = []
+    for url, codec, blob, fetched_at in batch:
+        fighter = parse_fighter_html(decompress(codec, blob), url, scraped_at=fetched_at)
+        if fighter and fighter.get('Name', 'Unknown') != 'Unknown':
+            fighters.append(fighter)
+    return fighters
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def reparse(path=ARCHIVE_PATH, workers=None, sink=None):
+    """
+    Regenerate fighter records from the newest archived copy of each fighter page.
+    Pages are parsed in worker processes; at most 2 * workers batches are in flight.
+    Records go to `sink.add()` if given; otherwise they are returned as a DataFrame.
+    """
+    workers = workers or os.cpu_count() or 1
+    fighters = []
+
+    def emit(records):
+        if sink is not None:
+            for record in records:
+                sink.add(record)
+        else:
+            fighters.extend(records)
+
+    with HtmlArchive(path) as archive:
+        batches = _batches(archive.iter_latest_blobs(with_fetched_at=True), REPARSE_CHUNK)
+        if workers <= 1:
+            for batch in batches:
+                emit(_parse_batch(batch))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for batch in batches:
+                    pending.append(pool.submit(_parse_batch, batch))
+                    if len(pending) >= workers * 2:
+                        emit(pending.popleft().result())
+                while pending:
+                    emit(pending.popleft().result())
+
+    if sink is not None:
+        return None
+    import pandas as pd
+    return pd.DataFrame(fighters)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Raw HTML archive tools")
+    parser.add_argument('command', choices=['stats', 'reparse'])
+    parser.add_argument('--archive', default=ARCHIVE_PATH)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('-o', '--output', default=os.path.join('data', 'fighters_reparsed.csv'))
+    parser.add_argument('--sqlite', action='store_true', help="Load reparsed records into ufc_data.db")
+    args = parser.parse_args()
+
+    if args.command == 'stats':
+        with HtmlArchive(args.archive) as archive:
+            print(archive.stats())
+    elif args.sqlite:
+        from src.sqlite_sink import SQLiteSink, merge_staging
+        with SQLiteSink() as sink:
+            reparse(args.archive, args.workers, sink=sink)
+            print(f"Reparsed {sink.written + len(sink.buffer)} fighters from the archive.")
+        merge_staging()
+    else:
+        df = reparse(args.archive, args.workers)
+        df.to_csv(args.output, index=False)
+        print(f"Reparsed {len(df)} fighters from the archive into {args.output}")
@@ -0,0 +1,264 @@
+"""
+Shared HTTP client for the scrapers.
+Wraps a pooled requests.Session with:
+    - per-host token-bucket rate limiting (optionally one budget shared by
+      several processes, see SharedRateLimiter)
+    - per-host concurrency caps
+    - retries with exponential backoff and full jitter on connection errors,
+      timeouts and 429/5xx responses, honouring Retry-After
+    - a dead-letter list of URLs that still failed after all retries,
+      which can be saved and re-attempted later
+
+Usage:
+    from src.http_client import get_client
+    resp = get_client().get(url, timeout=15)       # raises after the last retry
+"""
+import json
+import multiprocessing
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+import requests
+
+try:
+    from src.instrumentation import count
+except ImportError:  # Imported by scripts run from inside src/
+    from instrumentation import count
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5      # Seconds; attempt n waits up to BACKOFF_BASE * 2**n
+BACKOFF_MAX = 30.0      # Cap for both computed backoff and Retry-After
+DEFAULT_RATE = 8.0      # Requests per second per host
+DEFAULT_BURST = 4
+MAX_PER_HOST = 4        # Concurrent in-flight requests per host
+DEAD_LETTER_PATH = "data/dead_letters.jsonl"
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+class SharedRateLimiter:
+    """
+    Rate limit shared by several processes (e.g. scrape shards): one slot time in
+    shared memory; each acquire() reserves the next free slot, then sleeps until it.
+    Pass it to the worker processes and install it with set_host_limits(host, limiter=...).
+    """
+
+    def __init__(self, rate, burst=1, context=None):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._next = (context or multiprocessing).Value('d', 0.0)
+
+    def acquire(self):
+        if not self.rate:
+            return 0.0
+        interval = 1.0 / self.rate
+        with self._next.get_lock():
+            now = time.time()
+            # Up to `burst` slots may be claimed back-to-back after an idle period
+            slot = max(self._next.value, now - (self.burst - 1) * interval)
+            self._next.value = slot + interval
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+            return wait
+        return 0.0
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    """Full-jitter exponential backoff for the given 0-based attempt."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+class HttpClient:
+    """
+    Rate-limited, retrying HTTP client shared by all scrapers.
+    rate/burst/max_per_host apply to each host separately; set_host_limits() overrides one host.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, max_per_host=MAX_PER_HOST,
+                 retries=MAX_RETRIES, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX,
+                 headers=None):
+        self.rate = rate
+        self.burst = burst
+        self.max_per_host = max_per_host
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        self.dead_letters = []
+        self._buckets = {}
+        self._slots = {}
+        self._limits = {}
+        self._lock = threading.Lock()
+
+    def set_host_limits(self, host, rate=None, burst=None, max_per_host=None, limiter=None):
+        """
+        Override rate (req/s, 0 = unlimited), burst or concurrency for one host.
+        limiter: object with acquire() used instead of this client's own token bucket.
+        """
+        with self._lock:
+            limits = self._limits.setdefault(host, {})
+            for key, value in (('rate', rate), ('burst', burst), ('max_per_host', max_per_host),
+                               ('limiter', limiter)):
+                if value is not None:
+                    limits[key] = value
+            self._buckets.pop(host, None)
+            self._slots.pop(host, None)
+
+    def _host_state(self, host):
+        with self._lock:
+            if host not in self._buckets:
+                limits = self._limits.get(host, {})
+                self._buckets[host] = limits.get('limiter') or TokenBucket(
+                    limits.get('rate', self.rate), limits.get('burst', self.burst))
+                self._slots[host] = threading.BoundedSemaphore(
+                    limits.get('max_per_host', self.max_per_host))
+            return self._buckets[host], self._slots[host]
+
+    def _retry_wait(self, attempt, resp=None):
+        if resp is not None:
+            retry_after = parse_retry_after(resp.headers.get('Retry-After'))
+            if retry_after is not None:
+                return min(retry_after, self.backoff_max)
+        return backoff_delay(attempt, self.backoff_base, self.backoff_max)
+
+    def get(self, url, timeout=15, retries=None, raise_for_status=True, dead_letter=True, **kwargs):
+        """
+        GET with rate limiting and retries.
+        Returns the final Response. Retryable failures that persist past the last
+        attempt are dead-lettered (unless dead_letter=False) and re-raised; other 4xx
+        are raised (or returned when raise_for_status=False) without retrying.
+        """
+        retries = self.retries if retries is None else retries
+        host = urlparse(url).netloc
+        bucket, slots = self._host_state(host)
+
+        attempt = 0
+        while True:
+            bucket.acquire()
+            try:
+                with slots:
+                    resp = self.session.get(url, timeout=timeout, **kwargs)
+                error = None
+            except (requests.ConnectionError, requests.Timeout) as e:
+                resp, error = None, e
+
+            if error is None and resp.status_code not in RETRY_STATUSES:
+                if raise_for_status:
+                    resp.raise_for_status()
+                return resp
+
+            if attempt >= retries:
+                if error is None:
+                    error = requests.HTTPError(f"{resp.status_code} after {attempt + 1} attempts: {url}",
+                                               response=resp)
+                if dead_letter:
+                    self._dead_letter(url, error, attempt + 1)
+                if raise_for_status or resp is None:
+                    raise error
+                return resp
+
+            count('http.retries')
+            time.sleep(self._retry_wait(attempt, resp))
+            attempt += 1
+
+    def _dead_letter(self, url, error, attempts):
+        count('http.dead_letters')
+        with self._lock:
+            self.dead_letters.append({
+                'url': url,
+                'error': str(error),
+                'attempts': attempts,
+                'failed_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            })
+
+    def add_dead_letters(self, letters):
+        """Adopt dead-letter records from another client (e.g. the async one)."""
+        with self._lock:
+            self.dead_letters.extend(letters)
+
+    def drain_dead_letters(self):
+        """Return and clear the dead-letter list."""
+        with self._lock:
+            letters, self.dead_letters = self.dead_letters, []
+        return letters
+
+    def close(self):
+        self.session.close()
+
+def save_dead_letters(letters, path=DEAD_LETTER_PATH):
+    """Append dead-letter records to a JSONL file for a later retry run."""
+    if not letters:
+        return path
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        for letter in letters:
+            f.write(json.dumps(letter) + '\n')
+    return path
+
+def load_dead_letters(path=DEAD_LETTER_PATH, clear=False):
+    """Read dead-lettered URLs (deduplicated, in order); optionally truncate the file."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            urls = [json.loads(line)['url'] for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+    if clear:
+        open(path, 'w').close()
+    return list(dict.fromkeys(urls))
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Process-wide shared client."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
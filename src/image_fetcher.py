@@ -1,9 +1,9 @@
 """
 Module to fetch fighter images from ufc.com on demand.
 """
-import requests
-from bs4 import BeautifulSoup
 import re
+from src.instrumentation import timed, count
+from src.http_client import get_client
 
 def normalize_name_for_url(name):
     """
@@ -27,33 +27,75 @@ def normalize_name_for_url(name):
     
     return normalized
 
+ATHLETE_URL = "https://www.ufc.com/athlete/{slug}"
+IMAGE_HEADERS = {'User-Agent': 'Mozilla/5.0'}
+BATCH_CONCURRENCY = 100   # Photos resolved at once by get_fighter_image_urls
+
+def parse_image_url(html):
+    """The hero image URL on a ufc.com athlete page, or None."""
+    from bs4 import BeautifulSoup  # Only needed once a page is actually fetched
+    
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # Look for the hero image
+    # Class usually: 'hero-profile__image'
+    img = soup.find('img', {'class': 'hero-profile__image'})
+    
+    if img and img.get('src'):
+        return img['src']
+    return None
+
+@timed('image_fetcher.get_fighter_image_url')
 def get_fighter_image_url(name):
     """
     Scrapes ufc.com to find the fighter's profile image.
     Returns URL or None.
     """
-    slug = normalize_name_for_url(name)
-    url = f"https://www.ufc.com/athlete/{slug}"
+    url = ATHLETE_URL.format(slug=normalize_name_for_url(name))
     
     try:
-        # Timeout of 3s to not block UI too long
-        resp = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=3)
+        # Timeout of 3s and a single retry to not block UI too long
+        resp = get_client().get(url, headers=IMAGE_HEADERS, timeout=3,
+                                retries=1, raise_for_status=False, dead_letter=False)
         if resp.status_code != 200:
             return None
-            
-        soup = BeautifulSoup(resp.text, 'html.parser')
-        
-        # Look for the hero image
-        # Class usually: 'hero-profile__image'
-        img = soup.find('img', {'class': 'hero-profile__image'})
-        
-        if img and img.get('src'):
-            src = img['src']
-            # Sometimes parsing fields
-            return src
+        return parse_image_url(resp.text)
             
     except Exception as e:
+        count('image_fetcher.errors')
         print(f"Error fetching image for {name}: {e}")
         return None
-    
-    return None
+
+async def aget_fighter_image_url(name, client=None):
+    """
+    Async get_fighter_image_url on an async_client.AsyncHttpClient.
+    Pass a shared client when resolving many names; without one a client is opened for this call.
+    """
+    from src.async_client import AsyncHttpClient
+    if client is None:
+        async with AsyncHttpClient() as own_client:
+            return await aget_fighter_image_url(name, own_client)
+    url = ATHLETE_URL.format(slug=normalize_name_for_url(name))
+    try:
+        resp = await client.get(url, headers=IMAGE_HEADERS, timeout=3,
+                                retries=1, raise_for_status=False, dead_letter=False)
+        if resp.status_code != 200:
+            return None
+        return parse_image_url(resp.text)
+    except Exception as e:
+        count('image_fetcher.errors')
+        print(f"Error fetching image for {name}: {e}")
+        return None
+
+@timed('image_fetcher.get_fighter_image_urls')
+def get_fighter_image_urls(names, concurrency=BATCH_CONCURRENCY):
+    """Resolve many photos from one thread with up to `concurrency` requests in flight. Returns {name: URL or None}."""
+    from src.async_client import AsyncHttpClient, gather_bounded, run_sync
+    names = list(dict.fromkeys(names))
+
+    async def resolve():
+        async with AsyncHttpClient() as client:
+            return await gather_bounded([lambda n=n: aget_fighter_image_url(n, client) for n in names],
+                                        limit=concurrency)
+
+    return dict(zip(names, run_sync(resolve())))
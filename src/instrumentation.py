@@ -0,0 +1,184 @@
+"""
+Lightweight timing and counter instrumentation for the data pipeline.
+
+Disabled by default; a disabled timer is a single flag check. Controlled by environment:
+    UFC_TIMINGS=1              collect timings/counters (also switchable via set_enabled)
+    UFC_TIMINGS_LOG=<path>     append one JSON line per timed call to <path>
+    UFC_PROFILE=cprofile       profile each outermost timed call with cProfile
+    UFC_PROFILE=pyinstrument   ... or with pyinstrument, if installed
+    UFC_PROFILE_DIR=<dir>      where profiles are written (default: profiles/)
+
+Usage:
+    @timed('processor.clean_fighters')
+    def clean_fighters(df): ...
+
+    with timer('etl.insert'):
+        ...
+    count('scraper.fetch_errors')
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+ENABLED = os.environ.get('UFC_TIMINGS', '').lower() in ('1', 'true', 'yes') \
+    or bool(os.environ.get('UFC_PROFILE'))
+PROFILE_MODE = os.environ.get('UFC_PROFILE', '').lower()
+PROFILE_DIR = os.environ.get('UFC_PROFILE_DIR', 'profiles')
+LOG_PATH = os.environ.get('UFC_TIMINGS_LOG')
+
+_lock = threading.Lock()
+_stats = {}      # name -> [calls, total_s, min_s, max_s]
+_counters = {}   # name -> int
+_local = threading.local()
+
+def set_enabled(enabled=True):
+    """Turn collection on or off at runtime."""
+    global ENABLED
+    ENABLED = bool(enabled)
+
+def is_enabled():
+    return ENABLED
+
+def reset():
+    """Clear all collected timings and counters."""
+    with _lock:
+        _stats.clear()
+        _counters.clear()
+
+def count(name, n=1):
+    """Increment a named counter."""
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+def _record(name, elapsed, **fields):
+    with _lock:
+        entry = _stats.get(name)
+        if entry is None:
+            _stats[name] = [1, elapsed, elapsed, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] = min(entry[2], elapsed)
+            entry[3] = max(entry[3], elapsed)
+    if LOG_PATH:
+        event = {'ts': time.time(), 'name': name, 'ms': round(elapsed * 1000, 3), **fields}
+        line = json.dumps(event, default=str)
+        with _lock, open(LOG_PATH, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+@contextmanager
+def _profile(name):
+    """Profile the outermost timed call when UFC_PROFILE is set."""
+    depth = getattr(_local, 'depth', 0)
+    if not PROFILE_MODE or depth > 0:
+        _local.depth = depth + 1
+        try:
+            yield
+        finally:
+            _local.depth = depth
+        return
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    base = os.path.join(PROFILE_DIR, f"{name}-{stamp}")
+    _local.depth = 1
+    try:
+        if PROFILE_MODE == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                Profiler = None
+            if Profiler is not None:
+                profiler = Profiler()
+                profiler.start()
+                try:
+                    yield
+                finally:
+                    profiler.stop()
+                    with open(base + '.html', 'w', encoding='utf-8') as f:
+                        f.write(profiler.output_html())
+                return
+
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(base + '.prof')
+    finally:
+        _local.depth = 0
+
+@contextmanager
+def timer(name, **fields):
+    """Time a block under `name`; extra keyword fields go into the JSON log line."""
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        with _profile(name):
+            yield
+    finally:
+        _record(name, time.perf_counter() - start, **fields)
+
+def timed(name=None):
+    """Decorator form of timer(); defaults to module.function as the name."""
+    def decorator(fn):
+        label = name or f"{fn.__module__}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            with timer(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def summary():
+    """
+    Snapshot of collected data.
+    Returns: dict with 'timings' (name -> calls/total_ms/mean_ms/min_ms/max_ms) and 'counters'.
+    """
+    with _lock:
+        timings = {
+            name: {
+                'calls': calls,
+                'total_ms': round(total * 1000, 3),
+                'mean_ms': round(total * 1000 / calls, 3),
+                'min_ms': round(lo * 1000, 3),
+                'max_ms': round(hi * 1000, 3),
+            }
+            for name, (calls, total, lo, hi) in _stats.items()
+        }
+        counters = dict(_counters)
+    return {'timings': timings, 'counters': counters}
+
+def report():
+    """Human-readable summary sorted by total time."""
+    data = summary()
+    lines = [f"{'name':<36}{'calls':>8}{'total ms':>12}{'mean ms':>10}{'max ms':>10}"]
+    for name, t in sorted(data['timings'].items(), key=lambda kv: -kv[1]['total_ms']):
+        lines.append(f"{name:<36}{t['calls']:>8}{t['total_ms']:>12.1f}{t['mean_ms']:>10.3f}{t['max_ms']:>10.3f}")
+    for name, value in sorted(data['counters'].items()):
+        lines.append(f"{name:<36}{value:>8}")
+    return "\n".join(lines)
+
+def _print_report_at_exit():
+    if _stats or _counters:
+        print("\n--- Timing summary ---")
+        print(report())
+        if LOG_PATH:
+            with open(LOG_PATH, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'ts': time.time(), 'name': 'summary', **summary()}) + '\n')
+
+if ENABLED:
+    atexit.register(_print_report_at_exit)
@@ -0,0 +1,198 @@
+"""
+Matchmaking optimizer: pair up a pool of fighters into the most competitive card.
+The all-pairs win-probability matrix comes from predict_matrix; pairing cost is
+|P(win) - 0.5|. The matching is solved as a linear assignment (scipy) on the
+symmetric cost matrix, its permutation cycles are split into bouts, and a
+vectorized 2-opt pass swaps opponents between bouts while that lowers the cost.
+The assignment optimum gives a lower bound, so every card reports its optimality gap.
+An odd pool gets a dummy fighter with zero-cost bouts, so whoever it draws sits out.
+
+Usage:
+    python -m src.matchmaking --weight-class Lightweight --bouts 12
+    python -m src.matchmaking --weight-class Welterweight --exclude rematches.csv
+"""
+import argparse
+import numpy as np
+import pandas as pd
+from src.processor import predict_matrix
+from src.instrumentation import timed
+from src import shared_cache
+
+FORBIDDEN = 1e6          # Cost of a disallowed pairing (self, rematch)
+MAX_SWAP_ROUNDS = 200
+
+def pairing_costs(pool):
+    """Symmetric |P - 0.5| matrix for a pool DataFrame, with the diagonal forbidden."""
+    # Multi-worker mode: every worker reads the same cached matrix instead of recomputing it
+    probs = shared_cache.cached_matrix(pool) if shared_cache.enabled() else predict_matrix(pool)
+    cost = (np.abs(probs - 0.5) + np.abs(probs.T - 0.5)) / 2
+    np.fill_diagonal(cost, FORBIDDEN)
+    return probs, cost
+
+def _split_cycles(assignment, cost):
+    """Turn an assignment permutation into disjoint pairs; returns (pairs, leftovers)."""
+    seen = np.zeros(len(assignment), dtype=bool)
+    pairs, leftovers = [], []
+    for start in range(len(assignment)):
+        if seen[start]:
+            continue
+        cycle = []
+        node = start
+        while not seen[node]:
+            seen[node] = True
+            cycle.append(node)
+            node = assignment[node]
+        if len(cycle) % 2:
+            # Odd cycle: drop the member whose removal leaves the cheapest alternation
+            best = None
+            for k in range(len(cycle)):
+                rest = cycle[k + 1:] + cycle[:k]
+                total = sum(cost[rest[m], rest[m + 1]] for m in range(0, len(rest), 2))
+                if best is None or total < best[0]:
+                    best = (total, cycle[k], rest)
+            leftovers.append(best[1])
+            cycle = best[2]
+            candidates = [[(cycle[m], cycle[m + 1]) for m in range(0, len(cycle), 2)]]
+        else:
+            candidates = [[(cycle[m], cycle[m + 1]) for m in range(0, len(cycle), 2)],
+                          [(cycle[m], cycle[(m + 1) % len(cycle)]) for m in range(1, len(cycle), 2)]]
+        pairs.extend(min(candidates, key=lambda ps: sum(cost[a, b] for a, b in ps)))
+    return pairs, leftovers
+
+def _pair_leftovers(leftovers, cost):
+    """Greedily pair fighters left over by odd cycles; at most one stays unpaired."""
+    pairs = []
+    remaining = list(leftovers)
+    while len(remaining) > 1:
+        sub = cost[np.ix_(remaining, remaining)]
+        a, b = np.unravel_index(np.argmin(sub), sub.shape)
+        pairs.append((remaining[a], remaining[b]))
+        remaining = [r for k, r in enumerate(remaining) if k not in (a, b)]
+    return pairs, remaining
+
+def _two_opt(pairs, cost):
+    """
+    Swap opponents between two bouts while it lowers the total cost.
+    Each round applies every improving swap whose bouts were not touched earlier in the round.
+    """
+    if len(pairs) < 2:
+        return pairs
+    a = np.array([p[0] for p in pairs])
+    b = np.array([p[1] for p in pairs])
+    for _ in range(MAX_SWAP_ROUNDS):
+        current = cost[a, b]
+        base = current[:, None] + current[None, :]
+        gain_cross = np.triu(base - cost[a[:, None], a[None, :]] - cost[b[:, None], b[None, :]], 1)
+        gain_swap = np.triu(base - cost[a[:, None], b[None, :]] - cost[b[:, None], a[None, :]], 1)
+        cross = gain_cross >= gain_swap
+        gain = np.where(cross, gain_cross, gain_swap)
+        best_j = gain.argmax(axis=1)
+        best_gain = gain[np.arange(len(a)), best_j]
+        candidates = np.flatnonzero(best_gain > 1e-12)
+        if len(candidates) == 0:
+            break
+        touched = np.zeros(len(a), dtype=bool)
+        for i in candidates[np.argsort(-best_gain[candidates], kind='stable')]:
+            j = best_j[i]
+            if touched[i] or touched[j]:
+                continue
+            touched[i] = touched[j] = True
+            if cross[i, j]:
+                # (a_i, b_i), (a_j, b_j) -> (a_i, a_j), (b_i, b_j)
+                a[i], b[i], a[j], b[j] = a[i], a[j], b[i], b[j]
+            else:
+                # (a_i, b_i), (a_j, b_j) -> (a_i, b_j), (a_j, b_i)
+                b[i], b[j] = b[j], b[i]
+    return list(zip(a.tolist(), b.tolist()))
+
+@timed('matchmaking.build_card')
+def build_card(df, weight_class=None, bouts=None, exclude=None):
+    """
+    Pair fighters into the most competitive bouts, each fighter used at most once.
+    df: cleaned fighters; weight_class restricts the pool; bouts keeps the N most
+    competitive bouts of the optimized matching; exclude is an iterable of
+    (name, name) pairs that must not be booked (e.g. rematches).
+
+    Returns: dict with 'card' (DataFrame: Fighter_A, Fighter_B, prob_a, prob_b,
+    competitiveness), 'unpaired' (names), 'total_cost' and 'lower_bound' (None when
+the exclusions leave no card that pairs everyone, which the bound would assume).
+    """
+    from scipy.optimize import linear_sum_assignment
+
+    pool = df if weight_class is None else df[df['WeightClass'] == weight_class]
+    pool = pool.reset_index(drop=True)
+    names = pool['Name'].tolist()
+    if len(pool) < 2:
+        return {'card': pd.DataFrame(columns=['Fighter_A', 'Fighter_B', 'prob_a', 'prob_b', 'competitiveness']),
+                'unpaired': names, 'total_cost': 0.0, 'lower_bound': 0.0}
+
+    probs, cost = pairing_costs(pool)
+    if exclude:
+        position = {name: i for i, name in enumerate(names)}
+        for x, y in exclude:
+            i, j = position.get(x), position.get(y)
+            if i is not None and j is not None:
+                cost[i, j] = cost[j, i] = FORBIDDEN
+
+    n = len(pool)
+    if n % 2:
+        # Dummy fighter: bouts against it cost nothing and mean sitting the card out
+        cost = np.pad(cost, ((0, 1), (0, 1)))
+        cost[n, n] = FORBIDDEN
+    rows, cols = linear_sum_assignment(cost)
+    assignment = np.empty(len(cost), dtype=int)
+    assignment[rows] = cols
+    # Each bout appears twice in a symmetric assignment, so half its cost bounds any
+    # matching that pairs everyone; an optimum that needs a forbidden pairing bounds nothing
+    optimum = cost[rows, cols]
+    lower_bound = float(optimum.sum()) / 2 if optimum.max() < FORBIDDEN else None
+
+    pairs, leftovers = _split_cycles(assignment, cost)
+    extra, unpaired = _pair_leftovers(leftovers, cost)
+    pairs = _two_opt(pairs + extra, cost)
+    pairs = [(i, j) for i, j in pairs if cost[i, j] < FORBIDDEN and n not in (i, j)]
+    if len(pairs) < n // 2:
+        # Some fighters had to be dropped, so the card is not comparable with the bound
+        lower_bound = None
+    unpaired_ids = set(range(len(pool))) - {k for pair in pairs for k in pair}
+
+    a = np.array([p[0] for p in pairs], dtype=int)
+    b = np.array([p[1] for p in pairs], dtype=int)
+    prob_a = np.round(probs[a, b], 4)
+    card = pd.DataFrame({
+        'Fighter_A': [names[i] for i in a],
+        'Fighter_B': [names[j] for j in b],
+        'prob_a': prob_a,
+        'prob_b': np.round(1 - prob_a, 4),
+        'competitiveness': np.round(1 - 2 * cost[a, b], 4),
+    }).sort_values('competitiveness', ascending=False, kind='stable').reset_index(drop=True)
+    total_cost = float(cost[a, b].sum())
+    if bouts is not None:
+        card = card.head(bouts)
+
+    return {
+        'card': card,
+        'unpaired': [names[k] for k in sorted(unpaired_ids)],
+        'total_cost': round(total_cost, 6),
+        'lower_bound': None if lower_bound is None else round(lower_bound, 6),
+    }
+
+if __name__ == "__main__":
+    from src.processor import load_fighters, clean_fighters
+    parser = argparse.ArgumentParser(description="Build the most competitive card for a division")
+    parser.add_argument('--weight-class', default=None, help="Division to pair (default: whole roster)")
+    parser.add_argument('--bouts', type=int, default=None, help="Keep only the N most competitive bouts")
+    parser.add_argument('--exclude', default=None, help="CSV of fighter pairs not to book (two columns)")
+    args = parser.parse_args()
+
+    exclude = None
+    if args.exclude:
+        pairs = pd.read_csv(args.exclude, dtype=str)
+        exclude = list(zip(pairs.iloc[:, 0], pairs.iloc[:, 1]))
+
+    result = build_card(clean_fighters(load_fighters()), args.weight_class, args.bouts, exclude)
+    print(result['card'].to_string(index=False))
+    bound = "no bound" if result['lower_bound'] is None else f"lower bound {result['lower_bound']:.4f}"
+    print(f"\nTotal |p - 0.5|: {result['total_cost']:.4f} ({bound})")
+    if result['unpaired']:
+        print(f"Unpaired: {', '.join(result['unpaired'])}")
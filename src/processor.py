@@ -5,12 +5,20 @@ Loads fighter data, engineers features, and predicts fight outcomes.
 import pandas as pd
 import numpy as np
 from src.db_manager import get_connection
+from src.instrumentation import timed
+from src.ratings import expected_score, GLICKO_RD
 
+@timed('processor.load_fighters')
 def load_fighters():
     """Load fighter data from SQLite database."""
     conn = get_connection()
+    # Ratings are joined only once src.ratings has created its table
+    has_ratings = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'fighter_ratings'").fetchone()
+    rating_columns = ",\n        r.glicko as Rating,\n        r.rd as RatingRD" if has_ratings else ""
+    rating_join = "LEFT JOIN fighter_ratings r ON r.url = f.url" if has_ratings else ""
     
-    query = """
+    query = f"""
     SELECT 
         f.name as Name,
         f.nickname as Nickname,
@@ -30,9 +38,10 @@ def load_fighters():
         s.td_avg as TD_Avg,
         s.td_acc as TD_Acc,
         s.td_def as TD_Def,
-        s.sub_avg as Sub_Avg
+        s.sub_avg as Sub_Avg{rating_columns}
     FROM fighters f
     JOIN fighter_stats s ON f.id = s.fighter_id
+    {rating_join}
     """
     
     try:
@@ -44,6 +53,7 @@ def load_fighters():
     finally:
         conn.close()
 
+@timed('processor.clean_fighters')
 def clean_fighters(df):
     """Clean and prepare fighter data for analysis."""
     # Keep only fighters with enough data (at least 1 fight)
@@ -97,6 +107,7 @@ def clean_fighters(df):
     
     return df
 
+@timed('processor.predict_matchup')
 def predict_matchup(fighter_a_row, fighter_b_row):
     """
     Predict the outcome of a fight between Fighter A and Fighter B.
@@ -106,6 +117,8 @@ def predict_matchup(fighter_a_row, fighter_b_row):
     - Grappling Differential (30%)  
     - Physical Advantage (15%)
     - Experience & Win Rate (15%)
+    When both fighters have a Glicko-2 rating, its expected score is blended
+    in with weight RATING_WEIGHT.
     
     Returns: dict with probabilities and breakdown
     """
@@ -214,6 +227,23 @@ def predict_matchup(fighter_a_row, fighter_b_row):
         experience_score * 0.15
     )
     
+    # --- 5. RATING (only when both fighters are rated) ---
+    a_rating = _rating_value(fighter_a_row.get('Rating'))
+    b_rating = _rating_value(fighter_b_row.get('Rating'))
+    if a_rating is not None and b_rating is not None:
+        a_rd = _rating_value(fighter_a_row.get('RatingRD')) or GLICKO_RD
+        b_rd = _rating_value(fighter_b_row.get('RatingRD')) or GLICKO_RD
+        rating_score = expected_score(a_rating, a_rd, b_rating, b_rd)
+        combined_score = (1 - RATING_WEIGHT) * combined_score + RATING_WEIGHT * rating_score
+        breakdown['Rating'] = {
+            'Fighter_A': round(a_rating, 1),
+            'Fighter_B': round(b_rating, 1),
+            'Fighter_A_RD': round(a_rd, 1),
+            'Fighter_B_RD': round(b_rd, 1),
+            'Expected_A': round(float(rating_score), 3),
+            'Advantage': 'A' if a_rating > b_rating else ('B' if a_rating < b_rating else 'Even')
+        }
+    
     # Convert to probabilities
     prob_a = combined_score
     prob_b = 1 - combined_score
@@ -226,6 +256,379 @@ def predict_matchup(fighter_a_row, fighter_b_row):
         'breakdown': breakdown
     }
 
+# Factor weights and sigmoid scales used by predict_matchup
+FACTOR_WEIGHTS = {'Striking': 0.40, 'Grappling': 0.30, 'Physical': 0.15, 'Experience': 0.15}
+FACTOR_SCALES = {'Striking': 0.8, 'Grappling': 0.8, 'Physical': 1.0, 'Experience': 5.0}
+
+# Share of the win probability given to the Glicko-2 expected score when both fighters are rated
+RATING_WEIGHT = 0.25
+
+def _rating_value(value):
+    """Rating as a float, or None when missing/NaN."""
+    if value is None:
+        return None
+    value = float(value)
+    return None if np.isnan(value) else value
+
+# Fallback used by predict_matchup when a stat is missing or zero
+STAT_DEFAULTS = {'SLpM': 0, 'Str_Def': 0.5, 'Str_Acc': 0.5, 'SApM': 3.0,
+                 'TD_Avg': 0, 'TD_Acc': 0, 'TD_Def': 0.5, 'Sub_Avg': 0,
+                 'Reach_cm': 180, 'Height_cm': 178, 'WinRate': 0.5, 'TotalFights': 1}
+
+def _stat_array(df, col, default):
+    """Column as a float array, applying predict_matchup's `value or default` fallback."""
+    if col not in df.columns:
+        return np.full(len(df), float(default))
+    values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float)
+    return np.where(values == 0, default, values)
+
+def stat_arrays(df):
+    """Every stat used by the model as a dict of float arrays (defaults applied)."""
+    return {col: _stat_array(df, col, default) for col, default in STAT_DEFAULTS.items()}
+
+def factor_differentials(fighters_a, fighters_b):
+    """
+    Vectorized per-factor differentials (A minus B) for row-aligned DataFrames.
+    Mirrors the arithmetic of predict_matchup; returns a dict of NumPy arrays.
+    """
+    return factor_differentials_from_arrays(stat_arrays(fighters_a), stat_arrays(fighters_b))
+
+def factor_differentials_from_arrays(a, b):
+    """
+    Same as factor_differentials, on dicts of stat arrays from stat_arrays().
+    Arrays broadcast, so a[col][:, None] vs b[col][None, :] yields full matrices.
+    """
+    a_net_striking = (a['SLpM'] * a['Str_Acc']) - (a['SApM'] * (1 - a['Str_Def']))
+    b_net_striking = (b['SLpM'] * b['Str_Acc']) - (b['SApM'] * (1 - b['Str_Def']))
+
+    a_grapple = (a['TD_Avg'] * a['TD_Acc']) + (a['Sub_Avg'] * 0.5) - (b['TD_Avg'] * b['TD_Acc'] * (1 - a['TD_Def']))
+    b_grapple = (b['TD_Avg'] * b['TD_Acc']) + (b['Sub_Avg'] * 0.5) - (a['TD_Avg'] * a['TD_Acc'] * (1 - b['TD_Def']))
+
+    reach_diff = (a['Reach_cm'] - b['Reach_cm']) / 10.0
+    height_diff = (a['Height_cm'] - b['Height_cm']) / 10.0
+
+    exp_factor_a = np.minimum(a['TotalFights'] / 15.0, 1.0)
+    exp_factor_b = np.minimum(b['TotalFights'] / 15.0, 1.0)
+    a_adj_winrate = a['WinRate'] * exp_factor_a + 0.5 * (1 - exp_factor_a)
+    b_adj_winrate = b['WinRate'] * exp_factor_b + 0.5 * (1 - exp_factor_b)
+
+    return {
+        'Striking': a_net_striking - b_net_striking,
+        'Grappling': a_grapple - b_grapple,
+        'Physical': (reach_diff * 0.7) + (height_diff * 0.3),
+        'Experience': a_adj_winrate - b_adj_winrate,
+    }
+
+def combine_factor_scores(diffs):
+    """Weighted sum of per-factor sigmoid scores: Fighter A's win probability."""
+    prob_a = 0.0
+    for factor, weight in FACTOR_WEIGHTS.items():
+        prob_a = prob_a + weight / (1.0 + np.exp(-diffs[factor] * FACTOR_SCALES[factor]))
+    return prob_a
+
+def rating_arrays(df):
+    """Glicko-2 rating and RD as float arrays (NaN rating = unrated)."""
+    if 'Rating' not in df.columns:
+        return {'Rating': np.full(len(df), np.nan), 'RatingRD': np.full(len(df), GLICKO_RD)}
+    rd = pd.to_numeric(df['RatingRD'], errors='coerce').to_numpy(dtype=float) if 'RatingRD' in df.columns \
+        else np.full(len(df), np.nan)
+    return {'Rating': pd.to_numeric(df['Rating'], errors='coerce').to_numpy(dtype=float),
+            'RatingRD': np.where(np.isnan(rd) | (rd == 0), GLICKO_RD, rd)}
+
+def blend_ratings(prob_a, a, b):
+    """
+    Blend the Glicko-2 expected score into prob_a where both fighters are rated,
+    as predict_matchup does. a/b are rating_arrays() dicts; arrays broadcast.
+    """
+    rated = ~np.isnan(a['Rating']) & ~np.isnan(b['Rating'])
+    if not np.any(rated):
+        return prob_a
+    rating_score = expected_score(a['Rating'], a['RatingRD'], b['Rating'], b['RatingRD'])
+    return np.where(rated, (1 - RATING_WEIGHT) * prob_a + RATING_WEIGHT * rating_score, prob_a)
+
+@timed('processor.predict_matchups_batch')
+def predict_matchups_batch(fighters_a, fighters_b):
+    """
+    Score many matchups at once. fighters_a[i] fights fighters_b[i].
+    Returns: DataFrame with Fighter_A, Fighter_B, prob_a, prob_b, predicted_winner, confidence
+    (same values as predict_matchup, without the per-factor breakdown).
+    """
+    prob_a = combine_factor_scores(factor_differentials(fighters_a, fighters_b))
+    prob_a = blend_ratings(prob_a, rating_arrays(fighters_a), rating_arrays(fighters_b))
+    prob_a = np.round(prob_a, 4)
+    prob_b = np.round(1 - prob_a, 4)
+    names_a = fighters_a['Name'].to_numpy()
+    names_b = fighters_b['Name'].to_numpy()
+    return pd.DataFrame({
+        'Fighter_A': names_a,
+        'Fighter_B': names_b,
+        'prob_a': prob_a,
+        'prob_b': prob_b,
+        'predicted_winner': np.where(prob_a > prob_b, names_a, names_b),
+        'confidence': np.round(np.abs(prob_a - 0.5) * 200, 1),
+    })
+
+# Stats with a closed-form "what flips the pick" answer: each enters one factor
+# differential linearly, so the change that moves P(A) to exactly 0.5 can be solved for.
+COUNTERFACTUAL_STATS = {'Reach_cm': 'Physical', 'Height_cm': 'Physical', 'SLpM': 'Striking',
+                        'SApM': 'Striking', 'TD_Avg': 'Grappling', 'Sub_Avg': 'Grappling'}
+CONTRIBUTION_FACTORS = list(FACTOR_WEIGHTS) + ['Rating']
+EXPLAIN_COLUMNS = ([f"contrib_{factor}" for factor in CONTRIBUTION_FACTORS] +
+                   [f"flip_{stat}" for stat in COUNTERFACTUAL_STATS])
+
+def factor_contributions(diffs, a_ratings, b_ratings):
+    """
+    Exact additive split of Fighter A's win probability: prob_a = 0.5 + sum of the values.
+    Each factor adds weight * (sigmoid score - 0.5), scaled by (1 - RATING_WEIGHT) where
+    both fighters are rated; 'Rating' adds RATING_WEIGHT * (expected score - 0.5) there, else 0.
+    """
+    rated = ~np.isnan(a_ratings['Rating']) & ~np.isnan(b_ratings['Rating'])
+    model_share = np.where(rated, 1 - RATING_WEIGHT, 1.0)
+    contributions = {
+        factor: model_share * weight * (1.0 / (1.0 + np.exp(-diffs[factor] * FACTOR_SCALES[factor])) - 0.5)
+        for factor, weight in FACTOR_WEIGHTS.items()
+    }
+    rating_score = expected_score(a_ratings['Rating'], a_ratings['RatingRD'], b_ratings['Rating'], b_ratings['RatingRD'])
+    contributions['Rating'] = np.where(rated, RATING_WEIGHT * (rating_score - 0.5), 0.0)
+    return contributions
+
+def _stat_sensitivities(a, b):
+    """d(factor differential) / d(Fighter A's stat) for COUNTERFACTUAL_STATS."""
+    return {
+        'Reach_cm': 0.07,                          # 0.7 * (reach diff / 10)
+        'Height_cm': 0.03,                         # 0.3 * (height diff / 10)
+        'SLpM': a['Str_Acc'],
+        'SApM': -(1 - a['Str_Def']),
+        'TD_Avg': a['TD_Acc'] * (2 - b['TD_Def']),  # A's takedowns raise A's score and lower B's
+        'Sub_Avg': 0.5,
+    }
+
+def _raw_stat_array(df, col):
+    """Column as stored, before the zero -> default substitution (the default if the column is absent)."""
+    if col not in df.columns:
+        return np.full(len(df), float(STAT_DEFAULTS[col]))
+    return pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float)
+
+def flip_counterfactuals(a, b, diffs, contributions, a_raw):
+    """
+    For each of COUNTERFACTUAL_STATS, the change to Fighter A's stored value (all else
+    fixed) that brings prob_a to 0.5. NaN where that stat alone cannot flip the pick.
+    a_raw: A's stored values; they differ from `a` where a zero was scored as the default.
+    """
+    total = sum(contributions.values())
+    rated = contributions['Rating'] != 0
+    sensitivities = _stat_sensitivities(a, b)
+    flips = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for stat, factor in COUNTERFACTUAL_STATS.items():
+            share = np.where(rated, 1 - RATING_WEIGHT, 1.0) * FACTOR_WEIGHTS[factor]
+            # Sigmoid score the factor must reach for the other contributions to cancel out
+            target = 0.5 - (total - contributions[factor]) / share
+            needed = np.log(target / (1 - target)) / FACTOR_SCALES[factor]
+            new_value = a[stat] + (needed - diffs[factor]) / sensitivities[stat]
+            new_value = np.broadcast_to(new_value, np.shape(total))
+            # Measured from the stored value, not the default it was scored as; the new
+            # value has to stay positive, as the model would replace a zero with the default
+            flips[stat] = np.where(np.isfinite(new_value) & (new_value > 0), new_value - a_raw[stat], np.nan)
+    return flips
+
+@timed('processor.explain_matchups')
+def explain_matchups(fighters_a, fighters_b):
+    """
+    Explain many matchups at once (fighters_a[i] vs fighters_b[i]), analytically.
+    Returns: DataFrame with Fighter_A, Fighter_B, prob_a (unrounded), contrib_<factor> for
+    each of CONTRIBUTION_FACTORS (0.5 + their sum == prob_a) and flip_<stat>, the change
+    to Fighter A's stat alone that brings prob_a to 0.5 (NaN if it cannot).
+    """
+    a = stat_arrays(fighters_a)
+    b = stat_arrays(fighters_b)
+    diffs = factor_differentials_from_arrays(a, b)
+    contributions = factor_contributions(diffs, rating_arrays(fighters_a), rating_arrays(fighters_b))
+    a_raw = {stat: _raw_stat_array(fighters_a, stat) for stat in COUNTERFACTUAL_STATS}
+    flips = flip_counterfactuals(a, b, diffs, contributions, a_raw)
+    out = pd.DataFrame({
+        'Fighter_A': fighters_a['Name'].to_numpy(),
+        'Fighter_B': fighters_b['Name'].to_numpy(),
+        'prob_a': 0.5 + sum(contributions.values()),
+    })
+    for factor in CONTRIBUTION_FACTORS:
+        out[f"contrib_{factor}"] = contributions[factor]
+    for stat in COUNTERFACTUAL_STATS:
+        out[f"flip_{stat}"] = flips[stat]
+    return out
+
+def _rows_frame(rows):
+    """One-row-per-fighter frame of the model inputs from Series or FighterStore records."""
+    columns = ['Name'] + list(STAT_DEFAULTS) + ['Rating', 'RatingRD']
+    return pd.DataFrame([{col: row.get(col) for col in columns} for row in rows])
+
+def explain_matchup(fighter_a_row, fighter_b_row):
+    """
+    explain_matchups for one pair of rows (Series or FighterStore records), scored
+    both ways round in one batch. Returns: dict with 'contributions' (toward A) and
+    'flip_a' / 'flip_b' (the change to that fighter's stat that evens the fight).
+    """
+    frame = _rows_frame([fighter_a_row, fighter_b_row])
+    explained = explain_matchups(frame, frame.iloc[::-1].reset_index(drop=True))
+    return {
+        'contributions': {factor: float(explained.at[0, f"contrib_{factor}"]) for factor in CONTRIBUTION_FACTORS},
+        'flip_a': {stat: float(explained.at[0, f"flip_{stat}"]) for stat in COUNTERFACTUAL_STATS},
+        'flip_b': {stat: float(explained.at[1, f"flip_{stat}"]) for stat in COUNTERFACTUAL_STATS},
+    }
+
+# Stat noise for interval predictions. Each stat is a rate or proportion estimated from the
+# fighter's record, so draws come from its posterior given roughly how much cage time and how
+# many attempts lie behind it (Jeffreys prior). Reach, height and ratings are held fixed:
+# the Glicko-2 expected score already accounts for rating uncertainty.
+INTERVAL_DRAWS = 4000
+INTERVAL_LEVEL = 0.90
+MINUTES_PER_FIGHT = 10.0
+TD_FACED_PER_FIGHT = 2.0  # Opponent takedown attempts aren't scraped
+
+def _rate_draws(rng, rate, exposure, draws):
+    """Gamma posterior draws of an event rate observed over `exposure` units."""
+    exposure = exposure[:, None]
+    return rng.gamma(rate[:, None] * exposure + 0.5, 1.0 / exposure, size=(len(rate), draws))
+
+def _proportion_draws(rng, p, trials, draws):
+    """Beta posterior draws of a success rate observed over `trials` attempts."""
+    p, trials = p[:, None], trials[:, None]
+    return rng.beta(p * trials + 0.5, (1 - p) * trials + 0.5, size=(len(p), draws))
+
+def sample_stat_arrays(stats, draws, rng):
+    """
+    Resample stat_arrays() output: every entry becomes an (n, draws) array, wider for
+    fighters with fewer fights. Attempts behind accuracy/defense are backed out of the rates.
+    """
+    fights = stats['TotalFights']
+    minutes = fights * MINUTES_PER_FIGHT
+    with np.errstate(divide='ignore', invalid='ignore'):
+        strikes_thrown = np.where(stats['Str_Acc'] > 0, stats['SLpM'] * minutes / stats['Str_Acc'], 0)
+        strikes_faced = np.where(stats['Str_Def'] < 1, stats['SApM'] * minutes / (1 - stats['Str_Def']), 0)
+        td_attempts = np.where(stats['TD_Acc'] > 0, stats['TD_Avg'] * minutes / 15.0 / stats['TD_Acc'], 0)
+    sampled = {col: np.broadcast_to(values[:, None], (len(values), draws)) for col, values in stats.items()}
+    sampled.update({
+        'SLpM': _rate_draws(rng, stats['SLpM'], minutes, draws),
+        'SApM': _rate_draws(rng, stats['SApM'], minutes, draws),
+        'TD_Avg': _rate_draws(rng, stats['TD_Avg'], minutes / 15.0, draws),
+        'Sub_Avg': _rate_draws(rng, stats['Sub_Avg'], minutes / 15.0, draws),
+        # At least one attempt per fight, so a missing stat isn't treated as fully unknown
+        'Str_Acc': _proportion_draws(rng, stats['Str_Acc'], np.maximum(strikes_thrown, fights), draws),
+        'Str_Def': _proportion_draws(rng, stats['Str_Def'], np.maximum(strikes_faced, fights), draws),
+        'TD_Acc': _proportion_draws(rng, stats['TD_Acc'], np.maximum(td_attempts, fights), draws),
+        'TD_Def': _proportion_draws(rng, stats['TD_Def'], fights * TD_FACED_PER_FIGHT, draws),
+        'WinRate': _proportion_draws(rng, stats['WinRate'], fights, draws),
+    })
+    return sampled
+
+@timed('processor.predict_intervals')
+def predict_intervals(fighters_a, fighters_b, draws=INTERVAL_DRAWS, level=INTERVAL_LEVEL, seed=None):
+    """
+    Prediction intervals for many matchups (fighters_a[i] vs fighters_b[i]): both fighters'
+    stats are redrawn `draws` times and every draw is scored in one vectorized pass.
+    Memory is n * draws per stat, so score large batches in chunks.
+    Returns: DataFrame with Fighter_A, Fighter_B, prob_a (point estimate), prob_mean,
+    prob_low / prob_high (central `level` interval) and a_favoured (share of draws with P(A) > 0.5).
+    """
+    rng = np.random.default_rng(seed)
+    a_stats, b_stats = stat_arrays(fighters_a), stat_arrays(fighters_b)
+    a_ratings, b_ratings = rating_arrays(fighters_a), rating_arrays(fighters_b)
+    point = blend_ratings(combine_factor_scores(factor_differentials_from_arrays(a_stats, b_stats)),
+                          a_ratings, b_ratings)
+    diffs = factor_differentials_from_arrays(sample_stat_arrays(a_stats, draws, rng),
+                                             sample_stat_arrays(b_stats, draws, rng))
+    probs = blend_ratings(combine_factor_scores(diffs),
+                          {key: values[:, None] for key, values in a_ratings.items()},
+                          {key: values[:, None] for key, values in b_ratings.items()})
+    tail = (1 - level) / 2
+    low, high = np.quantile(probs, [tail, 1 - tail], axis=1)
+    return pd.DataFrame({
+        'Fighter_A': fighters_a['Name'].to_numpy(),
+        'Fighter_B': fighters_b['Name'].to_numpy(),
+        'prob_a': np.round(point, 4),
+        'prob_mean': np.round(probs.mean(axis=1), 4),
+        'prob_low': np.round(low, 4),
+        'prob_high': np.round(high, 4),
+        'a_favoured': np.round((probs > 0.5).mean(axis=1), 4),
+    })
+
+def predict_matchup_interval(fighter_a_row, fighter_b_row, draws=INTERVAL_DRAWS, level=INTERVAL_LEVEL, seed=None):
+    """predict_intervals for one pair of rows (Series or FighterStore records); returns a dict of its columns plus 'level'."""
+    frame = _rows_frame([fighter_a_row, fighter_b_row])
+    result = predict_intervals(frame.iloc[[0]], frame.iloc[[1]], draws, level, seed).iloc[0].to_dict()
+    result['level'] = level
+    return result
+
+@timed('processor.predict_matrix')
+def predict_matrix(df):
+    """
+    All-pairs win probabilities: result[i, j] = P(row i beats row j).
+    Memory is O(n^2); score divisions or samples rather than the full roster.
+    """
+    stats = stat_arrays(df)
+    a = {col: v[:, None] for col, v in stats.items()}
+    b = {col: v[None, :] for col, v in stats.items()}
+    ratings = rating_arrays(df)
+    return blend_ratings(combine_factor_scores(factor_differentials_from_arrays(a, b)),
+                         {col: v[:, None] for col, v in ratings.items()},
+                         {col: v[None, :] for col, v in ratings.items()})
+
+def build_fighter_index(df):
+    """Map lowercase name and URL to the row label, for resolving user input to fighters."""
+    index = {}
+    for label, name, url in zip(df.index, df['Name'], df['URL']):
+        if isinstance(name, str):
+            index[name.strip().lower()] = label
+        if isinstance(url, str):
+            index[url.strip().lower()] = label
+    return index
+
+def resolve_fighter(index, key):
+    """Row label for a fighter name or ufcstats URL, or None if not found."""
+    if not isinstance(key, str):
+        return None
+    return index.get(key.strip().lower())
+
+PAIR_COLUMNS = ['a', 'b', 'Fighter_A', 'Fighter_B', 'prob_a', 'prob_b',
+                'predicted_winner', 'confidence', 'error']
+
+def predict_pairs(df, index, keys_a, keys_b, explain=False):
+    """
+    Resolve fighter names/URLs against index and score every pair in one batch.
+    Returns a DataFrame aligned with the inputs (columns PAIR_COLUMNS, plus
+    EXPLAIN_COLUMNS before 'error' with explain=True);
+    unresolved pairs have no probabilities and carry an 'error' message.
+    """
+    keys_a = list(keys_a)
+    keys_b = list(keys_b)
+    labels_a = [resolve_fighter(index, k) for k in keys_a]
+    labels_b = [resolve_fighter(index, k) for k in keys_b]
+
+    ok = []
+    errors = []
+    for ka, kb, la, lb in zip(keys_a, keys_b, labels_a, labels_b):
+        ok.append(la is not None and lb is not None)
+        if la is None:
+            errors.append(f"Unknown fighter: {ka}")
+        elif lb is None:
+            errors.append(f"Unknown fighter: {kb}")
+        else:
+            errors.append(None)
+
+    out = pd.DataFrame({'a': keys_a, 'b': keys_b})
+    positions = np.flatnonzero(ok)
+    if len(positions):
+        fighters_a = df.loc[[labels_a[i] for i in positions]].reset_index(drop=True)
+        fighters_b = df.loc[[labels_b[i] for i in positions]].reset_index(drop=True)
+        scored = predict_matchups_batch(fighters_a, fighters_b)
+        if explain:
+            scored = scored.join(explain_matchups(fighters_a, fighters_b)[EXPLAIN_COLUMNS])
+        scored.index = positions
+        out = out.join(scored)
+    out['error'] = errors
+    columns = PAIR_COLUMNS[:-1] + EXPLAIN_COLUMNS + ['error'] if explain else PAIR_COLUMNS
+    return out.reindex(columns=columns)
+
 if __name__ == "__main__":
     df = load_fighters()
     df = clean_fighters(df)
@@ -0,0 +1,187 @@
+"""
+Bounded, read-only SQL execution for the Database Inspector.
+Queries run on a read-only connection with a wall-clock budget enforced
+through SQLite's progress handler, and results are fetched in pages up to a row cap.
+"""
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from src.db_manager import get_readonly_connection, get_data_version
+
+MAX_ROWS = 5000        # Hard cap on rows returned to the UI
+PAGE_SIZE = 500        # Rows fetched per cursor round-trip
+TIMEOUT_S = 5.0        # Wall-clock budget per query (seconds)
+PROGRESS_STEPS = 10000 # SQLite VM instructions between budget checks
+
+CACHE_SIZE = 64        # Successful results kept in the in-process cache
+
+READ_ONLY_KEYWORDS = ('SELECT', 'WITH', 'VALUES', 'EXPLAIN')
+
+# Quoted literals are kept verbatim; any other whitespace run collapses to one space
+_WHITESPACE_OUTSIDE_QUOTES = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")|\s+")
+
+# Queries whose result changes on every run are never cached
+_VOLATILE = re.compile(r"\b(RANDOM|RANDOMBLOB|CURRENT_TIMESTAMP|CURRENT_DATE|CURRENT_TIME)\b|'now'", re.IGNORECASE)
+
+_result_cache = OrderedDict()
+
+def strip_sql_comments(query):
+    """Remove -- and /* */ comments so keyword checks see the real statement."""
+    out = []
+    i = 0
+    n = len(query)
+    quote = None
+    while i < n:
+        ch = query[i]
+        if quote:
+            out.append(ch)
+            if ch == quote:
+                quote = None
+            i += 1
+        elif ch in ("'", '"'):
+            quote = ch
+            out.append(ch)
+            i += 1
+        elif query.startswith('--', i):
+            end = query.find('\n', i)
+            i = n if end == -1 else end
+        elif query.startswith('/*', i):
+            end = query.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+            out.append(' ')
+        else:
+            out.append(ch)
+            i += 1
+    return ''.join(out)
+
+def normalize_sql(query):
+    """Canonical form of a query for cache keys: no comments, single spaces, no trailing ';'."""
+    body = strip_sql_comments(query)
+    body = _WHITESPACE_OUTSIDE_QUOTES.sub(lambda m: m.group(1) or ' ', body)
+    return body.strip().rstrip(';').strip()
+
+def is_read_only(query):
+    """Cheap pre-check: a single statement starting with a read keyword."""
+    body = strip_sql_comments(query).strip().rstrip(';').strip()
+    if not body or ';' in body:
+        return False
+    return body.split(None, 1)[0].upper() in READ_ONLY_KEYWORDS
+
+def install_budget(conn, timeout):
+    """Abort the running statement once the wall-clock budget is spent."""
+    deadline = time.perf_counter() + timeout
+
+    def handler():
+        # A non-zero return makes SQLite interrupt the current statement
+        return 1 if time.perf_counter() > deadline else 0
+
+    conn.set_progress_handler(handler, PROGRESS_STEPS)
+
+def explain_query_plan(query, conn=None):
+    """Return EXPLAIN QUERY PLAN output as indented lines."""
+    own_conn = conn is None
+    if own_conn:
+        conn = get_readonly_connection()
+    try:
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {query.strip().rstrip(';')}").fetchall()
+    except sqlite3.Error as e:
+        return [f"(no plan: {e})"]
+    finally:
+        if own_conn:
+            conn.close()
+
+    # Rows are (id, parent, notused, detail); indent children under their parent
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+def stream_query(query, page_size=PAGE_SIZE, max_rows=MAX_ROWS, timeout=TIMEOUT_S):
+    """
+    Yield DataFrame pages for a read-only query.
+    Stops after max_rows; raises sqlite3.OperationalError('interrupted') on timeout.
+    """
+    import pandas as pd  # Deferred: keeps the Inspector/ETL import path light
+    conn = get_readonly_connection()
+    try:
+        install_budget(conn, timeout)
+        cursor = conn.execute(query)
+        columns = [d[0] for d in cursor.description or []]
+        fetched = 0
+        while fetched < max_rows:
+            rows = cursor.fetchmany(min(page_size, max_rows - fetched))
+            if not rows:
+                break
+            fetched += len(rows)
+            yield pd.DataFrame.from_records(rows, columns=columns)
+    finally:
+        conn.close()
+
+def execute_query(query, page_size=PAGE_SIZE, max_rows=MAX_ROWS, timeout=TIMEOUT_S):
+    """
+    Run a query under the row cap and time budget.
+
+    Returns: dict with 'data' (DataFrame), 'truncated', 'elapsed_ms',
+    'plan' (list of lines) and 'error' (str or None).
+    """
+    import pandas as pd
+    result = {'data': pd.DataFrame(), 'truncated': False, 'elapsed_ms': 0.0,
+              'plan': [], 'error': None}
+
+    if not is_read_only(query):
+        result['error'] = "Only single SELECT / WITH / VALUES / EXPLAIN statements are allowed."
+        return result
+
+    result['plan'] = explain_query_plan(query)
+
+    pages = []
+    start = time.perf_counter()
+    try:
+        # Fetch one row past the cap to know whether the result was truncated
+        for page in stream_query(query, page_size, max_rows + 1, timeout):
+            pages.append(page)
+    except sqlite3.OperationalError as e:
+        if 'interrupted' in str(e):
+            result['error'] = f"Query exceeded the {timeout:g}s time budget and was cancelled."
+        else:
+            result['error'] = str(e)
+    except sqlite3.Error as e:
+        result['error'] = str(e)
+    result['elapsed_ms'] = (time.perf_counter() - start) * 1000
+
+    if pages:
+        df = pd.concat(pages, ignore_index=True)
+        if len(df) > max_rows:
+            result['truncated'] = True
+            df = df.iloc[:max_rows]
+        result['data'] = df
+    return result
+
+def cached_execute_query(query, page_size=PAGE_SIZE, max_rows=MAX_ROWS, timeout=TIMEOUT_S):
+    """
+    execute_query() behind an LRU cache keyed by normalized SQL and the DB data version.
+    Only successful, deterministic results are cached; the returned dict gains a 'cached' flag.
+    """
+    normalized = normalize_sql(query)
+    if _VOLATILE.search(normalized):
+        return dict(execute_query(query, page_size, max_rows, timeout), cached=False)
+
+    key = (normalized, get_data_version(), max_rows)
+    hit = _result_cache.get(key)
+    if hit is not None:
+        _result_cache.move_to_end(key)
+        return dict(hit, cached=True)
+
+    result = execute_query(query, page_size, max_rows, timeout)
+    if result['error'] is None:
+        _result_cache[key] = result
+        while len(_result_cache) > CACHE_SIZE:
+            _result_cache.popitem(last=False)
+    return dict(result, cached=False)
+
+def clear_result_cache():
+    """Drop every cached query result."""
+    _result_cache.clear()
@@ -0,0 +1,292 @@
+"""
+Opponent-aware fighter ratings: Elo and Glicko-2, computed from the `bouts` table.
+Each event date is one rating period, updated as a vectorized batch (every bout
+on the card uses the pre-event ratings). Ratings are stored in `fighter_ratings`
+keyed by ufcstats URL. New events are applied incrementally, touching only the
+fighters involved; a bout older than the last processed event triggers a full replay.
+
+Bouts come from the fight-history tables on fighter pages, e.g. from the raw
+HTML archive:
+    python -m src.ratings import-archive      # parse archived pages into `bouts`
+    python -m src.ratings replay              # full chronological replay
+    python -m src.ratings update              # apply bouts added since the last run
+    python -m src.ratings top -n 20
+"""
+import argparse
+import math
+import time
+from datetime import date
+import numpy as np
+from src.db_manager import get_connection, init_db
+from src.instrumentation import timed
+
+ELO_START = 1500.0
+ELO_K = 32.0
+GLICKO_START = 1500.0
+GLICKO_RD = 350.0
+GLICKO_VOLATILITY = 0.06
+TAU = 0.5                   # Glicko-2 system constant (volatility change)
+SCALE = 173.7178            # Glicko <-> Glicko-2 scale
+RATING_PERIOD_DAYS = 90     # Inactivity grows RD by one period's volatility every 90 days
+EPSILON = 1e-6
+
+class RatingState:
+    """Per-fighter rating arrays for a set of URLs (Glicko-2 internal scale)."""
+
+    def __init__(self, urls, rows=None):
+        self.urls = list(urls)
+        self.position = {url: i for i, url in enumerate(self.urls)}
+        n = len(self.urls)
+        self.elo = np.full(n, ELO_START)
+        self.mu = np.zeros(n)
+        self.phi = np.full(n, GLICKO_RD / SCALE)
+        self.sigma = np.full(n, GLICKO_VOLATILITY)
+        self.bouts = np.zeros(n, dtype=np.int64)
+        self.last_day = np.full(n, -1, dtype=np.int64)
+        for url, elo, glicko, rd, volatility, bouts, last in rows or []:
+            i = self.position[url]
+            self.elo[i] = elo
+            self.mu[i] = (glicko - GLICKO_START) / SCALE
+            self.phi[i] = rd / SCALE
+            self.sigma[i] = volatility
+            self.bouts[i] = bouts
+            self.last_day[i] = date.fromisoformat(last).toordinal() if last else -1
+
+    def rows(self, ids=None):
+        """(url, elo, glicko, rd, volatility, bouts, last_event_date) tuples for storage."""
+        ids = range(len(self.urls)) if ids is None else ids
+        return [(self.urls[i], float(self.elo[i]), float(self.mu[i] * SCALE + GLICKO_START),
+                 float(self.phi[i] * SCALE), float(self.sigma[i]), int(self.bouts[i]),
+                 date.fromordinal(int(self.last_day[i])).isoformat() if self.last_day[i] >= 0 else None)
+                for i in ids]
+
+def _g(phi):
+    return 1.0 / np.sqrt(1.0 + 3.0 * phi ** 2 / math.pi ** 2)
+
+def _new_volatility(sigma, phi, v, delta):
+    """Glicko-2 step 5 (Illinois algorithm), vectorized over fighters."""
+    a = np.log(sigma ** 2)
+
+    def f(x):
+        ex = np.exp(x)
+        return ex * (delta ** 2 - phi ** 2 - v - ex) / (2 * (phi ** 2 + v + ex) ** 2) - (x - a) / TAU ** 2
+
+    A = a.copy()
+    big = delta ** 2 > phi ** 2 + v
+    B = np.where(big, np.log(np.maximum(delta ** 2 - phi ** 2 - v, 1e-300)), a - TAU)
+    pending = ~big
+    k = 1
+    while pending.any() and k < 100:
+        pending &= f(a - k * TAU) < 0
+        k += 1
+        B = np.where(pending, a - k * TAU, B)
+
+    fA, fB = f(A), f(B)
+    for _ in range(100):
+        active = np.abs(B - A) > EPSILON
+        if not active.any():
+            break
+        C = A + (A - B) * fA / np.where(fB - fA == 0, 1e-300, fB - fA)
+        fC = f(C)
+        flip = active & (fC * fB <= 0)
+        A = np.where(flip, B, A)
+        fA = np.where(flip, fB, np.where(active, fA / 2, fA))
+        B = np.where(active, C, B)
+        fB = np.where(active, fC, fB)
+    return np.exp(A / 2)
+
+def apply_event(state, a_idx, b_idx, score_a, day):
+    """
+    Update `state` in place for one event: bouts a_idx[k] vs b_idx[k] with A's score.
+    All bouts use the ratings from before the event.
+    """
+    players = np.concatenate([a_idx, b_idx])
+    opponents = np.concatenate([b_idx, a_idx])
+    scores = np.concatenate([score_a, 1.0 - score_a])
+    involved = np.unique(players)
+
+    # Elo: simultaneous K-factor update
+    expected_elo = 1.0 / (1.0 + 10 ** ((state.elo[opponents] - state.elo[players]) / 400.0))
+    elo_delta = np.zeros(len(state.elo))
+    np.add.at(elo_delta, players, ELO_K * (scores - expected_elo))
+
+    # Glicko-2: grow RD for inactivity since each fighter's last bout, then one rating period
+    last = state.last_day[involved]
+    periods = np.where(last >= 0, (day - last) / RATING_PERIOD_DAYS, 0.0)
+    state.phi[involved] = np.minimum(np.sqrt(state.phi[involved] ** 2 + periods * state.sigma[involved] ** 2),
+                                     GLICKO_RD / SCALE)
+
+    g = _g(state.phi[opponents])
+    expected = 1.0 / (1.0 + np.exp(-g * (state.mu[players] - state.mu[opponents])))
+    v_inv = np.zeros(len(state.mu))
+    delta_sum = np.zeros(len(state.mu))
+    np.add.at(v_inv, players, g ** 2 * expected * (1 - expected))
+    np.add.at(delta_sum, players, g * (scores - expected))
+
+    v = 1.0 / v_inv[involved]
+    delta = v * delta_sum[involved]
+    phi = state.phi[involved]
+    sigma = _new_volatility(state.sigma[involved], phi, v, delta)
+    phi_star = np.sqrt(phi ** 2 + sigma ** 2)
+    new_phi = 1.0 / np.sqrt(1.0 / phi_star ** 2 + 1.0 / v)
+
+    state.mu[involved] += new_phi ** 2 * delta_sum[involved]
+    state.phi[involved] = new_phi
+    state.sigma[involved] = sigma
+    state.elo += elo_delta
+    np.add.at(state.bouts, players, 1)
+    state.last_day[involved] = day
+
+def _run_events(state, bouts):
+    """Apply (event_date, a_url, b_url, score_a) rows, already sorted by date, event by event."""
+    if not bouts:
+        return
+    days = np.array([date.fromisoformat(b[0]).toordinal() for b in bouts])
+    a_idx = np.array([state.position[b[1]] for b in bouts])
+    b_idx = np.array([state.position[b[2]] for b in bouts])
+    scores = np.array([b[3] for b in bouts], dtype=float)
+    starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+    ends = np.r_[starts[1:], len(days)]
+    for lo, hi in zip(starts, ends):
+        apply_event(state, a_idx[lo:hi], b_idx[lo:hi], scores[lo:hi], days[lo])
+
+def _set_meta(conn, key, value):
+    conn.execute("INSERT INTO meta (key, value) VALUES (?, ?) "
+                 "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (key, str(value)))
+
+def _get_meta(conn, key):
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+_RATED_BOUTS = ("SELECT id, event_date, fighter_a_url, fighter_b_url, score_a FROM bouts "
+                "WHERE score_a IS NOT NULL {where} ORDER BY event_date, id")
+
+@timed('ratings.replay_all')
+def replay_all(conn=None):
+    """Recompute every rating from scratch over all bouts in date order. Returns fighters rated."""
+    own_conn = conn is None
+    if own_conn:
+        init_db()
+        conn = get_connection()
+    try:
+        rows = conn.execute(_RATED_BOUTS.format(where='')).fetchall()
+        urls = sorted({r[2] for r in rows} | {r[3] for r in rows})
+        state = RatingState(urls)
+        _run_events(state, [r[1:] for r in rows])
+        conn.execute("DELETE FROM fighter_ratings")
+        conn.executemany("INSERT INTO fighter_ratings VALUES (?, ?, ?, ?, ?, ?, ?)", state.rows())
+        _set_meta(conn, 'ratings_last_bout_id', max((r[0] for r in rows), default=0))
+        _set_meta(conn, 'ratings_last_date', rows[-1][1] if rows else '')
+        conn.commit()
+    finally:
+        if own_conn:
+            conn.close()
+    return len(urls)
+
+@timed('ratings.update')
+def update_ratings(conn=None):
+    """
+    Apply bouts added since the last run, loading and writing only the fighters in them.
+    Falls back to replay_all if a new bout is not later than the last processed event.
+    Returns the number of fighters updated.
+    """
+    own_conn = conn is None
+    if own_conn:
+        init_db()
+        conn = get_connection()
+    try:
+        last_id = int(_get_meta(conn, 'ratings_last_bout_id') or 0)
+        last_date = _get_meta(conn, 'ratings_last_date') or ''
+        rows = conn.execute(_RATED_BOUTS.format(where='AND id > ?'), (last_id,)).fetchall()
+        if not rows:
+            return 0
+        if last_date and rows[0][1] <= last_date:
+            print("New bouts are not later than the last processed event; replaying full history.")
+            return replay_all(conn)
+
+        urls = sorted({r[2] for r in rows} | {r[3] for r in rows})
+        placeholders = ', '.join('?' * len(urls))
+        existing = conn.execute(f"SELECT * FROM fighter_ratings WHERE url IN ({placeholders})", urls).fetchall()
+        state = RatingState(urls, existing)
+        _run_events(state, [r[1:] for r in rows])
+        conn.executemany("""
+            INSERT INTO fighter_ratings VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET elo = excluded.elo, glicko = excluded.glicko,
+                rd = excluded.rd, volatility = excluded.volatility, bouts = excluded.bouts,
+                last_event_date = excluded.last_event_date
+        """, state.rows())
+        _set_meta(conn, 'ratings_last_bout_id', max(r[0] for r in rows))
+        _set_meta(conn, 'ratings_last_date', rows[-1][1])
+        conn.commit()
+    finally:
+        if own_conn:
+            conn.close()
+    return len(urls)
+
+def record_bouts(bouts, conn=None):
+    """
+    Insert bouts parsed by scraper.parse_fight_history (duplicates from the
+    opponent's page are ignored). Returns the number of new bouts.
+    """
+    own_conn = conn is None
+    if own_conn:
+        init_db()
+        conn = get_connection()
+    try:
+        before = conn.total_changes
+        conn.executemany("""
+            INSERT OR IGNORE INTO bouts (fight_key, event, event_date, fighter_a_url, fighter_b_url, score_a)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [(b['fight_key'], b['event'], b['event_date'], b['fighter_url'], b['opponent_url'], b['score'])
+              for b in bouts])
+        conn.commit()
+        return conn.total_changes - before
+    finally:
+        if own_conn:
+            conn.close()
+
+def import_from_archive(archive_path=None):
+    """Parse fight histories from the newest archived copy of every fighter page into `bouts`."""
+    from src.html_archive import HtmlArchive, ARCHIVE_PATH, decompress
+    from src.scraper import parse_fight_history
+    bouts = []
+    with HtmlArchive(archive_path or ARCHIVE_PATH) as archive:
+        for url, codec, blob in archive.iter_latest_blobs():
+            bouts.extend(parse_fight_history(decompress(codec, blob), url))
+    # Oldest first, so autoincrement ids follow the calendar
+    bouts.sort(key=lambda b: b['event_date'])
+    added = record_bouts(bouts)
+    print(f"Parsed {len(bouts)} bout rows from the archive; {added} new bouts recorded.")
+    return added
+
+def expected_score(rating_a, rd_a, rating_b, rd_b):
+    """Glicko-2 expected score of A against B, accounting for both fighters' uncertainty."""
+    mu_diff = (np.asarray(rating_a, dtype=float) - rating_b) / SCALE
+    phi = np.sqrt((np.asarray(rd_a, dtype=float) / SCALE) ** 2 + (np.asarray(rd_b, dtype=float) / SCALE) ** 2)
+    return 1.0 / (1.0 + np.exp(-_g(phi) * mu_diff))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Elo / Glicko-2 fighter ratings")
+    parser.add_argument('command', choices=['import-archive', 'replay', 'update', 'top'])
+    parser.add_argument('--archive', default=None)
+    parser.add_argument('-n', type=int, default=20)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == 'import-archive':
+        import_from_archive(args.archive)
+        print(f"Updated ratings for {update_ratings()} fighters.")
+    elif args.command == 'replay':
+        print(f"Rated {replay_all()} fighters in {time.perf_counter() - start:.2f}s")
+    elif args.command == 'update':
+        print(f"Updated ratings for {update_ratings()} fighters in {time.perf_counter() - start:.2f}s")
+    else:
+        conn = get_connection()
+        rows = conn.execute("""
+            SELECT COALESCE(f.name, r.url), r.glicko, r.rd, r.elo, r.bouts
+            FROM fighter_ratings r LEFT JOIN fighters f ON f.url = r.url
+            ORDER BY r.glicko - 2 * r.rd DESC LIMIT ?
+        """, (args.n,)).fetchall()
+        conn.close()
+        for name, glicko, rd, elo, bouts in rows:
+            print(f"  {name:<32}{glicko:>8.0f} ±{2 * rd:<6.0f}{elo:>8.0f}{bouts:>5}")
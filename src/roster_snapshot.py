@@ -0,0 +1,354 @@
+"""
+Roster snapshots: one compressed, versioned, checksummed file for shipping the
+roster to other machines instead of copying ufc_data.db and the CSVs around.
+
+A snapshot is an uncompressed tar of Arrow IPC files plus a manifest:
+    manifest.json                 format version, source ETL version, snapshot id,
+                                  row counts and a SHA-256 per member
+    tables/fighters.arrow         cleaned roster as stored by the ETL (zstd-compressed)
+    tables/fighter_stats.arrow
+    tables/fighter_ratings.arrow  optional ratings group (with bouts.arrow)
+    matrices/<class>.arrow        optional per-weight-class probability matrices,
+                                  stored uncompressed
+Members are read straight out of the memory-mapped snapshot file, so the
+uncompressed matrices come back as zero-copy NumPy views. The snapshot id hashes
+the members' checksums; importing a snapshot whose id the database already
+carries is a no-op, so imports are idempotent.
+
+Requires the optional `pyarrow` package.
+
+Usage:
+    python -m src.roster_snapshot export data/roster.snapshot --matrices
+    python -m src.roster_snapshot info data/roster.snapshot
+    python -m src.roster_snapshot import data/roster.snapshot
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import sqlite3
+import tarfile
+from datetime import datetime, timezone
+from src.db_manager import init_db, get_connection, get_readonly_connection, bump_data_version
+from src.instrumentation import timed
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:
+    pa = None
+
+FORMAT = 'ufc-roster-snapshot'
+FORMAT_VERSION = 1
+SNAPSHOT_PATH = os.path.join('data', 'roster.snapshot')
+COMPRESSION = 'zstd'      # Arrow IPC buffer compression for tables; matrices (float noise, ~7% smaller
+                          # under zstd) stay uncompressed so they can be read zero-copy
+RATINGS_META = ['ratings_last_bout_id', 'ratings_last_date']
+
+# (column, type) per table; numbers the ETL may store as REAL travel as float64
+TEXT, INT, FLOAT = 'string', 'int64', 'float64'
+TABLES = {
+    'fighters': [('id', INT), ('name', TEXT), ('nickname', TEXT), ('height_cm', FLOAT), ('reach_cm', FLOAT),
+                 ('stance', TEXT), ('dob', TEXT), ('weight_lbs', FLOAT), ('weight_class', TEXT), ('url', TEXT)],
+    'fighter_stats': [('id', INT), ('fighter_id', INT), ('wins', FLOAT), ('losses', FLOAT), ('draws', FLOAT),
+                      ('sapm', FLOAT), ('slpm', FLOAT), ('str_acc', FLOAT), ('str_def', FLOAT),
+                      ('td_avg', FLOAT), ('td_acc', FLOAT), ('td_def', FLOAT), ('sub_avg', FLOAT)],
+    'fighter_ratings': [('url', TEXT), ('elo', FLOAT), ('glicko', FLOAT), ('rd', FLOAT), ('volatility', FLOAT),
+                        ('bouts', INT), ('last_event_date', TEXT)],
+    'bouts': [('id', INT), ('fight_key', TEXT), ('event', TEXT), ('event_date', TEXT),
+              ('fighter_a_url', TEXT), ('fighter_b_url', TEXT), ('score_a', FLOAT)],
+}
+GROUPS = {'roster': ['fighters', 'fighter_stats'], 'ratings': ['fighter_ratings', 'bouts']}
+ORDER_BY = {'fighters': 'id', 'fighter_stats': 'id', 'fighter_ratings': 'url', 'bouts': 'id'}
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("Roster snapshots need the 'pyarrow' package (pip install pyarrow)")
+
+def _sha256(data):
+    return hashlib.sha256(memoryview(data)).hexdigest()
+
+def _ipc_bytes(table, compression=COMPRESSION):
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+def _read_table(conn, name):
+    columns = TABLES[name]
+    rows = conn.execute(f"SELECT {', '.join(c for c, _ in columns)} FROM {name} "
+                        f"ORDER BY {ORDER_BY[name]}").fetchall()
+    values = list(zip(*rows)) if rows else [()] * len(columns)
+    return pa.table({col: pa.array(list(vals), type=pa.type_for_alias(kind))
+                     for (col, kind), vals in zip(columns, values)})
+
+def _has_rows(conn, name):
+    try:
+        return conn.execute(f"SELECT 1 FROM {name} LIMIT 1").fetchone() is not None
+    except sqlite3.Error:
+        return False
+
+def _meta(conn, key):
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    except sqlite3.Error:  # Database predates the meta table
+        return None
+    return row[0] if row else None
+
+def _matrix_members():
+    """(weight_class, Arrow table, frame_key) for every weight class of the cleaned roster."""
+    from src.processor import load_fighters, clean_fighters, predict_matrix
+    from src.shared_cache import frame_key
+    df = clean_fighters(load_fighters())
+    members = []
+    for weight_class in sorted(df['WeightClass'].unique()):
+        pool = df[df['WeightClass'] == weight_class].reset_index(drop=True)
+        matrix = predict_matrix(pool)
+        n = len(pool)
+        # One row per fighter; the fixed-size lists share one contiguous n*n value buffer
+        probs = pa.FixedSizeListArray.from_arrays(pa.array(matrix.reshape(-1), type=pa.float64()), n)
+        table = pa.table({'url': pa.array(pool['URL'].astype(object).tolist(), type=pa.string()),
+                          'name': pa.array(pool['Name'].astype(object).tolist(), type=pa.string()),
+                          'p': probs})
+        members.append((weight_class, table, frame_key(pool)))
+    return members
+
+def _slug(text):
+    return re.sub(r'[^a-z0-9]+', '_', str(text).lower()).strip('_') or 'unknown'
+
+@timed('roster_snapshot.export')
+def export_snapshot(path=SNAPSHOT_PATH, ratings=True, matrices=False):
+    """
+    Write the current database roster (plus ratings / probability matrices) to `path`.
+    Returns the manifest.
+    """
+    _require_pyarrow()
+    conn = get_readonly_connection()
+    try:
+        groups = ['roster'] + (['ratings'] if ratings and _has_rows(conn, 'fighter_ratings') else [])
+        members = {}
+        manifest = {'format': FORMAT, 'format_version': FORMAT_VERSION, 'groups': groups,
+                    'tables': {}, 'matrices': {}, 'meta': {}}
+        for group in groups:
+            for name in GROUPS[group]:
+                table = _read_table(conn, name)
+                data = _ipc_bytes(table)
+                member = f"tables/{name}.arrow"
+                members[member] = data
+                manifest['tables'][name] = {'file': member, 'rows': table.num_rows,
+                                            'bytes': data.size, 'sha256': _sha256(data)}
+        if 'ratings' in groups:
+            for key in RATINGS_META:
+                if _meta(conn, key) is not None:
+                    manifest['meta'][key] = _meta(conn, key)
+        manifest['source_etl_version'] = int(_meta(conn, 'etl_version') or 0)
+    finally:
+        conn.close()
+
+    if matrices:
+        for weight_class, table, key in _matrix_members():
+            data = _ipc_bytes(table, compression=None)
+            member = f"matrices/{_slug(weight_class)}.arrow"
+            members[member] = data
+            manifest['matrices'][weight_class] = {'file': member, 'fighters': table.num_rows, 'frame_key': key,
+                                                  'bytes': data.size, 'sha256': _sha256(data)}
+
+    # The id covers content only, so re-exporting unchanged data yields the same id
+    checksums = sorted((member, _sha256(data)) for member, data in members.items())
+    manifest['snapshot_id'] = hashlib.sha256(json.dumps(checksums).encode('utf-8')).hexdigest()[:16]
+    manifest['created_at'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with tarfile.open(tmp, 'w', format=tarfile.PAX_FORMAT) as tar:
+        for member, data in [('manifest.json', json.dumps(manifest, indent=1).encode('utf-8'))] + \
+                            sorted(members.items()):
+            info = tarfile.TarInfo(member)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(memoryview(data)))
+    os.replace(tmp, path)
+    size = os.path.getsize(path)
+    print(f"Exported snapshot {manifest['snapshot_id']} to {path} ({size / 1024:,.0f} KiB): "
+          f"{manifest['tables']['fighters']['rows']} fighters, groups {', '.join(groups)}, "
+          f"{len(manifest['matrices'])} matrices.")
+    return manifest
+
+class Snapshot:
+    """A snapshot file opened for reading; members are zero-copy slices of the mapped file."""
+
+    def __init__(self, path, verify=True):
+        _require_pyarrow()
+        self.path = path
+        with tarfile.open(path, 'r:') as tar:
+            self._offsets = {m.name: (m.offset_data, m.size) for m in tar.getmembers() if m.isfile()}
+        self._file = pa.memory_map(path, 'r')
+        self._buffer = self._file.read_buffer()
+        self.manifest = json.loads(self._member('manifest.json').to_pybytes())
+        if self.manifest.get('format') != FORMAT:
+            raise ValueError(f"{path} is not a roster snapshot")
+        if self.manifest['format_version'] > FORMAT_VERSION:
+            raise ValueError(f"{path} has snapshot format {self.manifest['format_version']}; "
+                             f"this version reads up to {FORMAT_VERSION}")
+        if verify:
+            self.verify()
+
+    def _member(self, name):
+        offset, size = self._offsets[name]
+        return self._buffer.slice(offset, size)
+
+    def _entries(self):
+        return list(self.manifest['tables'].values()) + list(self.manifest['matrices'].values())
+
+    def verify(self):
+        """Raise ValueError if any member is missing or its checksum does not match the manifest."""
+        for entry in self._entries():
+            if entry['file'] not in self._offsets or _sha256(self._member(entry['file'])) != entry['sha256']:
+                raise ValueError(f"Snapshot {self.path}: checksum mismatch for {entry['file']}")
+
+    def table(self, name):
+        """One exported table as a pyarrow Table."""
+        return pa.ipc.open_file(self._member(self.manifest['tables'][name]['file'])).read_all()
+
+    def matrix(self, weight_class):
+        """(urls, matrix) for a weight class; the matrix is a read-only view of the mapped file."""
+        table = pa.ipc.open_file(self._member(self.manifest['matrices'][weight_class]['file'])).read_all()
+        probs = table.column('p').combine_chunks()
+        n = len(probs)
+        matrix = probs.values.to_numpy(zero_copy_only=True).reshape(n, n)
+        return table.column('url').to_pylist(), matrix
+
+    def close(self):
+        self._buffer = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _rows(table):
+    return zip(*[column.to_pylist() for column in table.columns])
+
+def _insert(conn, name, table):
+    columns = [c for c, _ in TABLES[name]]
+    conn.executemany(f"INSERT INTO {name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                     _rows(table.select(columns)))
+
+def _seed_matrix_cache(snap):
+    """Hand the snapshot's matrices to the shared cache so workers don't recompute them."""
+    from src import shared_cache
+    if not shared_cache.enabled():
+        return 0
+    for weight_class, entry in snap.manifest['matrices'].items():
+        _, matrix = snap.matrix(weight_class)
+        shared_cache.get_or_compute('matrices', entry['frame_key'], lambda: matrix, kind='npy')
+    return len(snap.manifest['matrices'])
+
+def _is_loaded(conn, manifest):
+    """
+    True when the database still holds exactly this snapshot: same id, no ETL/merge
+    since the import (etl_version unchanged) and no ratings update (ratings meta unchanged).
+    """
+    if _meta(conn, 'snapshot_id') != manifest['snapshot_id']:
+        return False
+    if _meta(conn, 'snapshot_etl_version') != _meta(conn, 'etl_version'):
+        return False
+    if any(_meta(conn, key) != value for key, value in manifest['meta'].items()):
+        return False
+    count = conn.execute("SELECT COUNT(*) FROM fighters").fetchone()[0]
+    return count == manifest['tables']['fighters']['rows']
+
+@timed('roster_snapshot.import')
+def import_snapshot(path=SNAPSHOT_PATH, force=False):
+    """
+    Load a snapshot into the database, replacing the roster (and ratings if included).
+    Does nothing when the database already holds this snapshot (unless force).
+    Returns: summary dict, or None if the snapshot failed verification.
+    """
+    from src.change_feed import snapshot as feed_snapshot, record_changes
+    try:
+        snap = Snapshot(path)
+    except ValueError as e:
+        print(f"Import failed: {e}; database left unchanged.")
+        return None
+    with snap:
+        manifest = snap.manifest
+        summary = {'snapshot_id': manifest['snapshot_id'], 'fighters': manifest['tables']['fighters']['rows'],
+                   'groups': manifest['groups'], 'imported': False}
+        init_db()
+        conn = get_connection()
+        try:
+            if not force and _is_loaded(conn, manifest):
+                print(f"Snapshot {manifest['snapshot_id']} is already loaded; nothing to do.")
+                return summary
+
+            before = feed_snapshot(conn)
+            for group in manifest['groups']:
+                for name in reversed(GROUPS[group]):
+                    conn.execute(f"DELETE FROM {name}")
+                for name in GROUPS[group]:
+                    _insert(conn, name, snap.table(name))
+            for key, value in manifest['meta'].items():
+                conn.execute("INSERT INTO meta (key, value) VALUES (?, ?) "
+                             "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (key, value))
+            conn.execute("INSERT INTO meta (key, value) VALUES ('snapshot_id', ?) "
+                         "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (manifest['snapshot_id'],))
+            bump_data_version(conn)
+            # Later loads bump etl_version past this, so a re-import isn't mistaken for a no-op
+            conn.execute("INSERT INTO meta (key, value) VALUES ('snapshot_etl_version', ?) "
+                         "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (_meta(conn, 'etl_version'),))
+            record_changes(conn, before)
+            conn.commit()
+
+            from src.saved_queries import refresh_all as refresh_saved_queries
+            refresh_saved_queries(conn)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        from src.similarity import update_index as update_similarity_index
+        update_similarity_index()
+        summary['matrices_cached'] = _seed_matrix_cache(snap)
+    summary['imported'] = True
+    print(f"Imported snapshot {manifest['snapshot_id']}: {summary['fighters']} fighters "
+          f"({', '.join(manifest['groups'])}).")
+    return summary
+
+def format_info(manifest, path=None):
+    lines = [f"Snapshot {manifest['snapshot_id']} (format v{manifest['format_version']}, "
+             f"source ETL v{manifest['source_etl_version']}, created {manifest['created_at']})"]
+    if path:
+        lines[0] += f", {os.path.getsize(path) / 1024:,.0f} KiB"
+    for name, entry in manifest['tables'].items():
+        lines.append(f"  table  {name:<20}{entry['rows']:>8} rows{entry['bytes'] / 1024:>10,.0f} KiB")
+    for weight_class, entry in manifest['matrices'].items():
+        lines.append(f"  matrix {weight_class:<20}{entry['fighters']:>8} fighters{entry['bytes'] / 1024:>6,.0f} KiB")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export / import a compressed, checksummed roster snapshot")
+    sub = parser.add_subparsers(dest='command', required=True)
+    export_cmd = sub.add_parser('export', help="Write the database roster to a snapshot file")
+    export_cmd.add_argument('path', nargs='?', default=SNAPSHOT_PATH)
+    export_cmd.add_argument('--no-ratings', action='store_true', help="Leave out ratings and bouts")
+    export_cmd.add_argument('--matrices', action='store_true', help="Include per-weight-class probability matrices")
+    import_cmd = sub.add_parser('import', help="Load a snapshot into ufc_data.db (no-op if already loaded)")
+    import_cmd.add_argument('path', nargs='?', default=SNAPSHOT_PATH)
+    import_cmd.add_argument('--force', action='store_true')
+    info_cmd = sub.add_parser('info', help="Verify a snapshot and list its contents")
+    info_cmd.add_argument('path', nargs='?', default=SNAPSHOT_PATH)
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        export_snapshot(args.path, ratings=not args.no_ratings, matrices=args.matrices)
+    elif args.command == 'import':
+        import_snapshot(args.path, force=args.force)
+    else:
+        with Snapshot(args.path) as snap:
+            print(format_info(snap.manifest, args.path))
@@ -0,0 +1,251 @@
+"""
+Paginated, sortable and filterable access to the fighters tables for the UI.
+Pages are fetched straight from SQLite with keyset pagination (WHERE sort > last
+value ... LIMIT n) over the indexes created by init_db, so a page costs the same
+and renders the same number of rows however large the roster gets.
+
+    page = fetch_page({'weight_class': 'Lightweight'}, sort='SLpM', descending=True)
+    page['rows']                                   # DataFrame of up to PAGE_SIZE fighters
+    fetch_page(..., cursor=page['next_cursor'])    # the page after it
+    fetch_fighter('Jon Jones')                     # one fighter, for the detail page
+
+Usage:
+    python -m src.roster_table --weight-class Lightweight --sort SLpM --desc
+"""
+import argparse
+import sqlite3
+import pandas as pd
+from src.db_manager import get_readonly_connection
+from src.instrumentation import timed
+
+PAGE_SIZE = 50
+BOUTS_LIMIT = 20
+
+# Display name -> SQL expression; same aliases as processor.load_fighters
+COLUMNS = {
+    'Name': 'f.name', 'Nickname': 'f.nickname', 'WeightClass': 'f.weight_class',
+    'Stance': 'f.stance', 'Height_cm': 'f.height_cm', 'Reach_cm': 'f.reach_cm',
+    'Weight_lbs': 'f.weight_lbs', 'DOB': 'f.dob',
+    'Wins': 's.wins', 'Losses': 's.losses', 'Draws': 's.draws',
+    'SLpM': 's.slpm', 'Str_Acc': 's.str_acc', 'SApM': 's.sapm', 'Str_Def': 's.str_def',
+    'TD_Avg': 's.td_avg', 'TD_Acc': 's.td_acc', 'TD_Def': 's.td_def', 'Sub_Avg': 's.sub_avg',
+    'URL': 'f.url',
+}
+# Sort keys backed by an index (see db_manager.init_db); others would scan the table
+SORT_COLUMNS = ['Name', 'Height_cm', 'Reach_cm', 'Wins', 'Losses', 'SLpM', 'Str_Acc',
+                'SApM', 'Str_Def', 'TD_Avg', 'TD_Acc', 'TD_Def', 'Sub_Avg']
+
+def _with_conn(fn, conn=None):
+    own_conn = conn is None
+    if own_conn:
+        conn = get_readonly_connection()
+    try:
+        return fn(conn)
+    finally:
+        if own_conn:
+            conn.close()
+
+def _where(filters):
+    """
+    WHERE clause and parameters for a filters dict: weight_class, stances (list),
+    min_fights and search (case-insensitive substring of the name).
+    """
+    filters = filters or {}
+    clauses, params = [], []
+    if filters.get('weight_class'):
+        clauses.append("f.weight_class = ?")
+        params.append(filters['weight_class'])
+    if filters.get('stances') is not None:
+        stances = list(filters['stances'])
+        clauses.append(f"f.stance IN ({', '.join('?' * len(stances))})" if stances else "0")
+        params.extend(stances)
+    if filters.get('min_fights'):
+        clauses.append("s.wins + s.losses + COALESCE(s.draws, 0) >= ?")
+        params.append(filters['min_fights'])
+    if filters.get('search'):
+        clauses.append("f.name LIKE ?")
+        params.append(f"%{filters['search']}%")
+    return clauses, params
+
+def _after(expr, descending, cursor):
+    """
+    Keyset condition for rows after cursor = (sort value, fighter id) in the order
+    ORDER BY expr, f.id (both DESC if descending). SQLite sorts NULLs first ascending
+    and last descending, which the NULL branches mirror.
+    """
+    value, last_id = cursor
+    if descending:
+        if value is None:
+            return f"({expr} IS NULL AND f.id < ?)", [last_id]
+        return f"({expr} < ? OR ({expr} = ? AND f.id < ?) OR {expr} IS NULL)", [value, value, last_id]
+    if value is None:
+        return f"(({expr} IS NULL AND f.id > ?) OR {expr} IS NOT NULL)", [last_id]
+    return f"({expr} > ? OR ({expr} = ? AND f.id > ?))", [value, value, last_id]
+
+@timed('roster_table.fetch_page')
+def fetch_page(filters=None, sort='Name', descending=False, page_size=PAGE_SIZE,
+               cursor=None, columns=None, conn=None):
+    """
+    One page of fighters matching `filters`, ordered by `sort` (a COLUMNS key).
+    cursor: None for the first page, else the previous page's 'next_cursor'.
+    Returns: dict with 'rows' (DataFrame: id plus `columns`, default all COLUMNS)
+    and 'next_cursor' (None on the last page).
+    """
+    if sort not in COLUMNS:
+        raise ValueError(f"Unknown sort column: {sort}")
+    columns = list(dict.fromkeys(columns or COLUMNS))
+    unknown = [col for col in columns if col not in COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+    expr = COLUMNS[sort]
+    clauses, params = _where(filters)
+    if cursor is not None:
+        clause, cursor_params = _after(expr, descending, cursor)
+        clauses.append(clause)
+        params.extend(cursor_params)
+    direction = 'DESC' if descending else 'ASC'
+    select = ", ".join(f"{COLUMNS[col]} AS {col}" for col in dict.fromkeys(columns + [sort]))
+    query = f"""
+        SELECT f.id AS id, {select}
+        FROM fighters f
+        JOIN fighter_stats s ON s.fighter_id = f.id
+        {'WHERE ' + ' AND '.join(clauses) if clauses else ''}
+        ORDER BY {expr} {direction}, f.id {direction}
+        LIMIT ?
+    """
+
+    def read(conn):
+        # One extra row tells whether another page follows
+        rows = pd.read_sql_query(query, conn, params=params + [page_size + 1])
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows.iloc[:page_size]
+            last = rows.iloc[-1]
+            value = None if pd.isna(last[sort]) else last[sort]
+            next_cursor = (value.item() if hasattr(value, 'item') else value, int(last['id']))
+        return {'rows': rows[['id'] + columns], 'next_cursor': next_cursor}
+    return _with_conn(read, conn)
+
+@timed('roster_table.count_rows')
+def count_rows(filters=None, conn=None):
+    """Number of fighters matching `filters`."""
+    clauses, params = _where(filters)
+    query = f"""
+        SELECT COUNT(*) FROM fighters f
+        JOIN fighter_stats s ON s.fighter_id = f.id
+        {'WHERE ' + ' AND '.join(clauses) if clauses else ''}
+    """
+    return _with_conn(lambda conn: conn.execute(query, params).fetchone()[0], conn)
+
+def weight_classes(conn=None):
+    """Distinct weight classes, for filter widgets (reads the weight_class index only)."""
+    query = "SELECT DISTINCT weight_class FROM fighters WHERE weight_class IS NOT NULL ORDER BY weight_class"
+    return _with_conn(lambda conn: [row[0] for row in conn.execute(query)], conn)
+
+@timed('roster_table.fetch_fighter')
+def fetch_fighter(key, conn=None):
+    """
+    One fighter by id, ufcstats URL or exact name, with their Glicko-2 rating and
+    most recent bouts when those tables exist. Returns: dict, or None if not found.
+    """
+    select = ", ".join(f"{expr} AS {col}" for col, expr in COLUMNS.items())
+    base = f"SELECT f.id AS id, {select} FROM fighters f JOIN fighter_stats s ON s.fighter_id = f.id"
+
+    def read(conn):
+        conn.row_factory = sqlite3.Row
+        if isinstance(key, int):
+            row = conn.execute(f"{base} WHERE f.id = ?", (key,)).fetchone()
+        else:
+            key_text = str(key).strip()
+            row = conn.execute(f"{base} WHERE f.url = ?", (key_text,)).fetchone() or \
+                conn.execute(f"{base} WHERE f.name = ?", (key_text,)).fetchone()
+        if row is None:
+            return None
+        fighter = dict(row)
+        fighter['rating'] = _optional(conn, """
+            SELECT elo, glicko, rd, bouts, last_event_date FROM fighter_ratings WHERE url = ?
+        """, (fighter['URL'],), one=True)
+        fighter['bouts'] = _optional(conn, """
+            SELECT b.event_date, b.event, COALESCE(o.name, b.opponent_url) AS opponent, b.score
+            FROM (SELECT event_date, event, fighter_b_url AS opponent_url, score_a AS score
+                  FROM bouts WHERE fighter_a_url = ?
+                  UNION ALL
+                  SELECT event_date, event, fighter_a_url, 1 - score_a FROM bouts WHERE fighter_b_url = ?
+                  ORDER BY event_date DESC LIMIT ?) b
+            LEFT JOIN fighters o ON o.url = b.opponent_url
+            ORDER BY b.event_date DESC
+        """, (fighter['URL'], fighter['URL'], BOUTS_LIMIT)) or []
+        return fighter
+    return _with_conn(read, conn)
+
+def _optional(conn, query, params, one=False):
+    """Run a query against a table that may not exist yet (ratings, bouts); None if missing."""
+    try:
+        cursor = conn.execute(query, params)
+    except sqlite3.Error:
+        return None
+    if one:
+        row = cursor.fetchone()
+        return dict(row) if row else None
+    return [dict(row) for row in cursor.fetchall()]
+
+def paged_table(key, filters=None, columns=None, page_size=PAGE_SIZE, default_sort='Name'):
+    """
+    Streamlit widget: sort controls, one page of rows and prev/next buttons.
+    Cursors for the pages already visited live in st.session_state[key]; they reset
+    whenever the filters or sort change.
+    """
+    import streamlit as st
+
+    sort_col, order_col, count_col = st.columns([2, 1, 2])
+    with sort_col:
+        sort = st.selectbox("Sort by", SORT_COLUMNS, index=SORT_COLUMNS.index(default_sort), key=f"{key}_sort")
+    with order_col:
+        descending = st.toggle("Descending", value=sort != 'Name', key=f"{key}_desc")
+
+    state = st.session_state.setdefault(key, {'query': None, 'cursors': [None]})
+    query_key = repr((filters, sort, descending, columns, page_size))
+    if state['query'] != query_key:
+        state['query'], state['cursors'] = query_key, [None]
+
+    page = fetch_page(filters, sort, descending, page_size, state['cursors'][-1], columns)
+    total = count_rows(filters)
+    page_number = len(state['cursors'])
+    with count_col:
+        st.caption(f"Page {page_number} of {max(1, -(-total // page_size))} · {total:,} fighters")
+
+    st.dataframe(page['rows'].drop(columns='id'), hide_index=True, use_container_width=True)
+
+    prev_col, next_col = st.columns(2)
+    with prev_col:
+        if st.button("◀ Previous", key=f"{key}_prev", disabled=page_number == 1):
+            state['cursors'].pop()
+            st.rerun()
+    with next_col:
+        if st.button("Next ▶", key=f"{key}_next", disabled=page['next_cursor'] is None):
+            state['cursors'].append(page['next_cursor'])
+            st.rerun()
+    return page
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Page through the fighters table")
+    parser.add_argument('--weight-class')
+    parser.add_argument('--search')
+    parser.add_argument('--min-fights', type=int)
+    parser.add_argument('--sort', default='Name', choices=list(COLUMNS))
+    parser.add_argument('--desc', action='store_true')
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--pages', type=int, default=1, help="Pages to print")
+    args = parser.parse_args()
+
+    filters = {'weight_class': args.weight_class, 'search': args.search, 'min_fights': args.min_fights}
+    cursor = None
+    with pd.option_context('display.width', 200, 'display.max_columns', 12):
+        for _ in range(args.pages):
+            page = fetch_page(filters, args.sort, args.desc, args.page_size, cursor,
+                              columns=list(dict.fromkeys(['Name', 'WeightClass', 'Wins', 'Losses', args.sort])))
+            print(page['rows'].drop(columns='id').to_string(index=False))
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+    print(f"{count_rows(filters):,} fighters match.")
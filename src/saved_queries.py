@@ -0,0 +1,131 @@
+"""
+Saved Inspector queries materialized as tables.
+Each saved query <name> is stored in `saved_queries` and its result kept in
+table `mv_<name>`, rebuilt at the end of every ETL run.
+Materializing runs under the Inspector's wall-clock budget plus a row cap, so a
+runaway query (e.g. an accidental cross join) fails fast instead of hanging the ETL.
+"""
+import re
+import sqlite3
+from src.db_manager import get_connection, init_db
+from src.query_executor import is_read_only, install_budget, TIMEOUT_S
+
+TABLE_PREFIX = "mv_"
+NAME_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]{0,40}$')
+MAX_ROWS = 100_000   # Rows a materialized query may hold
+
+def table_name(name):
+    """Table holding the materialized result of a saved query."""
+    return f"{TABLE_PREFIX}{name}"
+
+def _materialize(conn, name, sql, timeout=TIMEOUT_S, max_rows=MAX_ROWS):
+    """
+    (Re)build mv_<name> from sql and return its row count. Raises ValueError past the
+    time budget or row cap; the caller rolls back, keeping any previous table.
+    """
+    table = table_name(name)
+    conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+    install_budget(conn, timeout)
+    try:
+        # One row past the cap tells an oversized result from one that fits exactly
+        conn.execute(f'CREATE TABLE "{table}" AS SELECT * FROM ({sql.strip().rstrip(";")}) LIMIT ?',
+                     (max_rows + 1,))
+    except sqlite3.OperationalError as e:
+        if 'interrupted' in str(e):
+            raise ValueError(f"Query exceeded the {timeout:g}s time budget and was cancelled.") from None
+        raise
+    finally:
+        conn.set_progress_handler(None, 0)
+    count = conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+    if count > max_rows:
+        raise ValueError(f"Query returned more than {max_rows:,} rows; add a LIMIT or narrow it.")
+    conn.execute("""
+        UPDATE saved_queries SET refreshed_at = datetime('now'), row_count = ?
+        WHERE name = ?
+    """, (count, name))
+    return count
+
+def save_query(name, sql):
+    """
+    Save a read-only query and materialize it immediately.
+    Returns the materialized row count; raises ValueError for bad input.
+    """
+    if not NAME_PATTERN.match(name or ''):
+        raise ValueError("Name must start with a letter or underscore and contain only letters, digits and underscores.")
+    if not is_read_only(sql):
+        raise ValueError("Only single SELECT / WITH / VALUES statements can be saved.")
+
+    init_db()
+    conn = get_connection()
+    try:
+        conn.execute("""
+            INSERT INTO saved_queries (name, sql, created_at) VALUES (?, ?, datetime('now'))
+            ON CONFLICT(name) DO UPDATE SET sql = excluded.sql
+        """, (name, sql))
+        count = _materialize(conn, name, sql)
+        conn.commit()
+        return count
+    except (ValueError, sqlite3.Error):
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def delete_query(name):
+    """Remove a saved query and its materialized table."""
+    conn = get_connection()
+    try:
+        conn.execute(f'DROP TABLE IF EXISTS "{table_name(name)}"')
+        conn.execute("DELETE FROM saved_queries WHERE name = ?", (name,))
+        conn.commit()
+    finally:
+        conn.close()
+
+def list_queries():
+    """Return saved queries as a list of dicts (empty if none or table missing)."""
+    conn = get_connection()
+    try:
+        rows = conn.execute("""
+            SELECT name, sql, created_at, refreshed_at, row_count
+            FROM saved_queries ORDER BY name
+        """).fetchall()
+    except sqlite3.Error:
+        return []
+    finally:
+        conn.close()
+    keys = ('name', 'sql', 'created_at', 'refreshed_at', 'row_count')
+    return [dict(zip(keys, r)) for r in rows]
+
+def refresh_all(conn=None):
+    """
+    Rebuild every materialized table. Called at the end of run_etl.
+    A failing or over-budget query is reported and skipped (its previous table is kept)
+    so one bad query can't block the rest.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
+    refreshed = 0
+    try:
+        try:
+            saved = conn.execute("SELECT name, sql FROM saved_queries").fetchall()
+        except sqlite3.Error:
+            return 0
+        conn.commit()
+        for name, sql in saved:
+            conn.execute("SAVEPOINT refresh_query")
+            try:
+                count = _materialize(conn, name, sql)
+                conn.execute("RELEASE refresh_query")
+                refreshed += 1
+                print(f"Refreshed {table_name(name)} ({count} rows)")
+            except (ValueError, sqlite3.Error) as e:
+                if conn.in_transaction:  # An interrupt has already rolled the savepoint back
+                    conn.execute("ROLLBACK TO refresh_query")
+                    conn.execute("RELEASE refresh_query")
+                print(f"Skipped saved query '{name}': {e}")
+        conn.commit()
+    finally:
+        if own_conn:
+            conn.close()
+    return refreshed
@@ -0,0 +1,314 @@
+"""
+Parallel scrape orchestrator (replaces the hand-split run_scraper_* scripts).
+
+1. Fetches every letter's fighter list and balances the letters over N shards
+   by their actual fighter counts (largest letter first onto the lightest shard).
+2. Runs each shard in its own worker process, writing data/fighters_shard<k>.csv.
+   All workers draw from one global request budget (SharedRateLimiter), so adding
+   shards speeds the run up without raising the load on ufcstats.com.
+3. Prints per-shard progress and ETA; a shard whose process dies or that still
+   has failed pages is relaunched (resuming from its CSV) up to SHARD_RETRIES times.
+4. Merges the shard CSVs into data/fighters_master.csv (newest files win
+   duplicates) and, with --etl, loads the master file into ufc_data.db.
+   With --archive each shard writes its own archive file (SQLite allows one
+   writer per file), and those are merged into data/html_archive.db at the end.
+
+Usage:
+    python -m src.scrape_orchestrator --shards 4
+    python -m src.scrape_orchestrator --shards 2 --letters n o p q r --rate 10 --etl
+"""
+import argparse
+import multiprocessing
+import os
+import queue
+import string
+import time
+from urllib.parse import urlparse
+import pandas as pd
+
+try:
+    from src import scraper
+    from src.http_client import get_client, SharedRateLimiter, save_dead_letters
+    from src.consolidate_data import consolidate
+    from src.instrumentation import timed, count
+except ImportError:  # Run as a script from inside src/
+    import scraper
+    from http_client import get_client, SharedRateLimiter, save_dead_letters
+    from consolidate_data import consolidate
+    from instrumentation import timed, count
+
+DEFAULT_SHARDS = 3
+GLOBAL_RATE = 20.0       # Requests per second across all shards (three scripts at delay=0.15 made ~20)
+SHARD_RETRIES = 2        # Relaunches of a failed shard
+RETRY_DELAY_S = 5.0
+PROGRESS_INTERVAL_S = 10.0
+CHECKPOINT_EVERY = 20    # Fighters between incremental CSV writes, as in scrape_all_fighters
+DATA_DIR = 'data'
+
+def shard_path(shard, data_dir=DATA_DIR):
+    return os.path.join(data_dir, f"fighters_shard{shard}.csv")
+
+def shard_archive_path(archive_path, shard):
+    root, ext = os.path.splitext(archive_path)
+    return f"{root}.shard{shard}{ext}"
+
+def plan_shards(counts, n_shards):
+    """
+    Assign letters to at most n_shards shards, balancing fighter counts
+    (longest-processing-time first: each letter goes to the currently lightest shard).
+    counts: {letter: number of fighters}. Returns a list of sorted letter lists.
+    """
+    shards = [[] for _ in range(max(1, n_shards))]
+    loads = [0] * len(shards)
+    for letter in sorted(counts, key=lambda l: (-counts[l], l)):
+        k = loads.index(min(loads))
+        shards[k].append(letter)
+        loads[k] += counts[letter]
+    return [sorted(letters) for letters in shards if letters]
+
+def fetch_listings(letters, archive=None):
+    """{letter: fighter URLs}, fetching each listing page once more if it failed."""
+    client = get_client()
+    listings = {char: scraper.get_fighter_urls(char, archive) for char in letters}
+    failed = [letter for letter in client.drain_dead_letters() if 'char=' in letter['url']]
+    if failed:
+        retry = sorted({scraper.parse_char(letter['url']) for letter in failed})
+        print(f"Re-fetching {len(retry)} failed letter listings: {retry}")
+        for char in retry:
+            listings[char] = scraper.get_fighter_urls(char, archive)
+        remaining = client.drain_dead_letters()
+        if remaining:
+            save_dead_letters(remaining)
+            print(f"  {len(remaining)} listings still failing; those letters are skipped this run.")
+    return listings
+
+def _write_shard(fighters, output_file):
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    pd.DataFrame(fighters).to_csv(output_file, index=False)
+
+def run_shard(shard, urls, output_file, resume, limiter, progress, archive_path=None):
+    """
+    Worker process body: scrape `urls` into output_file, reporting through `progress`.
+    With resume, fighters already in output_file are kept and their pages skipped.
+    Posts ('progress', shard, done, total) messages and finally ('done', shard, dead_letters).
+    """
+    client = get_client()
+    for host in {urlparse(url).netloc for url in urls}:
+        client.set_host_limits(host, limiter=limiter)
+    archive = None
+    if archive_path:
+        from src.html_archive import HtmlArchive
+        archive = HtmlArchive(archive_path)
+
+    fighters = []
+    if resume and os.path.exists(output_file):
+        fighters = pd.read_csv(output_file).to_dict('records')
+    seen = {f['URL'] for f in fighters}
+    todo = [url for url in urls if url not in seen]
+    done = len(urls) - len(todo)
+    progress.put(('progress', shard, done, len(urls)))
+    try:
+        for i, url in enumerate(todo):
+            fighter = scraper.scrape_fighter_details(url, archive)
+            if fighter and fighter.get('Name', 'Unknown') != 'Unknown':
+                fighters.append(fighter)
+                count('scraper.fighters_scraped')
+            done += 1
+            progress.put(('progress', shard, done, len(urls)))
+            if (i + 1) % CHECKPOINT_EVERY == 0:
+                _write_shard(fighters, output_file)
+
+        # One more pass over pages that still failed after the client's retries
+        failed = [letter['url'] for letter in client.drain_dead_letters()]
+        if failed:
+            retried, skipped = scraper.retry_failed_urls(failed, archive=archive)
+            fighters.extend(retried)
+            client.add_dead_letters(skipped)
+        _write_shard(fighters, output_file)
+    finally:
+        if archive is not None:
+            archive.close()
+    progress.put(('done', shard, client.drain_dead_letters()))
+
+def _drain(progress, states, timeout):
+    """Apply every queued worker message to `states` (waiting up to `timeout` for the first)."""
+    try:
+        message = progress.get(timeout=timeout)
+        while True:
+            kind, shard, *payload = message
+            state = states[shard]
+            if kind == 'progress':
+                state['done'], state['total'] = payload
+                state['start_done'] = min(state['start_done'], state['done'])
+            else:
+                state['dead_letters'] = payload[0]
+            message = progress.get_nowait()
+    except queue.Empty:
+        pass
+
+def _format_eta(seconds):
+    if seconds is None:
+        return '--'
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m{seconds:02d}s"
+
+def _eta(state, now):
+    """Remaining seconds for a running shard at its current attempt's pace (None until it has one)."""
+    progressed = state['done'] - state['start_done']
+    if state['done'] >= state['total']:
+        return 0.0
+    if progressed <= 0:
+        return None
+    rate = progressed / (now - state['started'])
+    return (state['total'] - state['done']) / rate
+
+def print_progress(states, started):
+    now = time.monotonic()
+    done = sum(s['done'] for s in states.values())
+    total = sum(s['total'] for s in states.values())
+    etas = [_eta(s, now) for s in states.values() if s['status'] == 'running']
+    overall = max(etas) if etas and None not in etas else None
+    print(f"[{_format_eta(now - started)}] {done}/{total} pages ({done / max(total, 1):.0%}), "
+          f"ETA {_format_eta(overall)}")
+    for shard, s in sorted(states.items()):
+        eta = _eta(s, now) if s['status'] == 'running' else None
+        print(f"  shard {shard} {'[' + ''.join(s['letters']) + ']':<10}{s['done']:>6}/{s['total']:<6}"
+              f"{s['status']:<9} attempt {s['attempt'] + 1}  ETA {_format_eta(eta)}")
+
+@timed('scrape_orchestrator.run')
+def run(letters=None, n_shards=DEFAULT_SHARDS, rate=GLOBAL_RATE, data_dir=DATA_DIR,
+        retries=SHARD_RETRIES, archive_path=None, merge=True, etl=False):
+    """
+    Scrape `letters` (default a-z) over n_shards worker processes sharing `rate` requests/s.
+    Returns: dict with per-shard summaries, total fighters scraped, failed URLs and the master path.
+    """
+    if letters is None:
+        letters = list(string.ascii_lowercase)
+    started = time.monotonic()
+    ctx = multiprocessing.get_context('spawn')
+    limiter = SharedRateLimiter(rate, context=ctx)
+    client = get_client()
+    host = urlparse(scraper.BASE_URL).netloc
+    client.set_host_limits(host, limiter=limiter)
+
+    archive = None
+    if archive_path:
+        from src.html_archive import HtmlArchive
+        archive = HtmlArchive(archive_path)
+    try:
+        print(f"Fetching fighter lists for {len(letters)} letters...")
+        listings = fetch_listings(letters, archive)
+    finally:
+        if archive is not None:
+            archive.close()
+    counts = {char: len(urls) for char, urls in listings.items() if urls}
+    plan = plan_shards(counts, n_shards)
+    print(f"{sum(counts.values())} fighters over {len(plan)} shards at {rate:g} req/s:")
+    for k, shard_letters in enumerate(plan):
+        print(f"  shard {k}: {''.join(shard_letters)} ({sum(counts[c] for c in shard_letters)} fighters)")
+
+    progress = ctx.Queue()
+    states = {k: {'letters': shard_letters, 'urls': [u for c in shard_letters for u in listings[c]],
+                  'attempt': 0, 'status': 'pending', 'not_before': 0.0, 'process': None,
+                  'done': 0, 'start_done': 0, 'total': 0, 'started': 0.0, 'dead_letters': None}
+              for k, shard_letters in enumerate(plan)}
+    for s in states.values():
+        s['total'] = len(s['urls'])
+
+    last_report = time.monotonic()
+    while any(s['status'] in ('pending', 'running') for s in states.values()):
+        now = time.monotonic()
+        for k, s in states.items():
+            if s['status'] == 'pending' and now >= s['not_before']:
+                s['process'] = ctx.Process(target=run_shard, name=f"shard-{k}", daemon=True, args=(
+                    k, s['urls'], shard_path(k, data_dir), s['attempt'] > 0, limiter, progress,
+                    shard_archive_path(archive_path, k) if archive_path else None))
+                s['process'].start()
+                s.update(status='running', started=now, start_done=s['done'], dead_letters=None)
+
+        _drain(progress, states, timeout=1.0)
+
+        for k, s in states.items():
+            process = s['process']
+            if s['status'] != 'running' or process.is_alive():
+                continue
+            process.join()
+            if process.exitcode == 0 and s['dead_letters'] is None:
+                # Exited cleanly; its final message may still be in the queue's pipe
+                _drain(progress, states, timeout=1.0)
+            ok = process.exitcode == 0 and s['dead_letters'] == []
+            if ok:
+                s['status'] = 'done'
+                print(f"Shard {k} done: {s['total']} pages in {_format_eta(time.monotonic() - s['started'])}.")
+            elif s['attempt'] < retries:
+                reason = (f"{len(s['dead_letters'])} pages failed" if s['dead_letters']
+                          else f"exit code {process.exitcode}")
+                s['attempt'] += 1
+                s.update(status='pending', not_before=time.monotonic() + RETRY_DELAY_S)
+                count('scrape_orchestrator.shard_retries')
+                print(f"Shard {k} failed ({reason}); retrying (attempt {s['attempt'] + 1}/{retries + 1}).")
+            else:
+                s['status'] = 'failed'
+                print(f"Shard {k} failed after {retries + 1} attempts; keeping its partial output.")
+
+        if time.monotonic() - last_report >= PROGRESS_INTERVAL_S:
+            print_progress(states, started)
+            last_report = time.monotonic()
+    print_progress(states, started)
+
+    dead_letters = [letter for s in states.values() for letter in (s['dead_letters'] or [])]
+    if dead_letters:
+        path = save_dead_letters(dead_letters)
+        print(f"{len(dead_letters)} pages still failing; saved to {path} "
+              f"(retry with python src/scraper.py --retry-failed)")
+
+    if archive_path:
+        from src.html_archive import HtmlArchive
+        with HtmlArchive(archive_path) as archive:
+            for k in states:
+                path = shard_archive_path(archive_path, k)
+                if os.path.exists(path):
+                    archive.absorb(path)
+        print(f"Merged shard archives into {archive_path}.")
+
+    scraped = 0
+    shards = []
+    for k, s in states.items():
+        path = shard_path(k, data_dir)
+        rows = len(pd.read_csv(path)) if os.path.exists(path) and os.path.getsize(path) else 0
+        scraped += rows
+        shards.append({'shard': k, 'letters': s['letters'], 'pages': s['total'], 'fighters': rows,
+                       'attempts': s['attempt'] + 1, 'status': s['status'], 'output': path})
+
+    master = None
+    if merge and scraped:
+        # Streaming mode orders inputs by mtime, so the fresh shard files win over older CSVs
+        consolidate(data_dir, streaming=True)
+        master = os.path.join(data_dir, 'fighters_master.csv')
+        if etl:
+            from src.etl import run_etl
+            run_etl(master)
+    print(f"Scraped {scraped} fighters in {_format_eta(time.monotonic() - started)}.")
+    return {'shards': shards, 'scraped': scraped, 'failed_urls': [l['url'] for l in dead_letters],
+            'master': master}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape ufcstats.com over balanced parallel shards")
+    parser.add_argument('--letters', nargs='+', default=None, help="Letters to scrape (default: a-z)")
+    parser.add_argument('--shards', type=int, default=DEFAULT_SHARDS, help="Worker processes")
+    parser.add_argument('--rate', type=float, default=GLOBAL_RATE, help="Requests/s shared by all shards")
+    parser.add_argument('--retries', type=int, default=SHARD_RETRIES, help="Relaunches of a failed shard")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--archive', action='store_true', help="Also store every page in data/html_archive.db")
+    parser.add_argument('--no-merge', action='store_true', help="Leave the shard CSVs unmerged")
+    parser.add_argument('--etl', action='store_true', help="Load the merged master file into ufc_data.db")
+    args = parser.parse_args()
+
+    archive_path = None
+    if args.archive:
+        from src.html_archive import ARCHIVE_PATH
+        archive_path = ARCHIVE_PATH
+    run(letters=[l.lower() for l in args.letters] if args.letters else None, n_shards=args.shards,
+        rate=args.rate, data_dir=args.data_dir, retries=args.retries, archive_path=archive_path,
+        merge=not args.no_merge, etl=args.etl)
@@ -2,13 +2,22 @@
 UFC Fighter Stats Scraper
 Scrapes fighter statistics from ufcstats.com
 """
-import requests
 from bs4 import BeautifulSoup
 import pandas as pd
-import time
+import numpy as np
 import os
 import re
 import string
+import functools
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+try:
+    from src.instrumentation import timer, timed, count
+    from src.http_client import get_client, save_dead_letters, load_dead_letters
+except ImportError:  # Run as a script from inside src/
+    from instrumentation import timer, timed, count
+    from http_client import get_client, save_dead_letters, load_dead_letters
 
 BASE_URL = "http://www.ufcstats.com"
 FIGHTERS_URL = f"{BASE_URL}/statistics/fighters"
@@ -16,69 +25,178 @@ HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
 }
 
+# Precompiled patterns shared by the scalar and batch parsers
+HEIGHT_RE = re.compile(r"(\d+)'\s*(\d+)\"")
+REACH_RE = re.compile(r'(\d+)"')
+PERCENT_RE = re.compile(r'(\d+)%')
+RECORD_RE = re.compile(r'(\d+)-(\d+)-(\d+)')
+WEIGHT_RE = re.compile(r'(\d+)')
+
+CM_PER_INCH = 2.54
+ASYNC_CONCURRENCY = 100  # Pages in flight for scrape_fighter_details_many
+PARSE_CACHE_SIZE = 4096  # Distinct raw values are few ("5' 11\"", "48%", ...)
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
 def parse_height_to_cm(height_str):
     """Convert height string like 6' 4\" to cm."""
-    if not height_str or height_str.strip() == '--':
+    if not height_str:
         return None
-    match = re.match(r"(\d+)'\s*(\d+)\"", height_str.strip())
+    height_str = height_str.strip()
+    if height_str == '--':
+        return None
+    match = HEIGHT_RE.match(height_str)
     if match:
         feet = int(match.group(1))
         inches = int(match.group(2))
-        return round((feet * 12 + inches) * 2.54, 1)
+        return round((feet * 12 + inches) * CM_PER_INCH, 1)
     return None
 
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
 def parse_reach_to_cm(reach_str):
     """Convert reach string like 80\" to cm."""
-    if not reach_str or reach_str.strip() == '--':
+    if not reach_str:
+        return None
+    reach_str = reach_str.strip()
+    if reach_str == '--':
         return None
-    match = re.match(r'(\d+)"', reach_str.strip())
+    match = REACH_RE.match(reach_str)
     if match:
-        return round(int(match.group(1)) * 2.54, 1)
+        return round(int(match.group(1)) * CM_PER_INCH, 1)
     return None
 
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
 def parse_percentage(pct_str):
     """Convert percentage string like '48%' to float 0.48."""
-    if not pct_str or pct_str.strip() == '--':
+    if not pct_str:
         return None
-    match = re.match(r'(\d+)%', pct_str.strip())
+    pct_str = pct_str.strip()
+    if pct_str == '--':
+        return None
+    match = PERCENT_RE.match(pct_str)
     if match:
         return int(match.group(1)) / 100.0
     return None
 
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
 def parse_float(val_str):
     """Parse a float value, returning None for missing."""
-    if not val_str or val_str.strip() == '--':
+    if not val_str:
+        return None
+    val_str = val_str.strip()
+    if val_str == '--':
         return None
     try:
-        return float(val_str.strip())
+        return float(val_str)
     except ValueError:
         return None
 
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
 def parse_record(record_str):
     """Parse record string like 'Record: 24-5-0' into wins, losses, draws."""
-    match = re.search(r'(\d+)-(\d+)-(\d+)', record_str)
+    match = RECORD_RE.search(record_str)
     if match:
         return int(match.group(1)), int(match.group(2)), int(match.group(3))
     return None, None, None
 
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
 def parse_weight(weight_str):
     """Parse weight string like '185 lbs.' to int."""
-    if not weight_str or weight_str.strip() == '--':
+    if not weight_str:
         return None
-    match = re.match(r'(\d+)', weight_str.strip())
+    weight_str = weight_str.strip()
+    if weight_str == '--':
+        return None
+    match = WEIGHT_RE.match(weight_str)
     if match:
         return int(match.group(1))
     return None
 
-def get_fighter_urls(char):
-    """Get all fighter detail URLs for a given letter."""
+# --- Batch (column-at-a-time) parsers ---
+# Scraped columns hold few distinct strings, so each column is factorized once,
+# the distinct values go through the cached scalar parser, and results are
+# scattered back with a NumPy take. Output matches the scalar parsers exactly
+# (None -> NaN).
+
+def _batch(series, parser, width=1):
+    """Apply a scalar parser to every distinct value of a Series; returns an (n, width) float array."""
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    table = np.full((len(uniques) + 1, width), np.nan)  # last row: missing input
+    for i, raw in enumerate(uniques):
+        value = parser(raw if isinstance(raw, str) else str(raw))
+        if width == 1:
+            value = (value,)
+        table[i] = [np.nan if v is None else v for v in value]
+    return table[np.where(codes < 0, len(uniques), codes)]
+
+def parse_height_series(series):
+    """Vectorized parse_height_to_cm."""
+    return pd.Series(_batch(series, parse_height_to_cm)[:, 0], index=series.index)
+
+def parse_reach_series(series):
+    """Vectorized parse_reach_to_cm."""
+    return pd.Series(_batch(series, parse_reach_to_cm)[:, 0], index=series.index)
+
+def parse_percentage_series(series):
+    """Vectorized parse_percentage."""
+    return pd.Series(_batch(series, parse_percentage)[:, 0], index=series.index)
+
+def parse_float_series(series):
+    """Vectorized parse_float."""
+    return pd.Series(_batch(series, parse_float)[:, 0], index=series.index)
+
+def parse_weight_series(series):
+    """Vectorized parse_weight."""
+    return pd.Series(_batch(series, parse_weight)[:, 0], index=series.index)
+
+def parse_record_series(series):
+    """Vectorized parse_record: DataFrame with Wins, Losses, Draws."""
+    return pd.DataFrame(_batch(series, parse_record, width=3),
+                        index=series.index, columns=['Wins', 'Losses', 'Draws'])
+
+# Output column -> batch parser, for re-normalizing raw scraped strings
+BATCH_PARSERS = {
+    'Height_cm': parse_height_series,
+    'Weight_lbs': parse_weight_series,
+    'Reach_cm': parse_reach_series,
+    'SLpM': parse_float_series,
+    'Str_Acc': parse_percentage_series,
+    'SApM': parse_float_series,
+    'Str_Def': parse_percentage_series,
+    'TD_Avg': parse_float_series,
+    'TD_Acc': parse_percentage_series,
+    'TD_Def': parse_percentage_series,
+    'Sub_Avg': parse_float_series,
+}
+
+def normalize_raw_fighters(raw):
+    """
+    Convert a DataFrame of raw page strings (columns named like the scraper's
+    output, plus an optional 'Record' column) into typed values in one pass per column.
+    """
+    df = raw.copy()
+    for col, parser in BATCH_PARSERS.items():
+        if col in df.columns:
+            df[col] = parser(df[col])
+    if 'Record' in df.columns:
+        df[['Wins', 'Losses', 'Draws']] = parse_record_series(df.pop('Record'))
+    for col in ('Stance', 'DOB'):
+        if col in df.columns:
+            df[col] = df[col].where(df[col].astype('string').str.strip() != '--')
+    return df
+
+@timed('scraper.get_fighter_urls')
+def get_fighter_urls(char, archive=None):
+    """Get all fighter detail URLs for a given letter (archiving the listing page if given an archive)."""
     url = f"{FIGHTERS_URL}?char={char}&page=all"
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=15)
-        resp.raise_for_status()
+        with timer('scraper.fetch', url=url):
+            resp = get_client().get(url, headers=HEADERS, timeout=15)
     except Exception as e:
+        count('scraper.fetch_errors')
         print(f"  Error fetching page for letter '{char}': {e}")
         return []
+    if archive is not None:
+        archive.put(url, resp.text, resp.status_code)
     
     soup = BeautifulSoup(resp.text, 'html.parser')
     
@@ -91,16 +209,77 @@ def get_fighter_urls(char):
     
     return list(links)
 
-def scrape_fighter_details(fighter_url):
-    """Scrape a single fighter's detail page."""
+@timed('scraper.scrape_fighter_details')
+def scrape_fighter_details(fighter_url, archive=None):
+    """Scrape a single fighter's detail page, storing the raw HTML in `archive` if given."""
     try:
-        resp = requests.get(fighter_url, headers=HEADERS, timeout=15)
-        resp.raise_for_status()
+        with timer('scraper.fetch', url=fighter_url):
+            resp = get_client().get(fighter_url, headers=HEADERS, timeout=15)
     except Exception as e:
+        count('scraper.fetch_errors')
         print(f"  Error fetching {fighter_url}: {e}")
         return None
+    if archive is not None:
+        archive.put(fighter_url, resp.text, resp.status_code)
     
-    soup = BeautifulSoup(resp.text, 'html.parser')
+    with timer('scraper.parse'):
+        return parse_fighter_html(resp.text, fighter_url)
+
+async def ascrape_fighter_details(fighter_url, client=None, archive=None):
+    """
+    Async scrape_fighter_details on an async_client.AsyncHttpClient.
+    Pass a shared client when scraping many pages; without one a client is opened for this call.
+    """
+    try:
+        from src.async_client import AsyncHttpClient
+    except ImportError:  # Run as a script from inside src/
+        from async_client import AsyncHttpClient
+    if client is None:
+        async with AsyncHttpClient() as own_client:
+            return await ascrape_fighter_details(fighter_url, own_client, archive)
+    try:
+        with timer('scraper.fetch', url=fighter_url):
+            resp = await client.get(fighter_url, headers=HEADERS, timeout=15)
+    except Exception as e:
+        count('scraper.fetch_errors')
+        print(f"  Error fetching {fighter_url}: {e}")
+        return None
+    if archive is not None:
+        archive.put(fighter_url, resp.text, resp.status_code)
+    
+    with timer('scraper.parse'):
+        return parse_fighter_html(resp.text, fighter_url)
+
+@timed('scraper.scrape_fighter_details_many')
+def scrape_fighter_details_many(urls, archive=None, concurrency=ASYNC_CONCURRENCY):
+    """
+    scrape_fighter_details for many pages from one thread, with up to `concurrency`
+    requests in flight (rate limits still apply per host). Returns records in input
+    order (None for failed pages); pages that kept failing are handed to the shared
+    client's dead letters.
+    """
+    try:
+        from src.async_client import AsyncHttpClient, gather_bounded, run_sync
+    except ImportError:  # Run as a script from inside src/
+        from async_client import AsyncHttpClient, gather_bounded, run_sync
+    urls = list(urls)
+
+    async def scrape():
+        async with AsyncHttpClient() as client:
+            records = await gather_bounded([lambda u=u: ascrape_fighter_details(u, client, archive) for u in urls],
+                                           limit=concurrency)
+            get_client().add_dead_letters(client.drain_dead_letters())
+            return records
+
+    return run_sync(scrape())
+
+def parse_fighter_html(html, fighter_url, scraped_at=None):
+    """
+    Extract a fighter record from the HTML of a fighter detail page.
+    scraped_at: when the page was fetched (UTC ISO 8601), default now; consolidation
+    keeps the newest record per URL by it.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
     
     fighter = {}
     
@@ -157,61 +336,214 @@ def scrape_fighter_details(fighter_url):
                 fighter['Sub_Avg'] = parse_float(value)
     
     fighter['URL'] = fighter_url
+    fighter['ScrapedAt'] = scraped_at or datetime.now(timezone.utc).isoformat(timespec='seconds')
     return fighter
 
-def scrape_all_fighters(letters=None, delay=0.15, output_file="data/fighters.csv"):
+# Fight-history result flag -> score for the page's fighter (None: no contest / not rated)
+RESULT_SCORES = {'win': 1.0, 'loss': 0.0, 'draw': 0.5, 'nc': None}
+
+def parse_event_date(date_str):
+    """'Apr. 08, 2023' -> '2023-04-08' (None if unparseable)."""
+    if not isinstance(date_str, str):
+        return None
+    cleaned = date_str.replace('.', '').replace('Sept', 'Sep').strip()
+    for fmt in ('%b %d, %Y', '%B %d, %Y'):
+        try:
+            return datetime.strptime(cleaned, fmt).date().isoformat()
+        except ValueError:
+            pass
+    return None
+
+def parse_fight_history(html, fighter_url):
+    """
+    Extract completed bouts from the fight-history table of a fighter detail page.
+    Returns: list of dicts with fight_key, event, event_date, fighter_url, opponent_url,
+    opponent and score (1 win, 0 loss, 0.5 draw, None no contest). Upcoming bouts are skipped.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    bouts = []
+    for row in soup.select('tbody tr.b-fight-details__table-row'):
+        cols = row.find_all('td', class_='b-fight-details__table-col')
+        if len(cols) < 7:
+            continue
+        flag = cols[0].find('i', class_='b-flag__text')
+        result = flag.text.strip().lower() if flag else ''
+        if result not in RESULT_SCORES:
+            continue
+        links = cols[1].find_all('a', href=True)
+        event_texts = cols[6].find_all('p')
+        if len(links) < 2 or len(event_texts) < 2:
+            continue
+        event_date = parse_event_date(event_texts[1].text)
+        if event_date is None:
+            continue
+        opponent_url = links[1]['href'].strip()
+        # Both fighters' pages list the bout; the key is the same from either side
+        fight_key = row.get('data-link') or '|'.join([event_date] + sorted([fighter_url, opponent_url]))
+        bouts.append({
+            'fight_key': fight_key,
+            'event': event_texts[0].text.strip(),
+            'event_date': event_date,
+            'fighter_url': fighter_url,
+            'opponent_url': opponent_url,
+            'opponent': links[1].text.strip(),
+            'score': RESULT_SCORES[result],
+        })
+    return bouts
+
+@timed('scraper.scrape_all_fighters')
+def scrape_all_fighters(letters=None, delay=0.15, output_file="data/fighters.csv", sink=None,
+                        archive=None):
     """
     Scrape all fighters from ufcstats.com.
     letters: list of letters to scrape (default: all a-z)
-    delay: seconds to wait between requests (be respectful)
-    output_file: path to save the CSV
+    delay: minimum seconds between requests to ufcstats.com (enforced by the shared client's rate limit)
+    output_file: path to save the CSV (None to skip the CSV export)
+    sink: optional object with add(fighter), e.g. sqlite_sink.SQLiteSink
+    archive: optional html_archive.HtmlArchive receiving every fetched page
     """
     if letters is None:
         letters = list(string.ascii_lowercase)
     
+    client = get_client()
+    client.set_host_limits(urlparse(BASE_URL).netloc, rate=1 / delay if delay else 0, burst=1)
+    
     all_fighters = []
     total_urls = 0
     
     for char in letters:
         print(f"Fetching fighter list for letter '{char}'...")
-        urls = get_fighter_urls(char)
+        urls = get_fighter_urls(char, archive)
         total_urls += len(urls)
         print(f"  Found {len(urls)} fighter URLs.")
         
         for i, url in enumerate(urls):
-            fighter = scrape_fighter_details(url)
+            fighter = scrape_fighter_details(url, archive)
             if fighter and fighter.get('Name', 'Unknown') != 'Unknown':
                 all_fighters.append(fighter)
+                count('scraper.fighters_scraped')
+                if sink is not None:
+                    sink.add(fighter)
             
             if (i + 1) % 20 == 0:
                 print(f"  Scraped {i + 1}/{len(urls)} fighters for '{char}'...")
-                # Save incrementally every 20 fighters
-                temp_df = pd.DataFrame(all_fighters)
-                os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
-                temp_df.to_csv(output_file, index=False)
             
-            time.sleep(delay)
+            if (i + 1) % 20 == 0 and output_file:
+                # Save incrementally every 20 fighters
+                with timer('scraper.csv_write'):
+                    temp_df = pd.DataFrame(all_fighters)
+                    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+                    temp_df.to_csv(output_file, index=False)
         
         print(f"  Done with '{char}'. Total fighters so far: {len(all_fighters)}")
         
         # Save incrementally
-        temp_df = pd.DataFrame(all_fighters)
-        os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
-        temp_df.to_csv(output_file, index=False)
+        if output_file:
+            with timer('scraper.csv_write'):
+                temp_df = pd.DataFrame(all_fighters)
+                os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+                temp_df.to_csv(output_file, index=False)
+    
+    # One more pass over pages that still failed after the client's retries
+    # (a failed letter listing is re-fetched and its fighters scraped)
+    failed = [letter['url'] for letter in client.drain_dead_letters()]
+    if failed:
+        print(f"Re-attempting {len(failed)} failed pages...")
+        retried, skipped = retry_failed_urls(failed, sink=sink, archive=archive)
+        all_fighters.extend(retried)
+        client.add_dead_letters(skipped)
+        if output_file:
+            pd.DataFrame(all_fighters).to_csv(output_file, index=False)
+    
+    remaining = client.drain_dead_letters()
+    if remaining:
+        path = save_dead_letters(remaining)
+        print(f"{len(remaining)} pages still failing; saved to {path} (retry with --retry-failed)")
     
     return pd.DataFrame(all_fighters)
 
+def scrape_fighter_urls(urls, sink=None, archive=None):
+    """Scrape a list of fighter detail URLs (e.g. dead-lettered ones); returns the parsed records."""
+    fighters = []
+    for url in urls:
+        fighter = scrape_fighter_details(url, archive)
+        if fighter and fighter.get('Name', 'Unknown') != 'Unknown':
+            fighters.append(fighter)
+            count('scraper.fighters_scraped')
+            if sink is not None:
+                sink.add(fighter)
+    return fighters
+
+def parse_char(url):
+    """The letter of a fighter-listing URL (?char=x), or None for other pages."""
+    query = urlparse(url).query
+    return dict(part.split('=', 1) for part in query.split('&') if '=' in part).get('char')
+
+def retry_failed_urls(urls, sink=None, archive=None):
+    """
+    Re-scrape dead-lettered URLs: a letter listing is re-fetched and every fighter on it
+    scraped, a fighter page is scraped directly. Pages that fail again are dead-lettered
+    by the client as usual.
+    Returns (fighters, skipped), skipped being dead-letter records for URLs of neither kind.
+    """
+    fighter_urls, skipped = [], []
+    for url in urls:
+        char = parse_char(url) if url.startswith(FIGHTERS_URL) else None
+        if char:
+            print(f"Re-fetching fighter list for letter '{char}'...")
+            fighter_urls.extend(get_fighter_urls(char, archive))
+        elif '/fighter-details/' in url:
+            fighter_urls.append(url)
+        else:
+            skipped.append({'url': url, 'error': 'not a ufcstats listing or fighter page', 'attempts': 0,
+                            'failed_at': datetime.now().isoformat(timespec='seconds')})
+    return scrape_fighter_urls(list(dict.fromkeys(fighter_urls)), sink=sink, archive=archive), skipped
+
 if __name__ == "__main__":
     import sys
     
     # Allow passing specific letters as argument for testing
     # e.g., python src/scraper.py a b c
-    if len(sys.argv) > 1:
-        letters = [l.lower() for l in sys.argv[1:]]
+    # --sqlite writes straight to ufc_data.db (staging + merge) instead of CSV
+    # --archive also stores every fetched page in data/html_archive.db
+    # --retry-failed re-scrapes the URLs in data/dead_letters.jsonl (listings and fighter pages)
+    #   into data/fighters_retry.csv
+    args = sys.argv[1:]
+    to_sqlite = '--sqlite' in args
+    use_archive = '--archive' in args
+    retry_failed = '--retry-failed' in args
+    args = [a for a in args if not a.startswith('--')]
+    if args:
+        letters = [l.lower() for l in args]
     else:
         letters = None  # All letters
     
-    df = scrape_all_fighters(letters=letters)
-    if df is not None:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    archive = None
+    if use_archive:
+        from src.html_archive import HtmlArchive
+        archive = HtmlArchive()
+    
+    try:
+        if retry_failed:
+            urls = load_dead_letters(clear=True)
+            print(f"Retrying {len(urls)} dead-lettered pages...")
+            fighters, skipped = retry_failed_urls(urls, archive=archive)
+            df = pd.DataFrame(fighters)
+            if not df.empty:
+                df.to_csv("data/fighters_retry.csv", index=False)
+            # Everything not recovered goes back into the file for the next retry
+            save_dead_letters(get_client().drain_dead_letters() + skipped)
+        elif to_sqlite:
+            from src.sqlite_sink import SQLiteSink, merge_staging
+            with SQLiteSink() as sink:
+                df = scrape_all_fighters(letters=letters, output_file=None, sink=sink, archive=archive)
+            merge_staging()
+        else:
+            df = scrape_all_fighters(letters=letters, archive=archive)
+    finally:
+        if archive is not None:
+            archive.close()
+    if df is not None and not df.empty:
         print(f"\nSample data:")
         print(df[['Name', 'Wins', 'Losses', 'Height_cm', 'Reach_cm', 'SLpM', 'TD_Avg']].head(10))
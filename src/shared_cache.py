@@ -0,0 +1,278 @@
+"""
+Multi-worker deployment mode: one on-disk roster snapshot and cache directory
+shared by every app process behind the load balancer.
+
+Enabled by setting UFC_SHARED_DIR. Layout:
+    roster-<version>/stats.npy      FighterStore numeric block, opened with mmap_mode='r'
+                                    so all workers share the same page-cache pages
+    roster-<version>/meta.pkl       names, URLs, categorical codes, vocabularies, dtypes
+    roster-<version>/similarity.joblib
+    cache/<namespace>/<key>.json    image URLs and other small values
+    cache/<namespace>/<key>.npy     probability matrices (read with mmap)
+<version> follows the database file, so an ETL run produces a fresh snapshot.
+Entries are written to a temp file and renamed into place; a striped flock
+lock per namespace makes one worker compute a missing entry while the others
+wait for it and read the result.
+
+Usage:
+    UFC_SHARED_DIR=/var/cache/ufc python -m src.shared_cache warm-up [--photos]
+    UFC_SHARED_DIR=/var/cache/ufc streamlit run app.py
+    UFC_SHARED_DIR=/var/cache/ufc python -m src.shared_cache status
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+from contextlib import contextmanager
+import numpy as np
+from src.db_manager import DB_NAME
+from src.instrumentation import timed, count
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes stay atomic, but two workers may compute the same entry
+    fcntl = None
+
+SHARED_DIR = os.environ.get('UFC_SHARED_DIR')
+LOCK_STRIPES = 64        # Lock files per namespace; keys hash onto a stripe
+PHOTO_TTL_S = 3600 * 24  # Same lifetime as the app's per-process photo cache
+
+_MISSING = object()
+
+def enabled():
+    return bool(SHARED_DIR)
+
+def shared_path(*parts, directory=None):
+    return os.path.join(directory or SHARED_DIR, *parts)
+
+@contextmanager
+def file_lock(path):
+    """Exclusive advisory lock on `path` (created if needed), held for the with-block."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a+b') as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+def _atomic_write(path, write):
+    """Call write(file) on a temp file next to `path`, then rename it into place."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as handle:
+        write(handle)
+    os.replace(tmp, path)
+
+def roster_version(db_path=None):
+    """Version tag of the database file (size and mtime); changes after every ETL write."""
+    stat = os.stat(db_path or DB_NAME)
+    return hashlib.blake2b(f"{stat.st_size}:{stat.st_mtime_ns}".encode(), digest_size=8).hexdigest()
+
+# --- Key/value cache -------------------------------------------------------
+
+def _key_hash(key):
+    return hashlib.blake2b(str(key).encode('utf-8'), digest_size=16).hexdigest()
+
+def _entry_path(namespace, key, kind, directory=None):
+    return shared_path('cache', namespace, f"{_key_hash(key)}.{kind}", directory=directory)
+
+def _lock_path(namespace, key, directory=None):
+    stripe = int(_key_hash(key)[:8], 16) % LOCK_STRIPES
+    return shared_path('locks', f"{namespace}-{stripe}.lock", directory=directory)
+
+def _read_entry(path, kind, ttl=None):
+    try:
+        if ttl is not None and time.time() - os.path.getmtime(path) > ttl:
+            return _MISSING
+        if kind == 'npy':
+            return np.load(path, mmap_mode='r')
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return _MISSING
+
+def get_or_compute(namespace, key, compute, kind='json', ttl=None, directory=None):
+    """
+    Cached value for `key`, computed at most once across all workers.
+    kind: 'json' for small values (None is cached too), 'npy' for arrays (returned memory-mapped).
+    ttl: seconds after which an entry is recomputed (None = never).
+    """
+    path = _entry_path(namespace, key, kind, directory)
+    value = _read_entry(path, kind, ttl)
+    if value is not _MISSING:
+        count(f'shared_cache.{namespace}.hits')
+        return value
+    with file_lock(_lock_path(namespace, key, directory)):
+        # Another worker may have filled it while we waited for the lock
+        value = _read_entry(path, kind, ttl)
+        if value is not _MISSING:
+            count(f'shared_cache.{namespace}.hits')
+            return value
+        count(f'shared_cache.{namespace}.misses')
+        value = compute()
+        if kind == 'npy':
+            _atomic_write(path, lambda f: np.save(f, np.asarray(value)))
+            return np.load(path, mmap_mode='r')
+        _atomic_write(path, lambda f: f.write(json.dumps(value).encode('utf-8')))
+        return value
+
+def cached_photo(name, fetch, directory=None):
+    """Fighter photo URL (or None) shared by all workers; fetch(name) runs on a miss."""
+    return get_or_compute('images', name, lambda: fetch(name), ttl=PHOTO_TTL_S, directory=directory)
+
+def frame_key(df):
+    """Hash of a fighters frame's URLs and model inputs, used as a matrix cache key."""
+    from src.processor import stat_arrays, rating_arrays
+    digest = hashlib.blake2b(digest_size=16)
+    for url in df['URL']:
+        digest.update(str(url).encode('utf-8'))
+    for values in list(stat_arrays(df).values()) + list(rating_arrays(df).values()):
+        digest.update(np.ascontiguousarray(values).tobytes())
+    return digest.hexdigest()
+
+def cached_matrix(df, directory=None):
+    """predict_matrix(df) from the shared cache (memory-mapped), computed once per distinct pool."""
+    from src.processor import predict_matrix
+    return get_or_compute('matrices', frame_key(df), lambda: predict_matrix(df), kind='npy',
+                          directory=directory)
+
+# --- Roster snapshot ---------------------------------------------------------
+
+def _roster_dir(version, directory=None):
+    return shared_path(f"roster-{version}", directory=directory)
+
+@timed('shared_cache.write_roster')
+def write_roster(df, version, directory=None):
+    """Write the FighterStore snapshot of a cleaned roster for `version`."""
+    from src.fighter_store import FighterStore
+    store = FighterStore.from_frame(df.reset_index(drop=True))
+    target = _roster_dir(version, directory)
+    meta = {
+        'text': store.text, 'codes': store.codes, 'vocab': store.vocab,
+        'columns': list(df.columns), 'dtypes': {col: str(dtype) for col, dtype in df.dtypes.items()},
+    }
+    # Stats before meta: a snapshot counts as complete once meta.pkl exists
+    _atomic_write(os.path.join(target, 'stats.npy'), lambda f: np.save(f, store.stats))
+    _atomic_write(os.path.join(target, 'meta.pkl'), lambda f: pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL))
+    return target
+
+def _read_roster(target):
+    from src.fighter_store import FighterStore
+    with open(os.path.join(target, 'meta.pkl'), 'rb') as f:
+        meta = pickle.load(f)
+    stats = np.load(os.path.join(target, 'stats.npy'), mmap_mode='r')
+    store = FighterStore(stats, meta['text'], meta['codes'], meta['vocab'])
+    return store, meta
+
+@timed('shared_cache.load_roster')
+def load_roster(directory=None, version=None):
+    """
+    (store, meta) for the current database version. The store's numeric block is
+    memory-mapped; the first worker to find no snapshot builds it under the lock.
+    """
+    version = version or roster_version()
+    target = _roster_dir(version, directory)
+    if not os.path.exists(os.path.join(target, 'meta.pkl')):
+        with file_lock(shared_path('locks', 'roster.lock', directory=directory)):
+            if not os.path.exists(os.path.join(target, 'meta.pkl')):
+                from src.processor import load_fighters, clean_fighters
+                write_roster(clean_fighters(load_fighters()), version, directory)
+    return _read_roster(target)
+
+def roster_frame(store, meta):
+    """The cleaned fighters DataFrame, rebuilt from a snapshot with its original columns and dtypes."""
+    return store.to_frame(meta['columns']).astype(meta['dtypes'])
+
+def load_similarity_index(df, directory=None, version=None):
+    """Style-comps index for the snapshot version, built once and then loaded by every worker."""
+    from src.similarity import load_index, update_index
+    path = os.path.join(_roster_dir(version or roster_version(), directory), 'similarity.joblib')
+    index = load_index(path, mmap_mode='c')
+    if index is None:
+        with file_lock(shared_path('locks', 'similarity.lock', directory=directory)):
+            index = load_index(path, mmap_mode='c')
+            if index is None:
+                update_index(df, path)
+                index = load_index(path, mmap_mode='c')
+    return index
+
+# --- Warm-up and maintenance ---------------------------------------------------
+
+def prune(directory=None, keep=None):
+    """Remove roster snapshots other than `keep` (workers holding an old mmap keep their pages)."""
+    directory = directory or SHARED_DIR
+    removed = 0
+    for entry in os.listdir(directory):
+        if entry.startswith('roster-') and entry != f"roster-{keep}":
+            shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+            removed += 1
+    return removed
+
+@timed('shared_cache.warm_up')
+def warm_up(directory=None, photos=False):
+    """
+    Populate the shared directory before workers start: roster snapshot,
+    similarity index and one probability matrix per weight class
+    (optionally every fighter's photo URL).
+    """
+    directory = directory or SHARED_DIR
+    version = roster_version()
+    store, meta = load_roster(directory, version)
+    df = roster_frame(store, meta)
+    load_similarity_index(df, directory, version)
+    for weight_class in sorted(df['WeightClass'].unique()):
+        cached_matrix(df[df['WeightClass'] == weight_class].reset_index(drop=True), directory)
+    if photos:
+        from src.image_fetcher import get_fighter_image_url, get_fighter_image_urls
+        from src.async_client import available_backend
+        names = [name for name in df['Name']
+                 if _read_entry(_entry_path('images', name, 'json', directory), 'json', PHOTO_TTL_S) is _MISSING]
+        fetch = get_fighter_image_url
+        if names and available_backend():
+            # One event loop resolves every missing photo instead of one blocking request at a time
+            fetch = get_fighter_image_urls(names).get
+        for name in names:
+            cached_photo(name, fetch, directory)
+    removed = prune(directory, keep=version)
+    print(f"Shared cache warmed: {len(df)} fighters (snapshot {version}), "
+          f"{df['WeightClass'].nunique()} class matrices; {removed} old snapshots removed.")
+    return version
+
+def status(directory=None):
+    """Entry counts and bytes per roster snapshot / cache namespace."""
+    directory = directory or SHARED_DIR
+    report = {}
+    for root, _, files in os.walk(directory):
+        rel = os.path.relpath(root, directory)
+        if rel == '.' or rel.startswith('locks'):
+            continue
+        files = [f for f in files if not f.endswith('.tmp')]
+        if not files:
+            continue
+        report[rel] = {'entries': len(files),
+                       'bytes': sum(os.path.getsize(os.path.join(root, f)) for f in files)}
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared roster snapshot and caches for multi-worker deployments")
+    parser.add_argument('command', choices=['warm-up', 'status', 'clear'])
+    parser.add_argument('--dir', default=SHARED_DIR, help="Shared directory (default: $UFC_SHARED_DIR)")
+    parser.add_argument('--photos', action='store_true', help="Also prefetch every fighter's photo URL")
+    args = parser.parse_args()
+    if not args.dir:
+        parser.error("set UFC_SHARED_DIR or pass --dir")
+
+    if args.command == 'warm-up':
+        warm_up(args.dir, photos=args.photos)
+    elif args.command == 'status':
+        for name, row in sorted(status(args.dir).items()):
+            print(f"  {name:<32}{row['entries']:>8} entries{row['bytes'] / 1024:>12,.0f} KiB")
+    else:
+        shutil.rmtree(args.dir, ignore_errors=True)
+        print(f"Removed {args.dir}")
@@ -0,0 +1,200 @@
+"""
+Style comps: k-nearest-neighbour search over standardized fighter stat vectors.
+One scikit-learn BallTree per weight class (plus one over the whole roster) is
+persisted to data/similarity_index.joblib and refreshed after every ETL load;
+only weight classes whose members or stats changed are rebuilt.
+
+Usage:
+    python -m src.similarity build
+    python -m src.similarity similar "Israel Adesanya" -k 5
+    python -m src.similarity matchups "Israel Adesanya" -k 5
+"""
+import argparse
+import hashlib
+import os
+import numpy as np
+from src.instrumentation import timed
+
+INDEX_PATH = os.path.join('data', 'similarity_index.joblib')
+FEATURES = ['SLpM', 'Str_Acc', 'SApM', 'Str_Def', 'TD_Avg', 'TD_Acc', 'TD_Def', 'Sub_Avg',
+            'Reach_cm', 'Height_cm']
+ALL_CLASSES = '__all__'
+LEAF_SIZE = 16
+SCALE_TOLERANCE = 1e-3   # Relative drift in mean/std that forces a full rebuild
+
+def _standardize(df, mean=None, std=None):
+    values = df[FEATURES].to_numpy(dtype=np.float64)
+    values = np.where(np.isnan(values), np.nanmedian(values, axis=0), values)
+    if mean is None:
+        mean = values.mean(axis=0)
+        std = values.std(axis=0)
+        std[std == 0] = 1.0
+    return (values - mean) / std, mean, std
+
+def _fingerprint(urls, vectors):
+    """Hash of a weight class's members and their vectors, to detect changes."""
+    digest = hashlib.blake2b(digest_size=16)
+    for url in urls:
+        digest.update(str(url).encode('utf-8'))
+    digest.update(np.ascontiguousarray(vectors).tobytes())
+    return digest.hexdigest()
+
+def _build_tree(vectors):
+    from sklearn.neighbors import BallTree
+    return BallTree(vectors, leaf_size=LEAF_SIZE)
+
+@timed('similarity.build_index')
+def build_index(df, previous=None):
+    """
+    Build the k-NN index for a cleaned roster.
+    If `previous` is given and the scaling is unchanged, trees for weight classes
+    with identical members and stats are reused instead of rebuilt.
+    Returns: index dict (names, urls, classes, vectors, mean, std, groups, rebuilt).
+    """
+    df = df.reset_index(drop=True)
+    reuse = previous is not None
+    if reuse:
+        vectors, mean, std = _standardize(df)
+        drift = max(np.max(np.abs(mean - previous['mean']) / previous['std']),
+                    np.max(np.abs(std - previous['std']) / previous['std']))
+        reuse = drift <= SCALE_TOLERANCE
+        if reuse:
+            mean, std = previous['mean'], previous['std']
+            vectors, _, _ = _standardize(df, mean, std)
+    else:
+        vectors, mean, std = _standardize(df)
+
+    urls = df['URL'].tolist()
+    classes = df['WeightClass'].to_numpy(dtype=object)
+    groups = {}
+    rebuilt = []
+    members_by_class = {ALL_CLASSES: np.arange(len(df))}
+    for weight_class in sorted(set(classes)):
+        members_by_class[weight_class] = np.flatnonzero(classes == weight_class)
+
+    for weight_class, ids in members_by_class.items():
+        fingerprint = _fingerprint([urls[i] for i in ids], vectors[ids])
+        old = previous['groups'].get(weight_class) if reuse else None
+        if old is not None and old['fingerprint'] == fingerprint:
+            tree = old['tree']
+        else:
+            tree = _build_tree(vectors[ids])
+            rebuilt.append(weight_class)
+        groups[weight_class] = {'ids': ids, 'tree': tree, 'fingerprint': fingerprint}
+
+    return {
+        'names': df['Name'].tolist(),
+        'urls': urls,
+        'classes': classes,
+        'vectors': vectors,
+        'mean': mean,
+        'std': std,
+        'groups': groups,
+        'rebuilt': rebuilt,
+    }
+
+def save_index(index, path=INDEX_PATH):
+    """Write to a temp file and rename it into place, so readers never see a partial index."""
+    import joblib
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(index, tmp)
+    os.replace(tmp, path)
+    return path
+
+def load_index(path=INDEX_PATH, mmap_mode=None):
+    """
+    Persisted index, or None if it has not been built yet.
+    mmap_mode='c' maps the tree arrays copy-on-write, so processes loading the same file share them.
+    """
+    if not os.path.exists(path):
+        return None
+    import joblib
+    return joblib.load(path, mmap_mode=mmap_mode)
+
+def update_index(df=None, path=INDEX_PATH):
+    """Refresh the persisted index from the current database roster (called after ETL)."""
+    if df is None:
+        from src.processor import load_fighters, clean_fighters
+        df = clean_fighters(load_fighters())
+    if df.empty:
+        return None
+    index = build_index(df, previous=load_index(path))
+    save_index(index, path)
+    print(f"Similarity index updated ({len(index['rebuilt'])} of {len(index['groups'])} trees rebuilt).")
+    return index
+
+def fighter_id(index, key):
+    """Position of a fighter (name or URL, case-insensitive) in the index, or None."""
+    if not isinstance(key, str):
+        return None
+    key = key.strip().lower()
+    lookup = index.get('_lookup')
+    if lookup is None:
+        lookup = {}
+        for i, (name, url) in enumerate(zip(index['names'], index['urls'])):
+            for value in (name, url):
+                if isinstance(value, str):
+                    lookup[value.strip().lower()] = i
+        index['_lookup'] = lookup
+    return lookup.get(key)
+
+def similar_fighters(index, key, k=5, same_class=True):
+    """
+    The k fighters closest in style to `key`, nearest first.
+    Returns: list of dicts with Name, WeightClass and distance (in standard deviations).
+    """
+    i = fighter_id(index, key)
+    if i is None:
+        raise KeyError(f"Unknown fighter: {key}")
+    group = index['groups'][index['classes'][i] if same_class else ALL_CLASSES]
+    k = min(k + 1, len(group['ids']))
+    dist, pos = group['tree'].query(index['vectors'][i:i + 1], k=k)
+    results = []
+    for d, p in zip(dist[0], pos[0]):
+        j = group['ids'][p]
+        if j != i:
+            results.append({'Name': index['names'][j], 'WeightClass': index['classes'][j],
+                            'distance': round(float(d), 3)})
+    return results[:k - 1]
+
+def best_matchups(index, roster, key, k=5, toughest=False):
+    """
+    Same-class opponents ranked by the fighter's predicted win probability
+    (most favourable first, or least favourable with toughest=True).
+    roster: the cleaned fighters DataFrame the index was built from.
+    """
+    from src.processor import predict_matchups_batch
+    i = fighter_id(index, key)
+    if i is None:
+        raise KeyError(f"Unknown fighter: {key}")
+    roster = roster.reset_index(drop=True)
+    opponents = index['groups'][index['classes'][i]]['ids']
+    opponents = opponents[opponents != i]
+    if len(opponents) == 0:
+        return []
+    me = roster.iloc[np.full(len(opponents), i)].reset_index(drop=True)
+    them = roster.iloc[opponents].reset_index(drop=True)
+    scored = predict_matchups_batch(me, them).sort_values('prob_a', ascending=toughest, kind='stable')
+    return scored[['Fighter_B', 'prob_a', 'confidence']].head(k).rename(
+        columns={'Fighter_B': 'Opponent', 'prob_a': 'win_prob'}).to_dict('records')
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Style comps via k-NN over fighter stats")
+    parser.add_argument('command', choices=['build', 'similar', 'matchups'])
+    parser.add_argument('fighter', nargs='?')
+    parser.add_argument('-k', type=int, default=5)
+    parser.add_argument('--all-classes', action='store_true', help="Search the whole roster")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        update_index()
+    else:
+        index = load_index() or update_index()
+        if args.command == 'similar':
+            for row in similar_fighters(index, args.fighter, args.k, same_class=not args.all_classes):
+                print(f"  {row['Name']:<32}{row['WeightClass']:<20}{row['distance']:>8.3f}")
+        else:
+            from src.processor import load_fighters, clean_fighters
+            for row in best_matchups(index, clean_fighters(load_fighters()), args.fighter, args.k):
+                print(f"  {row['Opponent']:<32}{row['win_prob']:>8.1%}")
@@ -0,0 +1,221 @@
+"""
+Direct scraper -> SQLite sink.
+Parsed fighter records are buffered and written to `staging_fighters` in batched
+transactions while scraping. merge_staging() then cleans and loads them into
+`fighters` / `fighter_stats` with set-based SQL, mirroring clean_fighters + run_etl
+without the intermediate CSVs.
+"""
+import os
+import sqlite3
+from datetime import datetime, timezone
+from src.db_manager import init_db, get_connection, bump_data_version, DB_NAME
+from src.saved_queries import refresh_all as refresh_saved_queries
+from src.instrumentation import timed, timer
+
+BATCH_SIZE = 200
+
+# Scraped record key -> staging column
+STAGING_COLUMNS = {
+    'Name': 'name', 'Nickname': 'nickname',
+    'Wins': 'wins', 'Losses': 'losses', 'Draws': 'draws',
+    'Height_cm': 'height_cm', 'Weight_lbs': 'weight_lbs', 'Reach_cm': 'reach_cm',
+    'Stance': 'stance', 'DOB': 'dob',
+    'SLpM': 'slpm', 'Str_Acc': 'str_acc', 'SApM': 'sapm', 'Str_Def': 'str_def',
+    'TD_Avg': 'td_avg', 'TD_Acc': 'td_acc', 'TD_Def': 'td_def', 'Sub_Avg': 'sub_avg',
+    'URL': 'url',
+}
+
+# Columns median-filled by clean_fighters
+MEDIAN_FILL_COLUMNS = ['height_cm', 'reach_cm', 'slpm', 'str_acc', 'sapm',
+                       'str_def', 'td_avg', 'td_acc', 'td_def', 'sub_avg']
+
+class SQLiteSink:
+    """
+    Buffers scraped fighter dicts and inserts them into staging_fighters
+    BATCH_SIZE rows per transaction. Use as a context manager so the tail is flushed.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE, reset=True):
+        init_db()
+        self.batch_size = batch_size
+        self.buffer = []
+        self.written = 0
+        self.conn = get_connection()
+        if reset:
+            self.conn.execute("DELETE FROM staging_fighters")
+            self.conn.commit()
+        cols = list(STAGING_COLUMNS.values()) + ['scraped_at']
+        self._insert_sql = (f"INSERT INTO staging_fighters ({', '.join(cols)}) "
+                            f"VALUES ({', '.join('?' * len(cols))})")
+
+    def add(self, fighter):
+        """Queue one parsed fighter record."""
+        stamp = fighter.get('ScrapedAt') or datetime.now(timezone.utc).isoformat(timespec='seconds')
+        self.buffer.append(tuple(fighter.get(key) for key in STAGING_COLUMNS) + (stamp,))
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write buffered rows in a single transaction."""
+        if not self.buffer:
+            return
+        with timer('sink.flush', rows=len(self.buffer)):
+            with self.conn:
+                self.conn.executemany(self._insert_sql, self.buffer)
+        self.written += len(self.buffer)
+        self.buffer = []
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+def _median(conn, table, column):
+    """Median like pandas (mean of the middle two for even counts); None if no values."""
+    n = conn.execute(f"SELECT COUNT({column}) FROM {table}").fetchone()[0]
+    if n == 0:
+        return None
+    rows = conn.execute(
+        f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL "
+        f"ORDER BY {column} LIMIT ? OFFSET ?",
+        (2 - n % 2, (n - 1) // 2)).fetchall()
+    return sum(r[0] for r in rows) / len(rows)
+
+def _validate_staging(conn, max_failure_rate):
+    """Run the ETL validation rules on the latest staged row per URL; returns (report, rejected URLs)."""
+    import pandas as pd  # pandas only when merging
+    from src.validation import validate, write_report, format_report
+    columns = ", ".join(f"s.{col} AS {key}" for key, col in STAGING_COLUMNS.items())
+    staged = pd.read_sql_query(f"""
+        SELECT {columns} FROM staging_fighters s
+        JOIN (SELECT url, MAX(rowid) AS rid FROM staging_fighters GROUP BY url) latest
+          ON s.rowid = latest.rid
+    """, conn)
+    report, rejected = validate(staged, max_failure_rate)
+    write_report(report)
+    print(format_report(report))
+    return report, staged.loc[rejected, 'URL'].tolist()
+
+@timed('sink.merge_staging')
+def merge_staging(conn=None, max_failure_rate=None):
+    """
+    Clean staged records and replace fighters / fighter_stats with them.
+    Same rules as clean_fighters: drop fighters without a record, median-fill
+    numeric stats, default stance 'Orthodox', weight class from weight.
+    Staged rows go through the ETL validation first (rejected rows are skipped;
+    too many rejections block the merge).
+    Returns the number of fighters loaded, or None if validation blocked it.
+    """
+    own_conn = conn is None
+    if own_conn:
+        init_db()
+        conn = get_connection()
+    try:
+        from src.validation import MAX_FAILURE_RATE
+        report, rejected_urls = _validate_staging(
+            conn, MAX_FAILURE_RATE if max_failure_rate is None else max_failure_rate)
+        if not report['passed']:
+            print("Merge blocked by validation; fighters table left unchanged.")
+            return None
+
+        # Latest scrape per URL, only fighters with at least one recorded fight
+        conn.execute("DROP TABLE IF EXISTS temp.clean_fighters")
+        conn.execute("""
+            CREATE TEMP TABLE clean_fighters AS
+            SELECT s.* FROM staging_fighters s
+            JOIN (SELECT url, MAX(rowid) AS rid FROM staging_fighters GROUP BY url) latest
+              ON s.rowid = latest.rid
+            WHERE s.wins IS NOT NULL AND s.losses IS NOT NULL
+              AND s.wins + s.losses + COALESCE(s.draws, 0) >= 1
+            ORDER BY s.rowid
+        """)
+        conn.executemany("DELETE FROM temp.clean_fighters WHERE url = ?",
+                         [(url,) for url in rejected_urls if url is not None])
+        if any(url is None for url in rejected_urls):
+            conn.execute("DELETE FROM temp.clean_fighters WHERE url IS NULL")
+
+        with timer('sink.median_fill'):
+            for col in MEDIAN_FILL_COLUMNS:
+                median = _median(conn, 'temp.clean_fighters', col)
+                if median is not None:
+                    conn.execute(f"UPDATE temp.clean_fighters SET {col} = ? WHERE {col} IS NULL", (median,))
+            conn.execute("UPDATE temp.clean_fighters SET stance = 'Orthodox' WHERE stance IS NULL")
+
+        from src.change_feed import snapshot, record_changes
+        before = snapshot(conn)
+
+        with timer('sink.load'):
+            conn.execute("DELETE FROM fighter_stats")
+            conn.execute("DELETE FROM fighters")
+            # Names are UNIQUE: like run_etl, the first name in sorted order wins
+            conn.execute("""
+                INSERT OR IGNORE INTO fighters
+                    (name, nickname, height_cm, reach_cm, stance, dob, weight_lbs, weight_class, url)
+                SELECT name, nickname, height_cm, reach_cm, stance, dob, weight_lbs,
+                    CASE
+                        WHEN weight_lbs IS NULL THEN 'Unknown'
+                        WHEN CAST(weight_lbs AS INTEGER) <= 115 THEN 'Strawweight'
+                        WHEN CAST(weight_lbs AS INTEGER) <= 125 THEN 'Flyweight'
+                        WHEN CAST(weight_lbs AS INTEGER) <= 135 THEN 'Bantamweight'
+                        WHEN CAST(weight_lbs AS INTEGER) <= 145 THEN 'Featherweight'
+                        WHEN CAST(weight_lbs AS INTEGER) <= 155 THEN 'Lightweight'
+                        WHEN CAST(weight_lbs AS INTEGER) <= 170 THEN 'Welterweight'
+                        WHEN CAST(weight_lbs AS INTEGER) <= 185 THEN 'Middleweight'
+                        WHEN CAST(weight_lbs AS INTEGER) <= 205 THEN 'Light Heavyweight'
+                        ELSE 'Heavyweight'
+                    END,
+                    url
+                FROM temp.clean_fighters
+                WHERE name IS NOT NULL
+                ORDER BY name, rowid
+            """)
+            conn.execute("""
+                INSERT INTO fighter_stats (
+                    fighter_id, wins, losses, draws,
+                    sapm, slpm, str_acc, str_def,
+                    td_avg, td_acc, td_def, sub_avg
+                )
+                SELECT f.id, c.wins, c.losses, c.draws,
+                       c.sapm, c.slpm, c.str_acc, c.str_def,
+                       c.td_avg, c.td_acc, c.td_def, c.sub_avg
+                FROM fighters f
+                JOIN temp.clean_fighters c ON c.url = f.url AND c.name = f.name
+            """)
+            count = conn.execute("SELECT COUNT(*) FROM fighters").fetchone()[0]
+
+        bump_data_version(conn)
+        record_changes(conn, before)
+        conn.commit()
+        conn.execute("DROP TABLE IF EXISTS temp.clean_fighters")
+        refresh_saved_queries(conn)
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        if own_conn:
+            conn.close()
+
+    print(f"Merge Complete! Loaded {count} fighters into {DB_NAME}")
+    from src.similarity import update_index as update_similarity_index  # numpy/sklearn on demand
+    update_similarity_index()
+    return count
+
+def export_csv(output_file="data/fighters.csv"):
+    """Optional CSV export of the staged records, in the scraper's column layout."""
+    import pandas as pd
+    conn = get_connection()
+    try:
+        cols = ', '.join(f"{col} AS {key}" for key, col in STAGING_COLUMNS.items())
+        df = pd.read_sql_query(f"SELECT {cols} FROM staging_fighters ORDER BY rowid", conn)
+    finally:
+        conn.close()
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    df.to_csv(output_file, index=False)
+    print(f"Exported {len(df)} staged fighters to {output_file}")
+    return output_file
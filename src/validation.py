@@ -0,0 +1,196 @@
+"""
+Data-quality validation between extract and load.
+Every rule is a vectorized check over the whole frame that yields a boolean
+mask of offending rows. 'error' rules reject rows; if the share of rejected rows
+exceeds the threshold, the load is blocked. 'warn' rules (gaps that
+clean_fighters fills silently, duplicate names, ...) are only reported.
+A compact JSON report is written to data/validation_report.json.
+
+Usage:
+    python -m src.validation data/fighters_master.csv
+    python -m src.validation data/fighters_master.csv --max-failure-rate 0.01
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from src.instrumentation import timed
+
+REPORT_PATH = os.path.join('data', 'validation_report.json')
+MAX_FAILURE_RATE = 0.05   # Share of rows failing an 'error' rule that blocks the load
+EXAMPLES = 3              # Offending fighter names kept per rule in the report
+
+REQUIRED_COLUMNS = ['Name', 'URL', 'Wins', 'Losses', 'Draws', 'Height_cm', 'Reach_cm', 'Weight_lbs',
+                    'Stance', 'SLpM', 'Str_Acc', 'SApM', 'Str_Def', 'TD_Avg', 'TD_Acc', 'TD_Def', 'Sub_Avg']
+FRACTION_COLUMNS = ['Str_Acc', 'Str_Def', 'TD_Acc', 'TD_Def']
+RATE_COLUMNS = ['SLpM', 'SApM', 'TD_Avg', 'Sub_Avg']
+RECORD_COLUMNS = ['Wins', 'Losses', 'Draws']
+STANCES = {'Orthodox', 'Southpaw', 'Switch', 'Open Stance', 'Sideways'}
+DOB_PATTERN = r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec) \d{2}, \d{4}'
+URL_PREFIXES = ('http://www.ufcstats.com/fighter-details/', 'https://www.ufcstats.com/fighter-details/')
+
+# Plausible ranges; values in the "unit" band look like the wrong unit rather than bad data
+HEIGHT_CM = (120, 240)
+REACH_CM = (120, 250)
+WEIGHT_LBS = (100, 800)
+INCHES_BAND = (48, 100)   # 4'-8'4" written as inches
+KG_BAND = (40, 100)       # 88-220 lbs written as kg
+MAX_RATE = 100            # Per-15-minute / per-minute averages above this are parse errors
+MAX_RECORD = 300
+MAX_APE_INDEX_CM = 30     # |reach - height|
+
+def _numeric(df, col):
+    return pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float)
+
+def _outside(values, bounds):
+    return ~np.isnan(values) & ((values < bounds[0]) | (values > bounds[1]))
+
+def _within(values, bounds):
+    return ~np.isnan(values) & (values >= bounds[0]) & (values < bounds[1])
+
+def run_checks(df):
+    """
+    Evaluate every rule on the frame.
+    Returns: list of (rule, severity, description, mask) with one boolean per row.
+    """
+    checks = []
+
+    def check(rule, severity, description, mask):
+        checks.append((rule, severity, description, np.asarray(mask, dtype=bool)))
+
+    # Text columns as the string dtype: a column read back empty is float64 and has no .str
+    name = df['Name'].astype('string')
+    url = df['URL'].astype('string')
+    name_missing = name.isna().to_numpy() | ~name.str.contains(r'\S', na=False).to_numpy()
+    url_missing = url.isna().to_numpy()
+    check('name_missing', 'error', "Name is empty", name_missing)
+    check('url_missing', 'error', "URL is empty", url_missing)
+    check('url_format', 'error', "URL is not a ufcstats fighter-details page",
+          ~url_missing & ~url.str.startswith(URL_PREFIXES, na=False).to_numpy())
+    check('duplicate_url', 'error', "URL already seen in an earlier row",
+          ~url_missing & url.duplicated(keep='first').to_numpy())
+    check('duplicate_name', 'warn', "Name shared with another row (the database keeps the first)",
+          ~name_missing & name.duplicated(keep=False).to_numpy())
+
+    record = {col: _numeric(df, col) for col in RECORD_COLUMNS}
+    wins, losses, draws = record['Wins'], record['Losses'], record['Draws']
+    check('record_missing', 'warn', "Wins or losses missing (dropped by clean_fighters)",
+          np.isnan(wins) | np.isnan(losses))
+    bad_record = np.zeros(len(df), dtype=bool)
+    for values in record.values():
+        bad_record |= ~np.isnan(values) & ((values < 0) | (values > MAX_RECORD) | (values != np.round(values)))
+    check('record_range', 'error', f"Wins/losses/draws negative, fractional or above {MAX_RECORD}", bad_record)
+    total = wins + losses + np.nan_to_num(draws)
+    no_fights = total == 0
+    check('no_fights', 'warn', "0-0-0 record (dropped by clean_fighters)", no_fights)
+
+    rates = np.column_stack([_numeric(df, col) for col in RATE_COLUMNS])
+    fractions = np.column_stack([_numeric(df, col) for col in FRACTION_COLUMNS])
+    check('rate_range', 'error', f"Per-minute / per-15 averages negative or above {MAX_RATE}",
+          np.any(~np.isnan(rates) & ((rates < 0) | (rates > MAX_RATE)), axis=1))
+    check('percent_not_fraction', 'error', "Accuracy/defence looks like a percentage (1-100), not a fraction",
+          np.any(~np.isnan(fractions) & (fractions > 1) & (fractions <= 100), axis=1))
+    check('fraction_range', 'error', "Accuracy/defence outside 0-1",
+          np.any(~np.isnan(fractions) & ((fractions < 0) | (fractions > 100)), axis=1))
+    check('stats_without_fights', 'error', "Fight stats recorded for a 0-0-0 record",
+          no_fights & np.any(np.nan_to_num(rates) > 0, axis=1))
+
+    height, reach, weight = _numeric(df, 'Height_cm'), _numeric(df, 'Reach_cm'), _numeric(df, 'Weight_lbs')
+    height_inches = _within(height, INCHES_BAND)
+    reach_inches = _within(reach, INCHES_BAND)
+    weight_kg = _within(weight, KG_BAND)
+    check('height_in_inches', 'error', "Height looks like inches, not cm", height_inches)
+    check('reach_in_inches', 'error', "Reach looks like inches, not cm", reach_inches)
+    check('weight_in_kg', 'error', "Weight looks like kg, not lbs", weight_kg)
+    check('height_range', 'error', f"Height outside {HEIGHT_CM[0]}-{HEIGHT_CM[1]} cm",
+          _outside(height, HEIGHT_CM) & ~height_inches)
+    check('reach_range', 'error', f"Reach outside {REACH_CM[0]}-{REACH_CM[1]} cm",
+          _outside(reach, REACH_CM) & ~reach_inches)
+    check('weight_range', 'error', f"Weight outside {WEIGHT_LBS[0]}-{WEIGHT_LBS[1]} lbs",
+          _outside(weight, WEIGHT_LBS) & ~weight_kg)
+    check('ape_index', 'warn', f"Reach and height differ by more than {MAX_APE_INDEX_CM} cm",
+          np.abs(reach - height) > MAX_APE_INDEX_CM)
+
+    check('height_missing', 'warn', "Height missing (median-filled by clean_fighters)", np.isnan(height))
+    check('reach_missing', 'warn', "Reach missing (median-filled by clean_fighters)", np.isnan(reach))
+    check('weight_missing', 'warn', "Weight missing (weight class 'Unknown')", np.isnan(weight))
+    stance = df['Stance']
+    stance_missing = stance.isna().to_numpy()
+    check('stance_missing', 'warn', "Stance missing (defaulted to Orthodox)", stance_missing)
+    check('stance_unknown', 'warn', "Stance not one of " + ", ".join(sorted(STANCES)),
+          ~stance_missing & ~stance.isin(STANCES).to_numpy())
+    if 'DOB' in df.columns:
+        # A regex instead of pd.to_datetime: same verdict, a fraction of the cost
+        dob = df['DOB'].astype('string')
+        check('dob_unparsed', 'warn', "DOB present but not in 'Mon DD, YYYY' form",
+              dob.notna().to_numpy() & ~dob.str.fullmatch(DOB_PATTERN, na=False).to_numpy())
+    return checks
+
+@timed('validation.validate')
+def validate(df, max_failure_rate=MAX_FAILURE_RATE):
+    """
+    Validate an extracted fighters frame.
+    Returns: (report, rejected) where rejected is a boolean array of rows failing
+    an 'error' rule and report['passed'] is False when the load should be blocked.
+    A frame missing required columns fails immediately without running the rules.
+    """
+    start = time.perf_counter()
+    report = {'rows': len(df), 'max_failure_rate': max_failure_rate}
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        report.update({'passed': False, 'rejected_rows': len(df), 'failure_rate': 1.0,
+                       'rules': {'schema': {'severity': 'error', 'count': len(df),
+                                            'description': f"Missing columns: {', '.join(missing)}"}}})
+        report['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        return report, np.ones(len(df), dtype=bool)
+
+    rejected = np.zeros(len(df), dtype=bool)
+    rules = {}
+    names = df['Name'].to_numpy(dtype=object)
+    for rule, severity, description, mask in run_checks(df):
+        n = int(mask.sum())
+        if severity == 'error':
+            rejected |= mask
+        if n:
+            rules[rule] = {'severity': severity, 'count': n, 'description': description,
+                           'examples': [str(v) for v in names[mask][:EXAMPLES]]}
+
+    failure_rate = float(rejected.mean()) if len(df) else 0.0
+    report.update({
+        'passed': len(df) > 0 and failure_rate <= max_failure_rate,
+        'rejected_rows': int(rejected.sum()),
+        'failure_rate': round(failure_rate, 4),
+        'rules': rules,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 2),
+    })
+    return report, rejected
+
+def write_report(report, path=REPORT_PATH):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+    return path
+
+def format_report(report):
+    """Short human-readable summary: verdict line plus one line per triggered rule."""
+    verdict = 'PASSED' if report['passed'] else 'BLOCKED'
+    lines = [f"Validation {verdict}: {report['rejected_rows']}/{report['rows']} rows rejected "
+             f"({report['failure_rate']:.1%}, limit {report['max_failure_rate']:.1%}) in {report['elapsed_ms']} ms"]
+    for rule, info in sorted(report['rules'].items(), key=lambda item: (item[1]['severity'] != 'error', -item[1]['count'])):
+        lines.append(f"  [{info['severity']}] {rule:<22}{info['count']:>7}  {info['description']}")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate a fighters CSV before loading it")
+    parser.add_argument('csv_path', nargs='?', default=os.path.join('data', 'fighters_master.csv'))
+    parser.add_argument('--max-failure-rate', type=float, default=MAX_FAILURE_RATE)
+    parser.add_argument('--report', default=REPORT_PATH)
+    args = parser.parse_args()
+
+    report, _ = validate(pd.read_csv(args.csv_path), args.max_failure_rate)
+    write_report(report, args.report)
+    print(format_report(report))
+    sys.exit(0 if report['passed'] else 1)
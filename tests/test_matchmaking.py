@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.matchmaking import build_card, pairing_costs
+
+def _pool(n, seed):
+    rng = np.random.default_rng(seed)
+    fights = rng.integers(1, 30, n)
+    return pd.DataFrame({
+        'Name': [f"Fighter {i}" for i in range(n)],
+        'SLpM': rng.uniform(1, 7, n), 'Str_Acc': rng.uniform(0.3, 0.6, n),
+        'SApM': rng.uniform(1, 6, n), 'Str_Def': rng.uniform(0.4, 0.7, n),
+        'TD_Avg': rng.uniform(0.1, 5, n), 'TD_Acc': rng.uniform(0.1, 0.7, n),
+        'TD_Def': rng.uniform(0.3, 0.9, n), 'Sub_Avg': rng.uniform(0.1, 2, n),
+        'Reach_cm': rng.uniform(165, 205, n), 'Height_cm': rng.uniform(160, 195, n),
+        'TotalFights': fights, 'WinRate': rng.integers(0, fights + 1) / fights,
+    })
+
+def _best_matching(cost, people, forbidden):
+    """Cheapest card pairing all but (at most) one of `people`, by brute force."""
+    if len(people) < 2:
+        return 0.0
+    first, rest = people[0], people[1:]
+    options = []
+    if len(people) % 2:
+        options.append(_best_matching(cost, rest, forbidden))
+    for k, other in enumerate(rest):
+        if (first, other) not in forbidden:
+            options.append(cost[first, other] + _best_matching(cost, rest[:k] + rest[k + 1:], forbidden))
+    return min(options, default=np.inf)
+
+@pytest.mark.parametrize('n', [6, 7])
+@pytest.mark.parametrize('seed', range(10))
+def test_lower_bound_holds(n, seed):
+    pool = _pool(n, seed)
+    exclude = [("Fighter 0", "Fighter 1"), ("Fighter 2", "Fighter 3")] if seed % 2 else None
+    result = build_card(pool, exclude=exclude)
+    _, cost = pairing_costs(pool)
+    forbidden = {(int(x[-1]), int(y[-1])) for x, y in exclude or []}
+    forbidden |= {(j, i) for i, j in forbidden}
+    best = _best_matching(cost, list(range(n)), forbidden)
+    assert len(result['unpaired']) == n % 2
+    # Both figures are rounded to 6 places
+    assert result['lower_bound'] - 1e-6 <= best <= result['total_cost'] + 1e-6
+
+def test_no_bound_when_exclusions_force_a_drop():
+    pool = _pool(4, 0)
+    exclude = [("Fighter 0", f"Fighter {k}") for k in range(1, 4)]
+    result = build_card(pool, exclude=exclude)
+    assert "Fighter 0" in result['unpaired']
+    assert result['lower_bound'] is None
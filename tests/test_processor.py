@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.processor import (COUNTERFACTUAL_STATS, CONTRIBUTION_FACTORS, explain_matchups,
+                           predict_matchup, predict_matchups_batch)
+
+def _roster(n=200, seed=0):
+    """Synthetic cleaned roster; ~20% of each stat is 0, which the model scores as its default."""
+    rng = np.random.default_rng(seed)
+    fights = rng.integers(1, 40, n)
+    df = pd.DataFrame({
+        'Name': [f"Fighter {i}" for i in range(n)],
+        'SLpM': rng.uniform(0.5, 7, n), 'Str_Acc': rng.uniform(0.2, 0.7, n),
+        'SApM': rng.uniform(1, 6, n), 'Str_Def': rng.uniform(0.3, 0.7, n),
+        'TD_Avg': rng.uniform(0, 5, n), 'TD_Acc': rng.uniform(0.1, 0.7, n),
+        'TD_Def': rng.uniform(0.2, 0.9, n), 'Sub_Avg': rng.uniform(0, 2, n),
+        'Reach_cm': rng.uniform(160, 210, n), 'Height_cm': rng.uniform(155, 200, n),
+        'TotalFights': fights, 'WinRate': rng.integers(0, fights + 1) / fights,
+    })
+    for col in ['SLpM', 'SApM', 'TD_Avg', 'Sub_Avg', 'Reach_cm', 'Height_cm', 'Str_Def', 'TD_Acc']:
+        df.loc[rng.random(n) < 0.2, col] = 0
+    return df
+
+@pytest.fixture(scope='module')
+def pairs():
+    df = _roster()
+    rng = np.random.default_rng(1)
+    a = df.iloc[rng.integers(0, len(df), 300)].reset_index(drop=True)
+    b = df.iloc[rng.integers(0, len(df), 300)].reset_index(drop=True)
+    return a, b
+
+def test_contributions_sum_to_probability(pairs):
+    a, b = pairs
+    explained = explain_matchups(a, b)
+    total = 0.5 + explained[[f"contrib_{f}" for f in CONTRIBUTION_FACTORS]].sum(axis=1)
+    np.testing.assert_allclose(np.round(total, 4), predict_matchups_batch(a, b)['prob_a'])
+
+@pytest.mark.parametrize('stat', list(COUNTERFACTUAL_STATS))
+def test_reported_flip_evens_the_fight(pairs, stat):
+    a, b = pairs
+    explained = explain_matchups(a, b)
+    checked = 0
+    for i, delta in enumerate(explained[f"flip_{stat}"]):
+        if np.isnan(delta):
+            continue
+        fighter = a.iloc[i].copy()
+        fighter[stat] += delta
+        assert predict_matchup(fighter, b.iloc[i])['prob_a'] == pytest.approx(0.5, abs=1e-4)
+        checked += 1
+    assert checked > 0